@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+FleetPulse AI Query Benchmark
+Replays a query corpus against /ai/query with per-class latency and in-flight coalescing
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+from backend_test import BASE_URL
+from fleetpulse_client import FleetPulseClient
+from histogram import Histogram
+from http_transport import PooledTransport
+from request_metrics import MICROSECONDS
+
+# Keyword classes per method, in the order route.js tests them; the first match wins
+QUERY_CLASSES = {
+    "GET": [
+        ("top driver", ("top driver",)),
+        ("fuel", ("fuel",)),
+        ("safety", ("safety", "accident")),
+        ("route", ("route",)),
+    ],
+    "POST": [
+        ("top driver", ("top driver",)),
+        ("fuel", ("fuel",)),
+        ("cost", ("cost", "saving")),
+    ],
+}
+OTHER_CLASS = "other"
+# Report order: every class once, as first seen across the methods
+CLASS_NAMES = list(dict.fromkeys(name for classes in QUERY_CLASSES.values()
+                                 for name, _ in classes)) + [OTHER_CLASS]
+
+# Queries from test_ai_assistant_api, used when no corpus file is given
+DEFAULT_CORPUS = [
+    {"query": "top driver", "method": "GET"},
+    {"query": "fuel efficiency", "method": "GET"},
+    {"query": "safety score", "method": "GET"},
+    {"query": "route optimization", "method": "GET"},
+    {"query": "Show me top drivers this week", "method": "POST"},
+    {"query": "How is our fuel efficiency trending?", "method": "POST"},
+    {"query": "What are our cost savings this month?", "method": "POST"},
+]
+
+
+def classify(query, method="POST"):
+    """Response branch route.js picks for ``query``; GET and POST match different keywords"""
+    lowered = (query or "").lower()
+    for name, keywords in QUERY_CLASSES[method.upper()]:
+        if any(keyword in lowered for keyword in keywords):
+            return name
+    return OTHER_CLASS
+
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive form, what a memoizing layer could key on"""
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+def load_corpus(path):
+    """Queries from JSONL: {"query": "...", "method": "GET"|"POST", "count": n}
+
+    ``method`` defaults to POST and ``count`` (default 1) repeats a line, so a
+    production query log can be stored already aggregated.
+    """
+    corpus = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if "query" not in entry:
+                raise ValueError(f"{path}:{line_number}: missing 'query'")
+            method = entry.get("method", "POST").upper()
+            if method not in ("GET", "POST"):
+                raise ValueError(f"{path}:{line_number}: unsupported method {method!r}")
+            corpus.extend([{"query": entry["query"], "method": method}] * int(entry.get("count", 1)))
+    return corpus
+
+
+class InFlightCoalescer:
+    """Single-flight: concurrent calls with the same key share one execution
+
+    Only calls that overlap in time are merged; nothing is kept once the
+    leader finishes, so results never go stale.
+    """
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def call(self, key, func):
+        """(result, coalesced) for ``func()``, joining an identical call already running"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+                self.leaders += 1
+                leader = True
+            else:
+                self.followers += 1
+                leader = False
+        if not leader:
+            return future.result(), True
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result(), False
+
+
+class AIQueryBenchmark:
+    """Replays a corpus against /ai/query at a fixed concurrency"""
+    def __init__(self, client=None, corpus=None, concurrency=8, repeat=1, coalesce=False,
+                 shuffle=False, seed=None):
+        self.client = client or FleetPulseClient(
+            BASE_URL, PooledTransport(pool_size=max(10, concurrency)))
+        self.corpus = list(corpus or DEFAULT_CORPUS)
+        self.concurrency = concurrency
+        self.repeat = repeat
+        self.coalescer = InFlightCoalescer() if coalesce else None
+        self.shuffle = shuffle
+        self.rng = random.Random(seed)
+        self.latency = {}
+        self.coalesced_latency = Histogram(scale=MICROSECONDS)
+        self.errors = {}
+        self.server_calls = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+        self._sampled = None
+
+    def _queries(self):
+        """The replay order, drawn once so run() and duplicate_work() see the same list"""
+        if self._sampled is None:
+            queries = self.corpus * self.repeat
+            if self.shuffle:
+                self.rng.shuffle(queries)
+            self._sampled = queries
+        return self._sampled
+
+    def _send(self, method, query):
+        with self._lock:
+            self.server_calls += 1
+        return self.client.ask(query, method)
+
+    def _run_one(self, entry):
+        method, query = entry["method"], entry["query"]
+        query_class = classify(query, method)
+        start = time.perf_counter()
+        coalesced = False
+        try:
+            if self.coalescer:
+                _, coalesced = self.coalescer.call((method, query),
+                                                   lambda: self._send(method, query))
+            else:
+                self._send(method, query)
+        except Exception:
+            with self._lock:
+                self.errors[query_class] = self.errors.get(query_class, 0) + 1
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            histogram = self.latency.setdefault(query_class, Histogram(scale=MICROSECONDS))
+        histogram.record(elapsed)
+        if coalesced:
+            self.coalesced_latency.record(elapsed)
+
+    def run(self):
+        queries = self._queries()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            list(executor.map(self._run_one, queries))
+        self.elapsed = time.perf_counter() - start
+        return self.report()
+
+    def duplicate_work(self):
+        """How many server calls a coalescing or memoizing layer would avoid for this corpus"""
+        queries = self._queries()
+        total = len(queries)
+        exact = len({(entry["method"], entry["query"]) for entry in queries})
+        normalized = len({(entry["method"], normalize_query(entry["query"])) for entry in queries})
+        return {
+            "queries": total,
+            "distinct_exact": exact,
+            "distinct_normalized": normalized,
+            "memoizable_exact": total - exact,
+            "memoizable_normalized": total - normalized,
+            "memoizable_ratio": (total - normalized) / total if total else 0.0,
+        }
+
+    def report(self):
+        completed = sum(histogram.count for histogram in self.latency.values())
+        classes = {}
+        for name in CLASS_NAMES:
+            histogram = self.latency.get(name)
+            if histogram is None and name not in self.errors:
+                continue
+            classes[name] = dict(histogram.summary(unit_scale=1000) if histogram else {},
+                                 errors=self.errors.get(name, 0))
+        report = {
+            "queries": completed + sum(self.errors.values()),
+            "errors": sum(self.errors.values()),
+            "elapsed": self.elapsed,
+            "throughput": completed / self.elapsed if self.elapsed else 0.0,
+            "server_calls": self.server_calls,
+            "classes": classes,
+            "duplicate_work": self.duplicate_work(),
+        }
+        if self.coalescer:
+            report["coalescing"] = {
+                "leaders": self.coalescer.leaders,
+                "coalesced": self.coalescer.followers,
+                "saved_ratio": (self.coalescer.followers / report["queries"]
+                                if report["queries"] else 0.0),
+                "coalesced_p50_ms": self.coalesced_latency.percentile(50) * 1000,
+            }
+        return report
+
+    def print_report(self, report=None):
+        """Print AI benchmark summary"""
+        report = report or self.report()
+        print("=" * 80)
+        print("📋 AI QUERY BENCHMARK SUMMARY")
+        print(f"Queries: {report['queries']}, Errors: {report['errors']}, "
+              f"Server calls: {report['server_calls']}")
+        print(f"Throughput: {report['throughput']:.1f} queries/s over {report['elapsed']:.1f}s "
+              f"at concurrency {self.concurrency}")
+        print("\n⏱️  LATENCY BY QUERY CLASS")
+        print(f"{'Class':<14}{'Count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Errors':>8}")
+        for name, stats in report["classes"].items():
+            print(f"{name:<14}{stats.get('count', 0):>8}{stats.get('p50', 0):>10.1f}"
+                  f"{stats.get('p95', 0):>10.1f}{stats.get('p99', 0):>10.1f}{stats['errors']:>8}")
+        duplicates = report["duplicate_work"]
+        print("\n♻️  DUPLICATE WORK")
+        print(f"Distinct queries: {duplicates['distinct_exact']} exact, "
+              f"{duplicates['distinct_normalized']} after case/whitespace normalization")
+        print(f"A memoizing layer would skip {duplicates['memoizable_normalized']} of "
+              f"{duplicates['queries']} calls ({duplicates['memoizable_ratio']:.1%})")
+        if "coalescing" in report:
+            coalescing = report["coalescing"]
+            print(f"In-flight coalescing merged {coalescing['coalesced']} calls "
+                  f"({coalescing['saved_ratio']:.1%}), waiters p50 "
+                  f"{coalescing['coalesced_p50_ms']:.1f}ms")
+        print(f"\n⏰ Completed at: {datetime.now().isoformat()}")
+        print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FleetPulse /ai/query throughput benchmark")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--corpus", help="JSONL query corpus (default: the tester's queries)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=1, help="replay the corpus N times")
+    parser.add_argument("--coalesce", action="store_true",
+                        help="merge identical in-flight queries into one server call")
+    parser.add_argument("--shuffle", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else DEFAULT_CORPUS
+    client = FleetPulseClient(args.base_url,
+                              PooledTransport(pool_size=max(10, args.concurrency), retries=0))
+    benchmark = AIQueryBenchmark(client, corpus, concurrency=args.concurrency,
+                                 repeat=args.repeat, coalesce=args.coalesce,
+                                 shuffle=args.shuffle, seed=args.seed)
+    print(f"🚀 Replaying {len(corpus) * args.repeat} AI queries against {args.base_url}")
+    try:
+        report = benchmark.run()
+    finally:
+        client.close()
+    benchmark.print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.output}")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,20 +4,115 @@ FleetPulse Backend API Testing Suite
 Tests all backend API endpoints comprehensively
 """
 
-import requests
 import json
 import time
 import os
+import threading
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
+from fleetpulse_client import FleetPulseClient
+from http_transport import PooledTransport
+from request_metrics import RequestMetrics
+from result_sink import ResultSink
+from roi_engine import calculate_roi, roi_diff
+from stream_validator import check_vehicle, required_fields_check, validate_stream, \
+    DRIVER_FIELDS, ROUTE_FIELDS
+from timeseries_engine import check_time_series
+
 # Get base URL from environment - using localhost for testing
 BASE_URL = "http://localhost:3000/api"
 
+# Machine-readable per-endpoint latency/size export written after a full run
+METRICS_FILE = os.environ.get("METRICS_FILE", "backend_test_metrics.json")
+
+# NDJSON stream of every logged result (rotated, payloads truncated)
+RESULTS_FILE = os.environ.get("RESULTS_FILE", "backend_test_results.jsonl")
+
+# Seconds to cache static endpoints client-side; unset disables the cache
+CACHE_TTL = os.environ.get("CACHE_TTL")
+
+# Comma-separated scenarios to profile on the server ("all" for every one); unset disables
+PROFILE_SCENARIOS = os.environ.get("PROFILE_SCENARIOS")
+
+# Scenario name -> tester method, in run_all_tests priority order
+SCENARIOS = {
+    "root": "test_root_endpoint",
+    "overview": "test_fleet_overview_api",
+    "roi": "test_roi_calculator_api",
+    "ai": "test_ai_assistant_api",
+    "analytics": "test_fleet_analytics_api",
+    "additional": "test_additional_endpoints",
+    "streaming": "test_streaming_validation",
+    "errors": "test_error_handling",
+}
+
+# Section header printed before a scenario in run_all_tests
+SCENARIO_SECTIONS = {
+    "overview": "🔥 HIGH PRIORITY TESTS",
+    "ai": "📊 MEDIUM PRIORITY TESTS",
+    "additional": "🔧 ADDITIONAL ENDPOINTS",
+    "errors": "⚠️  ERROR HANDLING",
+}
+
+# Scenarios that run alone after the parallel pool (and are left out of load runs):
+# streaming validation can trace memory, which is process-wide
+EXCLUSIVE_SCENARIOS = {"streaming"}
+
+# Scenario -> scenarios that must finish before it starts when running in parallel.
+# Order-sensitive checks (e.g. the overview dynamic-data comparison) live inside a
+# single scenario, so the groups themselves are currently independent.
+SCENARIO_DEPENDENCIES = {}
+
 class FleetPulseAPITester:
-    def __init__(self):
-        self.base_url = BASE_URL
+    def __init__(self, base_url=None, verbose=True, transport=None, sink=None, keep_results=None,
+                 client=None):
+        if client is not None and transport is not None:
+            raise ValueError("Pass either client or transport; a client brings its own transport")
+        self.client = client or FleetPulseClient(base_url or BASE_URL,
+                                                 transport or PooledTransport())
+        self.base_url = self.client.base_url
+        self.verbose = verbose
+        self.transport = self.client.transport
+        # Aggregates (and optional NDJSON stream) behind print_summary
+        self.sink = sink or ResultSink()
+        # In-memory result lists grow without bound, so they are off once a sink is given
+        self.keep_results = sink is None if keep_results is None else keep_results
         self.test_results = []
         self.failed_tests = []
+        # Pause between the two overview calls of the dynamic-data comparison
+        self.dynamic_data_delay = 1
+        # Wall time per scenario from the last run_all_tests
+        self.scenario_durations = {}
+        self.parallel_wall_time = None
+        self._lock = threading.Lock()
+        # Per-thread result/output buffers used while a scenario runs in parallel
+        self._group = threading.local()
+        # Bytes per network read when validating list responses incrementally
+        self.stream_chunk_size = 64 * 1024
+        # Peak parse memory via tracemalloc; only safe while nothing else runs
+        self.trace_stream_memory = False
+        # Callables invoked as hook(method, endpoint, elapsed, response, error)
+        self.request_hooks = self.client.request_hooks
+        # Testers sharing a client share its metrics rather than double-counting
+        self.metrics = next((hook for hook in self.request_hooks
+                             if isinstance(hook, RequestMetrics)), None)
+        if self.metrics is None:
+            self.metrics = RequestMetrics()
+            self.request_hooks.append(self.metrics)
+        # Optional ServerProfiler wrapping scenarios in server-side captures
+        self.profiler = None
+    
+    def _request(self, method, path, **kwargs):
+        """Send an API request through the client, which notifies request hooks"""
+        return self.client.request(method, path, **kwargs)
+    
+    def _get(self, path, **kwargs):
+        return self._request("GET", path, **kwargs)
+    
+    def _post(self, path, **kwargs):
+        return self._request("POST", path, **kwargs)
         
     def log_test(self, test_name, success, details="", response_data=None):
         """Log test results"""
@@ -28,18 +123,38 @@ class FleetPulseAPITester:
             "timestamp": datetime.now().isoformat(),
             "response_data": response_data
         }
-        self.test_results.append(result)
+        group = getattr(self._group, "results", None)
+        if group is not None:
+            # Merged into test_results in scenario order once the group finishes
+            group.append(result)
+        else:
+            self._store_result(result)
         
-        if success:
-            print(f"✅ {test_name}: PASSED - {details}")
+        if self.verbose:
+            if success:
+                self._emit(f"✅ {test_name}: PASSED - {details}")
+            else:
+                self._emit(f"❌ {test_name}: FAILED - {details}")
+    
+    def _store_result(self, result):
+        self.sink.write(result)
+        if self.keep_results:
+            with self._lock:
+                self.test_results.append(result)
+                if not result["success"]:
+                    self.failed_tests.append(result)
+    
+    def _emit(self, line):
+        output = getattr(self._group, "output", None)
+        if output is not None:
+            output.append(line)
         else:
-            print(f"❌ {test_name}: FAILED - {details}")
-            self.failed_tests.append(result)
+            print(line)
     
     def test_root_endpoint(self):
         """Test root API endpoint"""
         try:
-            response = requests.get(f"{self.base_url}/")
+            response = self._get("/")
             
             if response.status_code == 200:
                 data = response.json()
@@ -59,7 +174,7 @@ class FleetPulseAPITester:
     def test_fleet_overview_api(self):
         """Test Fleet Overview API - Primary focus"""
         try:
-            response = requests.get(f"{self.base_url}/fleet/overview")
+            response = self._get("/fleet/overview")
             
             if response.status_code == 200:
                 data = response.json()
@@ -105,8 +220,8 @@ class FleetPulseAPITester:
                                     f"Indian format: {reg_format_valid}", vehicles[:2])
                 
                 # Test dynamic data by making multiple calls
-                time.sleep(1)
-                response2 = requests.get(f"{self.base_url}/fleet/overview")
+                time.sleep(self.dynamic_data_delay)
+                response2 = self._get("/fleet/overview")
                 if response2.status_code == 200:
                     data2 = response2.json()
                     # Check if some values changed (dynamic behavior)
@@ -134,9 +249,9 @@ class FleetPulseAPITester:
                 "accidentsPerYear": 3
             }
             
-            response = requests.post(f"{self.base_url}/calculate-roi", 
-                                   json=test_data,
-                                   headers={"Content-Type": "application/json"})
+            response = self._post("/calculate-roi", 
+                                  json=test_data,
+                                  headers={"Content-Type": "application/json"})
             
             if response.status_code == 200:
                 data = response.json()
@@ -179,10 +294,18 @@ class FleetPulseAPITester:
                                 f"Complete breakdown provided. Fuel: ₹{breakdown['fuelSavings']:,}, "
                                 f"Maintenance: ₹{breakdown['maintenanceSavings']:,}", breakdown)
                 
+                # Compare every field with the route.js formula reproduced in roi_engine
+                expected = calculate_roi(test_data["trucks"], test_data["monthlyFuelCost"],
+                                         test_data["accidentsPerYear"])
+                diff = roi_diff(expected, data)
+                self.log_test("ROI Calculator API - Oracle", not diff, 
+                            f"Mismatched fields: {diff}" if diff else "All fields match the ROI formula",
+                            data if diff else None)
+                
                 # Test with different inputs
                 test_data2 = {"trucks": 25, "monthlyFuelCost": 300000, "accidentsPerYear": 5}
-                response2 = requests.post(f"{self.base_url}/calculate-roi", json=test_data2,
-                                        headers={"Content-Type": "application/json"})
+                response2 = self._post("/calculate-roi", json=test_data2,
+                                       headers={"Content-Type": "application/json"})
                 
                 if response2.status_code == 200:
                     data2 = response2.json()
@@ -210,7 +333,7 @@ class FleetPulseAPITester:
             ]
             
             for query in queries:
-                response = requests.get(f"{self.base_url}/ai/query?q={query}")
+                response = self._get(f"/ai/query?q={query}")
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -242,9 +365,9 @@ class FleetPulseAPITester:
             ]
             
             for query in post_queries:
-                response = requests.post(f"{self.base_url}/ai/query", 
-                                       json={"query": query},
-                                       headers={"Content-Type": "application/json"})
+                response = self._post("/ai/query", 
+                                      json={"query": query},
+                                      headers={"Content-Type": "application/json"})
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -275,7 +398,7 @@ class FleetPulseAPITester:
     def test_fleet_analytics_api(self):
         """Test Fleet Analytics API - Time-series data"""
         try:
-            response = requests.get(f"{self.base_url}/fleet/analytics")
+            response = self._get("/fleet/analytics")
             
             if response.status_code == 200:
                 data = response.json()
@@ -298,6 +421,11 @@ class FleetPulseAPITester:
                     self.log_test("Fleet Analytics API - Time Series", False, 
                                 f"Missing time series: {missing_series}", time_series)
                 else:
+                    problems = check_time_series(time_series)
+                    self.log_test("Fleet Analytics API - Series Shape", not problems,
+                                "Series match the analytics shape" if not problems
+                                else f"Problems: {problems[:5]}")
+                    
                     # Check fuel efficiency data
                     fuel_data = time_series["fuelEfficiency"]
                     if len(fuel_data) > 0 and "date" in fuel_data[0] and "value" in fuel_data[0]:
@@ -343,7 +471,7 @@ class FleetPulseAPITester:
         
         for endpoint, name in endpoints:
             try:
-                response = requests.get(f"{self.base_url}{endpoint}")
+                response = self._get(endpoint)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -407,10 +535,44 @@ class FleetPulseAPITester:
             except Exception as e:
                 self.log_test(f"{name} Endpoint", False, f"Exception: {str(e)}")
     
+    def test_streaming_validation(self):
+        """Test list endpoints item by item while the response streams in"""
+        targets = [
+            ("/fleet/vehicles", "vehicles", check_vehicle, "Vehicles"),
+            ("/fleet/overview", "vehicles", check_vehicle, "Overview Vehicles"),
+            ("/fleet/drivers", "drivers", required_fields_check(DRIVER_FIELDS), "Drivers"),
+            ("/fleet/routes", "routes", required_fields_check(ROUTE_FIELDS), "Routes"),
+        ]
+        
+        for endpoint, key, check, name in targets:
+            try:
+                response = self._get(endpoint, stream=True)
+                try:
+                    if response.status_code != 200:
+                        self.log_test(f"Streaming Validation - {name}", False, 
+                                    f"HTTP {response.status_code}")
+                        continue
+                    report = validate_stream(response.iter_content(self.stream_chunk_size),
+                                             key, check, track_memory=self.trace_stream_memory)
+                finally:
+                    response.close()
+                
+                if not report.found:
+                    self.log_test(f"Streaming Validation - {name}", False, 
+                                f"No '{key}' array in response", report.rest)
+                elif report.invalid:
+                    self.log_test(f"Streaming Validation - {name}", False, 
+                                report.summary(), report.errors)
+                else:
+                    self.log_test(f"Streaming Validation - {name}", True, report.summary())
+                    
+            except Exception as e:
+                self.log_test(f"Streaming Validation - {name}", False, f"Exception: {str(e)}")
+    
     def test_error_handling(self):
         """Test error handling for invalid endpoints"""
         try:
-            response = requests.get(f"{self.base_url}/invalid/endpoint")
+            response = self._get("/invalid/endpoint")
             
             if response.status_code == 404:
                 data = response.json()
@@ -427,65 +589,155 @@ class FleetPulseAPITester:
         except Exception as e:
             self.log_test("Error Handling", False, f"Exception: {str(e)}")
     
-    def run_all_tests(self):
-        """Run all tests in priority order"""
+    def run_all_tests(self, workers=1):
+        """Run all tests in priority order, optionally on a worker pool"""
         print(f"🚀 Starting FleetPulse Backend API Tests")
         print(f"📍 Base URL: {self.base_url}")
         print(f"⏰ Started at: {datetime.now().isoformat()}")
         print("=" * 80)
         
         # Test in priority order based on test_result.md
-        self.test_root_endpoint()
-        print()
-        
-        # High priority tests
-        print("🔥 HIGH PRIORITY TESTS")
-        self.test_fleet_overview_api()
-        print()
-        self.test_roi_calculator_api()
-        print()
-        
-        # Medium priority tests  
-        print("📊 MEDIUM PRIORITY TESTS")
-        self.test_ai_assistant_api()
-        print()
-        self.test_fleet_analytics_api()
-        print()
-        
-        # Additional endpoints
-        print("🔧 ADDITIONAL ENDPOINTS")
-        self.test_additional_endpoints()
-        print()
-        
-        # Error handling
-        print("⚠️  ERROR HANDLING")
-        self.test_error_handling()
-        print()
+        self.scenario_durations = {}
+        self.parallel_wall_time = None
+        if workers > 1 and self.profiler is not None:
+            # A V8 profile covers the whole server process, so captures must not overlap
+            print("🔬 Server profiling enabled: running scenarios serially")
+            workers = 1
+        if workers > 1:
+            self._run_parallel(workers)
+        else:
+            for name, method in SCENARIOS.items():
+                if name in SCENARIO_SECTIONS:
+                    print(SCENARIO_SECTIONS[name])
+                start = time.perf_counter()
+                with self._scenario_capture(name):
+                    getattr(self, method)()
+                self.scenario_durations[name] = time.perf_counter() - start
+                print()
         
         # Summary
         self.print_summary()
     
+    def _scenario_capture(self, name):
+        if self.profiler is None or not self.profiler.wants(name):
+            return nullcontext()
+        return self.profiler.capture(name)
+    
+    def _run_group(self, name):
+        """Run one scenario with its results and output buffered for ordered replay"""
+        self._group.results = []
+        self._group.output = []
+        start = time.perf_counter()
+        try:
+            getattr(self, SCENARIOS[name])()
+            return self._group.results, self._group.output, time.perf_counter() - start
+        finally:
+            self._group.results = None
+            self._group.output = None
+    
+    def _run_parallel(self, workers):
+        """Run independent scenarios concurrently, honouring SCENARIO_DEPENDENCIES"""
+        pending = [name for name in SCENARIOS if name not in EXCLUSIVE_SCENARIOS]
+        finished = {}
+        running = {}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                for name in list(pending):
+                    if all(dep in finished for dep in SCENARIO_DEPENDENCIES.get(name, ())):
+                        pending.remove(name)
+                        running[executor.submit(self._run_group, name)] = name
+                if not running:
+                    raise RuntimeError(f"Unsatisfiable scenario dependencies: {pending}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[running.pop(future)] = future.result()
+        for name in SCENARIOS:
+            if name in EXCLUSIVE_SCENARIOS:
+                finished[name] = self._run_group(name)
+        self.parallel_wall_time = time.perf_counter() - start
+        
+        # Replay in declaration order so results and output match a serial run
+        for name in SCENARIOS:
+            results, output, duration = finished[name]
+            if name in SCENARIO_SECTIONS:
+                print(SCENARIO_SECTIONS[name])
+            for line in output:
+                print(line)
+            for result in results:
+                self._store_result(result)
+            self.scenario_durations[name] = duration
+            print()
+    
     def print_summary(self):
         """Print test summary"""
-        total_tests = len(self.test_results)
-        passed_tests = len([t for t in self.test_results if t["success"]])
-        failed_tests = len(self.failed_tests)
+        total_tests = self.sink.total
+        passed_tests = self.sink.passed
+        failed_tests = self.sink.failed
         
         print("=" * 80)
         print("📋 TEST SUMMARY")
         print(f"Total Tests: {total_tests}")
         print(f"✅ Passed: {passed_tests}")
         print(f"❌ Failed: {failed_tests}")
-        print(f"📈 Success Rate: {(passed_tests/total_tests)*100:.1f}%")
+        print(f"📈 Success Rate: {self.sink.success_rate:.1f}%")
+        
+        connections = self.transport.connection_stats()
+        print(f"🔌 Connections: {connections['new_connections']} new, "
+              f"{connections['reused_connections']} reused "
+              f"over {connections['requests']} requests")
+        if hasattr(self.transport, "cache_stats"):
+            cache = self.transport.cache_stats()
+            print(f"🗄️  Cache: {cache['hits']} hits ({cache['revalidated']} revalidated), "
+                  f"{cache['misses']} misses, {cache['bytes_saved'] / 1024:.1f} KB saved")
+        
+        if self.scenario_durations:
+            serial_time = sum(self.scenario_durations.values())
+            if self.parallel_wall_time:
+                print(f"⚡ Parallel time: {self.parallel_wall_time:.2f}s vs serial time: "
+                      f"{serial_time:.2f}s ({serial_time / self.parallel_wall_time:.1f}x)")
+            else:
+                print(f"⏱️  Serial time: {serial_time:.2f}s")
+        
+        print("\n⏱️  LATENCY BY ENDPOINT")
+        self.metrics.print_table()
+        
+        if self.profiler is not None and self.profiler.captures:
+            print("\n🔬 SERVER PROFILES")
+            self.profiler.print_captures()
         
-        if self.failed_tests:
+        if self.sink.failed:
             print("\n🚨 FAILED TESTS:")
-            for test in self.failed_tests:
+            for test in self.sink.recent_failures:
                 print(f"  • {test['test']}: {test['details']}")
+            omitted = self.sink.failed - len(self.sink.recent_failures)
+            if omitted:
+                print(f"  ... and {omitted} earlier failures (see {self.sink.path or 'result stream'})")
         
         print(f"\n⏰ Completed at: {datetime.now().isoformat()}")
         print("=" * 80)
 
 if __name__ == "__main__":
-    tester = FleetPulseAPITester()
-    tester.run_all_tests()
\ No newline at end of file
+    # Number of scenario groups to run at once; 1 keeps the classic serial run
+    workers = int(os.environ.get("PARALLEL_WORKERS", "1"))
+    transport = PooledTransport(pool_size=max(10, workers))
+    if CACHE_TTL:
+        from response_cache import CachingTransport, ResponseCache
+        transport = CachingTransport(transport, ResponseCache(ttl=float(CACHE_TTL)))
+    tester = FleetPulseAPITester(transport=transport, sink=ResultSink(RESULTS_FILE))
+    # run_all_tests never overlaps the streaming scenario with another one
+    tester.trace_stream_memory = True
+    if PROFILE_SCENARIOS:
+        from server_profiler import ServerProfiler
+        scenarios = None if PROFILE_SCENARIOS == "all" else PROFILE_SCENARIOS.split(",")
+        ServerProfiler(scenarios=scenarios).attach(tester)
+    try:
+        tester.run_all_tests(workers=workers)
+        profiles = tester.profiler.to_dict() if tester.profiler else None
+        tester.metrics.export(METRICS_FILE, profiles=profiles)
+        print(f"📝 Metrics written to {METRICS_FILE}, results streamed to {RESULTS_FILE}")
+        if tester.profiler:
+            print(f"🔬 Profile manifest written to {tester.profiler.export()}")
+    finally:
+        tester.transport.close()
+        tester.sink.close()
\ No newline at end of file
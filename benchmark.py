@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Benchmark Suite
+Repeatable warm-up + measurement rounds per endpoint, gated against stored baselines
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from backend_test import BASE_URL, FleetPulseAPITester
+from http_transport import PooledTransport
+from request_metrics import RequestMetrics
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baselines")
+
+# Every route served by app/api/[[...path]]/route.js: (method, path, json body)
+BENCHMARK_ENDPOINTS = [
+    ("GET", "/", None),
+    ("GET", "/fleet/overview", None),
+    ("GET", "/fleet/vehicles", None),
+    ("GET", "/fleet/drivers", None),
+    ("GET", "/fleet/routes", None),
+    ("GET", "/fleet/compliance", None),
+    ("GET", "/fleet/analytics", None),
+    ("GET", "/ai/query?q=fuel efficiency", None),
+    ("POST", "/ai/query", {"query": "How is our fuel efficiency trending?"}),
+    ("POST", "/calculate-roi", {"trucks": 15, "monthlyFuelCost": 180000, "accidentsPerYear": 3}),
+]
+
+
+def endpoint_key(method, path):
+    return f"{method} {path.split('?', 1)[0]}"
+
+
+class BenchmarkSuite:
+    """Warm-up then N measurement rounds of M sequential requests per endpoint"""
+    def __init__(self, tester=None, endpoints=None, warmup=10, rounds=5, requests_per_round=20):
+        if rounds < 1 or requests_per_round < 1:
+            raise ValueError("rounds and requests_per_round must be at least 1")
+        # No retries: a transient 5xx has to reach the error_rate gate
+        self.tester = tester or FleetPulseAPITester(verbose=False,
+                                                    transport=PooledTransport(retries=0))
+        self.endpoints = endpoints or BENCHMARK_ENDPOINTS
+        self.warmup = warmup
+        self.rounds = rounds
+        self.requests_per_round = requests_per_round
+
+    def _send(self, method, path, body):
+        if body is None:
+            return self.tester.client.request(method, path)
+        return self.tester.client.request(method, path, json=body)
+
+    def _measure_round(self, method, path, body):
+        metrics = RequestMetrics()
+        self.tester.request_hooks.append(metrics)
+        try:
+            start = time.perf_counter()
+            for _ in range(self.requests_per_round):
+                try:
+                    self._send(method, path, body)
+                except Exception:
+                    pass  # already counted as an error by the metrics hook
+            elapsed = time.perf_counter() - start
+        finally:
+            self.tester.request_hooks.remove(metrics)
+        endpoint = metrics.endpoints[endpoint_key(method, path)]
+        # RequestMetrics lets 4xx through for the tester's 404 check, but every
+        # benchmarked route is expected to succeed
+        client_errors = sum(n for code, n in endpoint.status_codes.items() if 400 <= code < 500)
+        return {
+            "p50_ms": endpoint.wall.percentile(50) * 1000,
+            "p95_ms": endpoint.wall.percentile(95) * 1000,
+            "throughput": self.requests_per_round / elapsed if elapsed else 0.0,
+            "errors": endpoint.errors + client_errors,
+        }
+
+    def run(self):
+        """Benchmark every endpoint; returns a baseline-shaped result dict"""
+        results = {}
+        for method, path, body in self.endpoints:
+            for _ in range(self.warmup):
+                try:
+                    self._send(method, path, body)
+                except Exception:
+                    pass
+            rounds = [self._measure_round(method, path, body) for _ in range(self.rounds)]
+            total = self.rounds * self.requests_per_round
+            # Medians across rounds keep one noisy round from moving the result
+            results[endpoint_key(method, path)] = {
+                "p50_ms": statistics.median(r["p50_ms"] for r in rounds),
+                "p95_ms": statistics.median(r["p95_ms"] for r in rounds),
+                "throughput": statistics.median(r["throughput"] for r in rounds),
+                "error_rate": sum(r["errors"] for r in rounds) / total if total else 0.0,
+            }
+        return {
+            "created": datetime.now().isoformat(),
+            "base_url": self.tester.base_url,
+            "config": {
+                "warmup": self.warmup,
+                "rounds": self.rounds,
+                "requests_per_round": self.requests_per_round,
+            },
+            "endpoints": results,
+        }
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(result, name):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = baseline_path(name)
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    return path
+
+
+def load_baseline(name):
+    with open(baseline_path(name)) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, latency_threshold=0.2, throughput_threshold=0.2, min_delta_ms=1.0):
+    """Rows describing every metric change; rows with "regressed" set fail the gate
+
+    Latency regresses when it grows by more than ``latency_threshold`` (fraction)
+    and by at least ``min_delta_ms``, so sub-millisecond jitter on a fast route
+    does not trip the gate. Throughput regresses when it drops by more than
+    ``throughput_threshold``. Any new errors on a previously clean endpoint regress,
+    and so does a baseline endpoint missing from the run, so a dropped route cannot
+    pass the gate unmeasured.
+    """
+    rows = []
+    for key in baseline["endpoints"]:
+        if key not in current["endpoints"]:
+            rows.append({"endpoint": key, "metric": "-", "baseline": None, "current": None,
+                         "change": None, "regressed": True, "note": "missing from run"})
+    for key, now in current["endpoints"].items():
+        before = baseline["endpoints"].get(key)
+        if before is None:
+            rows.append({"endpoint": key, "metric": "-", "baseline": None, "current": None,
+                         "change": None, "regressed": False, "note": "no baseline"})
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            change = (now[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+            regressed = (change > latency_threshold
+                         and now[metric] - before[metric] >= min_delta_ms)
+            rows.append({"endpoint": key, "metric": metric, "baseline": before[metric],
+                         "current": now[metric], "change": change, "regressed": regressed})
+        change = ((now["throughput"] - before["throughput"]) / before["throughput"]
+                  if before["throughput"] else 0.0)
+        rows.append({"endpoint": key, "metric": "throughput", "baseline": before["throughput"],
+                     "current": now["throughput"], "change": change,
+                     "regressed": change < -throughput_threshold})
+        rows.append({"endpoint": key, "metric": "error_rate", "baseline": before["error_rate"],
+                     "current": now["error_rate"], "change": now["error_rate"] - before["error_rate"],
+                     "regressed": before["error_rate"] == 0 and now["error_rate"] > 0})
+    return rows
+
+
+def print_comparison(rows):
+    print(f"{'Endpoint':<24}{'Metric':<12}{'Baseline':>11}{'Current':>11}{'Change':>10}")
+    for row in rows:
+        if row.get("note") == "missing from run":
+            print(f"{row['endpoint']:<24}{'(in baseline, missing from this run)':<34}"
+                  "  ❌ REGRESSED")
+            continue
+        if row["baseline"] is None:
+            print(f"{row['endpoint']:<24}{'(new endpoint, no baseline)':<34}")
+            continue
+        marker = "  ❌ REGRESSED" if row["regressed"] else ""
+        print(f"{row['endpoint']:<24}{row['metric']:<12}{row['baseline']:>11.2f}"
+              f"{row['current']:>11.2f}{row['change']:>+10.1%}{marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FleetPulse API benchmark with baseline gating")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--baseline", default="default", help="baseline name under benchmarks/baselines")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the baseline instead of comparing")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=20, help="requests per round")
+    parser.add_argument("--latency-threshold", type=float, default=0.2,
+                        help="allowed fractional latency increase (default 0.2 = 20%%)")
+    parser.add_argument("--throughput-threshold", type=float, default=0.2,
+                        help="allowed fractional throughput drop (default 0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    if args.rounds < 1 or args.requests < 1:
+        parser.error("--rounds and --requests must be at least 1")
+
+    tester = FleetPulseAPITester(base_url=args.base_url, verbose=False,
+                                 transport=PooledTransport(retries=0))
+    suite = BenchmarkSuite(tester, warmup=args.warmup, rounds=args.rounds,
+                           requests_per_round=args.requests)
+    print(f"🚀 Benchmarking {len(suite.endpoints)} endpoints at {args.base_url}")
+    try:
+        result = suite.run()
+    finally:
+        tester.transport.close()
+
+    if args.save_baseline:
+        path = save_baseline(result, args.baseline)
+        print(f"📝 Baseline saved to {path}")
+        return 0
+
+    try:
+        baseline = load_baseline(args.baseline)
+    except FileNotFoundError:
+        print(f"❌ No baseline '{args.baseline}' found; run with --save-baseline first")
+        return 2
+
+    rows = compare(baseline, result, args.latency_threshold, args.throughput_threshold,
+                   args.min_delta_ms)
+    print_comparison(rows)
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against baseline '{args.baseline}'")
+        return 1
+    print(f"\n✅ No regressions against baseline '{args.baseline}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Fleet Generator
+Streams seeded synthetic fleets (vehicles, drivers, GPS telemetry, time series) at production scale
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+# (city, state, RTO state code, lat, lng)
+CITIES = [
+    ("Mumbai", "Maharashtra", "MH", 19.0760, 72.8777),
+    ("Pune", "Maharashtra", "MH", 18.5204, 73.8567),
+    ("Nagpur", "Maharashtra", "MH", 21.1458, 79.0882),
+    ("Ahmedabad", "Gujarat", "GJ", 23.0225, 72.5714),
+    ("Surat", "Gujarat", "GJ", 21.1702, 72.8311),
+    ("Delhi", "Delhi", "DL", 28.7041, 77.1025),
+    ("Bengaluru", "Karnataka", "KA", 12.9716, 77.5946),
+    ("Chennai", "Tamil Nadu", "TN", 13.0827, 80.2707),
+    ("Hyderabad", "Telangana", "TS", 17.3850, 78.4867),
+    ("Kolkata", "West Bengal", "WB", 22.5726, 88.3639),
+    ("Jaipur", "Rajasthan", "RJ", 26.9124, 75.7873),
+    ("Lucknow", "Uttar Pradesh", "UP", 26.8467, 80.9462),
+    ("Indore", "Madhya Pradesh", "MP", 22.7196, 75.8577),
+]
+
+FIRST_NAMES = ["Rajesh", "Amit", "Priya", "Suresh", "Anita", "Vikram", "Sunita", "Manoj",
+               "Deepak", "Kavita", "Ravi", "Pooja", "Sanjay", "Neha", "Arjun", "Lakshmi",
+               "Imran", "Gurpreet", "Karthik", "Meena"]
+LAST_NAMES = ["Kumar", "Patel", "Sharma", "Singh", "Reddy", "Iyer", "Nair", "Gupta", "Yadav",
+              "Khan", "Das", "Joshi", "Verma", "Mehta", "Rao", "Chauhan"]
+# I and O are not issued in registration series
+SERIES_LETTERS = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+
+# Columnar telemetry layout: (name, array typecode)
+TELEMETRY_COLUMNS = [
+    ("vehicle", "I"),
+    ("timestamp", "q"),
+    ("lat", "d"),
+    ("lng", "d"),
+    ("speed", "f"),
+    ("fuel", "f"),
+]
+COLUMNAR_MAGIC = b"FPCOL1\n"
+
+
+def entity_rng(seed, kind, index):
+    """Independent stream per entity so any slice of the fleet is reproducible"""
+    return random.Random(f"{seed}:{kind}:{index}")
+
+
+# District (01-99) x two-letter series x number (0001-9999) available per state code
+REGISTRATION_SPACE = 99 * len(SERIES_LETTERS) ** 2 * 9999
+# Prime outside the space's factors (2, 3, 11, 101), so index -> slot is a bijection
+REGISTRATION_STRIDE = 2654435761
+
+
+def registration_number(index, state_code, offset=0):
+    """Registration for vehicle ``index``; unique per fleet up to REGISTRATION_SPACE vehicles
+
+    The index is scattered across the district/series/number space starting at
+    ``offset``, so IDs look random but never collide.
+    """
+    slot = (index * REGISTRATION_STRIDE + offset) % REGISTRATION_SPACE
+    slot, number = divmod(slot, 9999)
+    slot, second = divmod(slot, len(SERIES_LETTERS))
+    district, first = divmod(slot, len(SERIES_LETTERS))
+    series = SERIES_LETTERS[first] + SERIES_LETTERS[second]
+    return f"{state_code}-{district + 1:02d}-{series}-{number + 1:04d}"
+
+
+def driver_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="milliseconds").replace(
+        "+00:00", "Z")
+
+
+class FleetGenerator:
+    """Seeded, constant-memory streams shaped like the FleetPulse API payloads
+
+    Every record is derived from ``(seed, kind, index)`` alone, so output is
+    identical across runs and any range can be regenerated without the rest.
+    """
+    def __init__(self, vehicles=10000, seed=0, active_ratio=0.85, start=None):
+        if vehicles > REGISTRATION_SPACE:
+            raise ValueError(f"At most {REGISTRATION_SPACE:,} vehicles have unique registrations")
+        self.vehicle_count = vehicles
+        self.seed = seed
+        self.active_ratio = active_ratio
+        self.registration_offset = random.Random(f"{seed}:registration").randrange(REGISTRATION_SPACE)
+        # Fixed default epoch keeps timestamps reproducible between runs
+        self.start = start if start is not None else datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+
+    def vehicle(self, index):
+        """One vehicle in the /fleet/vehicles item shape"""
+        rng = entity_rng(self.seed, "vehicle", index)
+        city, state, code, lat, lng = rng.choice(CITIES)
+        active = rng.random() < self.active_ratio
+        # Deterministic driver assignment: vehicle i is driven by driver i
+        driver = driver_name(entity_rng(self.seed, "driver", index))
+        return {
+            "id": registration_number(index, code, self.registration_offset),
+            "driver": driver,
+            "status": "active" if active else "inactive",
+            "location": {
+                "lat": round(lat + rng.gauss(0, 0.15), 4),
+                "lng": round(lng + rng.gauss(0, 0.15), 4),
+                "address": city if city == state else f"{city}, {state}",
+            },
+            "speed": rng.randint(20, 80) if active else 0,
+            "fuel": rng.randint(10, 100),
+            "lastUpdate": iso(self.start),
+        }
+
+    def vehicles(self, start=0, stop=None):
+        for index in range(start, self.vehicle_count if stop is None else stop):
+            yield self.vehicle(index)
+
+    def driver(self, index):
+        """One driver in the /fleet/drivers item shape"""
+        rng = entity_rng(self.seed, "driver", index)
+        name = driver_name(rng)
+        violations = min(int(rng.expovariate(1.5)), 9)
+        safety = max(50, min(100, round(rng.gauss(93, 4)) - violations * 2))
+        return {
+            "id": f"D{index + 1:06d}",
+            "name": name,
+            "safetyScore": safety,
+            "totalDistance": rng.randint(1000, 250000),
+            "violations": violations,
+            "rating": round(max(1.0, min(5.0, rng.gauss(4.6, 0.25))), 1),
+        }
+
+    def drivers(self, start=0, stop=None):
+        for index in range(start, self.vehicle_count if stop is None else stop):
+            yield self.driver(index)
+
+    def telemetry(self, readings_per_vehicle=100, interval=60, start=0, stop=None):
+        """GPS/speed/fuel readings, vehicle by vehicle, as flat dicts"""
+        for index in range(start, self.vehicle_count if stop is None else stop):
+            yield from self._trace(index, readings_per_vehicle, interval)
+
+    def _trace(self, index, readings, interval):
+        vehicle = self.vehicle(index)
+        rng = entity_rng(self.seed, "trace", index)
+        lat = vehicle["location"]["lat"]
+        lng = vehicle["location"]["lng"]
+        heading = rng.uniform(0, 2 * math.pi)
+        speed = float(vehicle["speed"])
+        fuel = float(vehicle["fuel"])
+        active = vehicle["status"] == "active"
+        for step in range(readings):
+            if active:
+                speed = max(0.0, min(100.0, speed + rng.gauss(0, 4)))
+                heading += rng.gauss(0, 0.2)
+                km = speed * interval / 3600
+                lat += km / 111.0 * math.cos(heading)
+                lng += km / (111.0 * math.cos(math.radians(lat))) * math.sin(heading)
+                fuel -= km * 0.05
+                if fuel < 10:
+                    fuel = rng.uniform(85, 100)  # refuelled
+            yield {
+                "vehicleId": vehicle["id"],
+                "vehicle": index,
+                "timestamp": int(self.start) + step * interval,
+                "lat": round(lat, 6),
+                "lng": round(lng, 6),
+                "speed": round(speed, 1),
+                "fuel": round(fuel, 1),
+            }
+
+    def time_series(self, days=7):
+        """fuelEfficiency and safetyScores series in the /fleet/analytics timeSeries shape"""
+        rng = entity_rng(self.seed, "series", 0)
+        first = datetime.fromtimestamp(self.start, timezone.utc).date()
+        fuel, safety = 6.0, 90.0
+        fuel_points, safety_points = [], []
+        for day in range(days):
+            fuel = max(4.0, min(8.5, fuel + rng.gauss(0.02, 0.15)))
+            safety = max(60.0, min(100.0, safety + rng.gauss(0.1, 1.2)))
+            stamp = (first + timedelta(days=day)).isoformat()
+            fuel_points.append({"date": stamp, "value": round(fuel, 1)})
+            safety_points.append({"date": stamp, "value": round(safety)})
+        return {"fuelEfficiency": fuel_points, "safetyScores": safety_points}
+
+    def mock_fleet_data(self):
+        """Overrides for MOCK_FLEET_DATA that seed the stub server with a large fleet"""
+        vehicles = list(self.vehicles())
+        active = sum(1 for vehicle in vehicles if vehicle["status"] == "active")
+        return {
+            "vehicles": vehicles,
+            "drivers": list(self.drivers()),
+            "analytics": {
+                "totalVehicles": len(vehicles),
+                "activeVehicles": active,
+                "totalDistance": 50 * active,
+                "fuelEfficiency": 6.2,
+                "safetyScore": 94,
+                "monthlyFuelCost": 8750 * len(vehicles),
+                "accidentReduction": 40,
+                "costSavings": {"monthly": 1700 * len(vehicles), "annual": 20400 * len(vehicles)},
+            },
+            "compliance": {
+                "permits": {"valid": len(vehicles), "expiring": 0, "expired": 0},
+                "insurance": {"valid": len(vehicles), "expiring": 0, "expired": 0},
+                "maintenance": {"upToDate": len(vehicles), "due": 0, "overdue": 0},
+            },
+        }
+
+
+def write_jsonl(records, path):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def write_columnar(readings, path, row_group_size=65536):
+    """Write telemetry as row groups of packed column arrays (stdlib ``array``)
+
+    File layout: magic, uint32 header length, JSON header, then per row group a
+    uint32 row count followed by each column's raw little-endian array bytes.
+    """
+    header = json.dumps({"columns": TELEMETRY_COLUMNS, "byteorder": "little"}).encode()
+    count = 0
+    with open(path, "wb") as f:
+        f.write(COLUMNAR_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        columns = {name: array(code) for name, code in TELEMETRY_COLUMNS}
+
+        def flush():
+            rows = len(columns["vehicle"])
+            if not rows:
+                return
+            f.write(struct.pack("<I", rows))
+            for name, _code in TELEMETRY_COLUMNS:
+                column = columns[name]
+                if sys.byteorder != "little":
+                    column.byteswap()
+                column.tofile(f)
+                del column[:]
+
+        for reading in readings:
+            for name, _code in TELEMETRY_COLUMNS:
+                columns[name].append(reading[name])
+            count += 1
+            if len(columns["vehicle"]) >= row_group_size:
+                flush()
+        flush()
+    return count
+
+
+def read_columnar(path):
+    """Yield row groups as {column: array} written by write_columnar"""
+    with open(path, "rb") as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a FleetPulse columnar file")
+        (header_length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_length))
+        while True:
+            raw = f.read(4)
+            if not raw:
+                return
+            (rows,) = struct.unpack("<I", raw)
+            group = {}
+            for name, code in header["columns"]:
+                column = array(code)
+                column.fromfile(f, rows)
+                if sys.byteorder != "little":
+                    column.byteswap()
+                group[name] = column
+            yield group
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FleetPulse synthetic fleet generator")
+    parser.add_argument("--vehicles", type=int, default=10000)
+    parser.add_argument("--readings", type=int, default=100, help="telemetry readings per vehicle")
+    parser.add_argument("--interval", type=int, default=60, help="seconds between readings")
+    parser.add_argument("--days", type=int, default=30, help="analytics time series length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["jsonl", "columnar"], default="jsonl",
+                        help="telemetry output format")
+    parser.add_argument("--out", default="generated_fleet")
+    args = parser.parse_args()
+
+    generator = FleetGenerator(vehicles=args.vehicles, seed=args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    print(f"🚀 Generating {args.vehicles:,} vehicles (seed {args.seed}) into {args.out}/")
+
+    start = time.perf_counter()
+    count = write_jsonl(generator.vehicles(), os.path.join(args.out, "vehicles.jsonl"))
+    print(f"  • vehicles.jsonl: {count:,} records")
+    count = write_jsonl(generator.drivers(), os.path.join(args.out, "drivers.jsonl"))
+    print(f"  • drivers.jsonl: {count:,} records")
+    readings = generator.telemetry(args.readings, args.interval)
+    if args.format == "columnar":
+        name = "telemetry.fpcol"
+        count = write_columnar(readings, os.path.join(args.out, name))
+    else:
+        name = "telemetry.jsonl"
+        count = write_jsonl(readings, os.path.join(args.out, name))
+    print(f"  • {name}: {count:,} readings")
+    with open(os.path.join(args.out, "analytics.json"), "w") as f:
+        json.dump({"timeSeries": generator.time_series(args.days)}, f, indent=2)
+    print(f"  • analytics.json: {args.days} days")
+    print(f"⏰ Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Python Client
+Typed models and sync/async clients for the FleetPulse API
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_transport import PooledTransport
+from stream_validator import StreamingArrayParser
+
+DEFAULT_BASE_URL = "http://localhost:3000/api"
+
+
+class FleetPulseAPIError(Exception):
+    """Non-2xx response from the FleetPulse API"""
+    def __init__(self, status_code, payload, path):
+        self.status_code = status_code
+        self.payload = payload
+        self.path = path
+        message = payload.get("error") if isinstance(payload, dict) else payload
+        super().__init__(f"HTTP {status_code} from {path}: {message}")
+
+
+class Location:
+    __slots__ = ("lat", "lng", "address")
+
+    def __init__(self, lat, lng, address=None):
+        self.lat = lat
+        self.lng = lng
+        self.address = address
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["lat"], data["lng"], data.get("address"))
+
+    def to_dict(self):
+        return {"lat": self.lat, "lng": self.lng, "address": self.address}
+
+
+class Vehicle:
+    __slots__ = ("id", "driver", "status", "location", "speed", "fuel", "last_update")
+
+    def __init__(self, id, driver, status, location, speed, fuel, last_update=None):
+        self.id = id
+        self.driver = driver
+        self.status = status
+        self.location = location
+        self.speed = speed
+        self.fuel = fuel
+        self.last_update = last_update
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], data["driver"], data["status"], Location.from_dict(data["location"]),
+                   data["speed"], data["fuel"], data.get("lastUpdate"))
+
+    def to_dict(self):
+        return {"id": self.id, "driver": self.driver, "status": self.status,
+                "location": self.location.to_dict(), "speed": self.speed, "fuel": self.fuel,
+                "lastUpdate": self.last_update}
+
+    @property
+    def active(self):
+        return self.status == "active"
+
+
+class Driver:
+    __slots__ = ("id", "name", "safety_score", "total_distance", "violations", "rating")
+
+    def __init__(self, id, name, safety_score, total_distance, violations, rating):
+        self.id = id
+        self.name = name
+        self.safety_score = safety_score
+        self.total_distance = total_distance
+        self.violations = violations
+        self.rating = rating
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], data["name"], data["safetyScore"], data["totalDistance"],
+                   data["violations"], data["rating"])
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "safetyScore": self.safety_score,
+                "totalDistance": self.total_distance, "violations": self.violations,
+                "rating": self.rating}
+
+
+class Route:
+    __slots__ = ("id", "name", "distance", "estimated_time", "traffic", "fuel_cost")
+
+    def __init__(self, id, name, distance, estimated_time, traffic, fuel_cost):
+        self.id = id
+        self.name = name
+        self.distance = distance
+        self.estimated_time = estimated_time
+        self.traffic = traffic
+        self.fuel_cost = fuel_cost
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], data["name"], data["distance"], data["estimatedTime"],
+                   data["traffic"], data["fuelCost"])
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "distance": self.distance,
+                "estimatedTime": self.estimated_time, "traffic": self.traffic,
+                "fuelCost": self.fuel_cost}
+
+
+class Compliance:
+    """Counts per compliance category, e.g. permits -> {"valid": 25, "expiring": 3, ...}"""
+    __slots__ = ("permits", "insurance", "maintenance")
+
+    def __init__(self, permits, insurance, maintenance):
+        self.permits = permits
+        self.insurance = insurance
+        self.maintenance = maintenance
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(dict(data["permits"]), dict(data["insurance"]), dict(data["maintenance"]))
+
+    def to_dict(self):
+        return {"permits": self.permits, "insurance": self.insurance,
+                "maintenance": self.maintenance}
+
+
+class TimeSeriesPoint:
+    __slots__ = ("date", "value")
+
+    def __init__(self, date, value):
+        self.date = date
+        self.value = value
+
+    def to_dict(self):
+        return {"date": self.date, "value": self.value}
+
+
+class Analytics:
+    __slots__ = ("total_vehicles", "active_vehicles", "total_distance", "fuel_efficiency",
+                 "safety_score", "monthly_fuel_cost", "accident_reduction", "cost_savings",
+                 "fuel_efficiency_series", "safety_score_series", "cost_savings_breakdown",
+                 "last_updated")
+
+    def __init__(self, total_vehicles, active_vehicles, total_distance, fuel_efficiency,
+                 safety_score, monthly_fuel_cost, accident_reduction=None, cost_savings=None,
+                 fuel_efficiency_series=(), safety_score_series=(), cost_savings_breakdown=None,
+                 last_updated=None):
+        self.total_vehicles = total_vehicles
+        self.active_vehicles = active_vehicles
+        self.total_distance = total_distance
+        self.fuel_efficiency = fuel_efficiency
+        self.safety_score = safety_score
+        self.monthly_fuel_cost = monthly_fuel_cost
+        self.accident_reduction = accident_reduction
+        self.cost_savings = cost_savings
+        self.fuel_efficiency_series = list(fuel_efficiency_series)
+        self.safety_score_series = list(safety_score_series)
+        self.cost_savings_breakdown = cost_savings_breakdown
+        self.last_updated = last_updated
+
+    @classmethod
+    def from_dict(cls, data):
+        series = data.get("timeSeries") or {}
+        return cls(
+            data["totalVehicles"], data["activeVehicles"], data["totalDistance"],
+            data["fuelEfficiency"], data["safetyScore"], data["monthlyFuelCost"],
+            data.get("accidentReduction"), data.get("costSavings"),
+            [TimeSeriesPoint(p["date"], p["value"]) for p in series.get("fuelEfficiency", ())],
+            [TimeSeriesPoint(p["date"], p["value"]) for p in series.get("safetyScores", ())],
+            (series.get("costSavings") or {}).get("breakdown"),
+            data.get("lastUpdated"),
+        )
+
+
+class FleetOverview:
+    __slots__ = ("analytics", "vehicles", "last_updated")
+
+    def __init__(self, analytics, vehicles, last_updated):
+        self.analytics = analytics
+        self.vehicles = vehicles
+        self.last_updated = last_updated
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(Analytics.from_dict(data["analytics"]),
+                   [Vehicle.from_dict(v) for v in data["vehicles"]], data.get("lastUpdated"))
+
+
+class AIAnswer:
+    __slots__ = ("query", "response", "suggestions", "timestamp")
+
+    def __init__(self, query, response, suggestions, timestamp):
+        self.query = query
+        self.response = response
+        self.suggestions = suggestions
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("query"), data["response"], data["suggestions"], data["timestamp"])
+
+
+# List endpoints: name -> (path, array key, model)
+LIST_ENDPOINTS = {
+    "vehicles": ("/fleet/vehicles", "vehicles", Vehicle),
+    "drivers": ("/fleet/drivers", "drivers", Driver),
+    "routes": ("/fleet/routes", "routes", Route),
+}
+
+# Argument-free getters fetch_many may call by name
+FETCH_ENDPOINTS = ("overview", "vehicles", "drivers", "routes", "compliance", "analytics")
+
+
+def fetchable(names):
+    names = list(names)
+    unknown = [name for name in names if name not in FETCH_ENDPOINTS]
+    if unknown:
+        raise ValueError(f"Unknown endpoints {unknown}; choose from {list(FETCH_ENDPOINTS)}")
+    return names
+
+
+class FleetPulseClient:
+    """Synchronous client over the pooled keep-alive transport
+
+    ``request_hooks`` are called as hook(method, endpoint, elapsed, response,
+    error) after every request, which is how FleetPulseAPITester collects its
+    latency metrics. Streamed requests return once the headers arrive, so their
+    endpoint is tagged "/path [stream]" to keep them apart from full-body timings.
+    """
+    def __init__(self, base_url=None, transport=None, max_workers=8):
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        self.transport = transport or PooledTransport(pool_size=max(10, max_workers))
+        self.max_workers = max_workers
+        self.request_hooks = []
+
+    def request(self, method, path, **kwargs):
+        """Send a raw request and notify request hooks with its timing"""
+        endpoint = path.split("?", 1)[0]
+        if kwargs.get("stream"):
+            endpoint += " [stream]"
+        start = time.perf_counter()
+        response = None
+        error = None
+        try:
+            response = self.transport.request(method, f"{self.base_url}{path}", **kwargs)
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            for hook in self.request_hooks:
+                hook(method, endpoint, elapsed, response, error)
+
+    def _json(self, method, path, **kwargs):
+        response = self.request(method, path, **kwargs)
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = response.text
+        if not 200 <= response.status_code < 300:
+            raise FleetPulseAPIError(response.status_code, payload, path)
+        return payload
+
+    def overview(self):
+        return FleetOverview.from_dict(self._json("GET", "/fleet/overview"))
+
+    def vehicles(self):
+        return [Vehicle.from_dict(v) for v in self._json("GET", "/fleet/vehicles")["vehicles"]]
+
+    def drivers(self):
+        return [Driver.from_dict(d) for d in self._json("GET", "/fleet/drivers")["drivers"]]
+
+    def routes(self):
+        return [Route.from_dict(r) for r in self._json("GET", "/fleet/routes")["routes"]]
+
+    def compliance(self):
+        return Compliance.from_dict(self._json("GET", "/fleet/compliance"))
+
+    def analytics(self):
+        return Analytics.from_dict(self._json("GET", "/fleet/analytics"))
+
+    def ask(self, query, method="POST"):
+        if method == "GET":
+            return AIAnswer.from_dict(self._json("GET", "/ai/query", params={"q": query}))
+        return AIAnswer.from_dict(self._json("POST", "/ai/query", json={"query": query}))
+
+    def calculate_roi(self, trucks, monthly_fuel_cost, accidents_per_year):
+        return self._json("POST", "/calculate-roi", json={
+            "trucks": trucks, "monthlyFuelCost": monthly_fuel_cost,
+            "accidentsPerYear": accidents_per_year})
+
+    def fetch_many(self, names):
+        """Fetch several endpoints concurrently: {"vehicles": [...], "compliance": ...}"""
+        names = fetchable(names)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names) or 1)) as executor:
+            futures = {name: executor.submit(getattr(self, name)) for name in names}
+            return {name: future.result() for name, future in futures.items()}
+
+    def iter_pages(self, name, page_size=500):
+        """Yield lists of at most ``page_size`` models while the list streams in"""
+        path, key, model = LIST_ENDPOINTS[name]
+        response = self.request("GET", path, stream=True)
+        try:
+            if response.status_code != 200:
+                raise FleetPulseAPIError(response.status_code, response.text, path)
+            page = []
+            for item in StreamingArrayParser(response.iter_content(64 * 1024), key):
+                page.append(model.from_dict(item))
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+            if page:
+                yield page
+        finally:
+            response.close()
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncFleetPulseClient:
+    """asyncio facade over FleetPulseClient
+
+    Requests run on a thread pool sharing the sync client's keep-alive pool,
+    so coroutines can fan out with asyncio.gather without another HTTP stack.
+    asyncio is imported on first use so sync-only callers never load it.
+    """
+    def __init__(self, base_url=None, transport=None, max_workers=16):
+        self.client = FleetPulseClient(base_url, transport, max_workers=max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    async def _call(self, func, *args, **kwargs):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def overview(self):
+        return await self._call(self.client.overview)
+
+    async def vehicles(self):
+        return await self._call(self.client.vehicles)
+
+    async def drivers(self):
+        return await self._call(self.client.drivers)
+
+    async def routes(self):
+        return await self._call(self.client.routes)
+
+    async def compliance(self):
+        return await self._call(self.client.compliance)
+
+    async def analytics(self):
+        return await self._call(self.client.analytics)
+
+    async def ask(self, query, method="POST"):
+        return await self._call(self.client.ask, query, method)
+
+    async def calculate_roi(self, trucks, monthly_fuel_cost, accidents_per_year):
+        return await self._call(self.client.calculate_roi, trucks, monthly_fuel_cost,
+                                accidents_per_year)
+
+    async def fetch_many(self, names):
+        import asyncio
+        names = fetchable(names)
+        results = await asyncio.gather(*(getattr(self, name)() for name in names))
+        return dict(zip(names, results))
+
+    async def iter_pages(self, name, page_size=500):
+        pages = self.client.iter_pages(name, page_size)
+        sentinel = object()
+        try:
+            while True:
+                page = await self._call(next, pages, sentinel)
+                if page is sentinel:
+                    return
+                yield page
+        finally:
+            pages.close()
+
+    async def close(self):
+        self._executor.shutdown(wait=True)
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
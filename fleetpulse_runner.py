@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Test Runner
+Fast-start CLI for selected suites and endpoint probes with JUnit/JSON reports
+"""
+
+import time
+
+# Taken before the remaining imports so the reported startup time includes them
+STARTED = time.perf_counter()
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+# Same default as backend_test.BASE_URL, duplicated so probes never import the harness
+DEFAULT_BASE_URL = os.environ.get("FLEETPULSE_BASE_URL", "http://localhost:3000/api")
+
+# Probe name -> (method, path, required top-level fields)
+ENDPOINTS = {
+    "root": ("GET", "/", ["message", "timestamp", "version"]),
+    "overview": ("GET", "/fleet/overview", ["analytics", "vehicles", "lastUpdated"]),
+    "vehicles": ("GET", "/fleet/vehicles", ["vehicles", "count"]),
+    "drivers": ("GET", "/fleet/drivers", ["drivers", "count"]),
+    "routes": ("GET", "/fleet/routes", ["routes", "count"]),
+    "compliance": ("GET", "/fleet/compliance", ["permits", "insurance", "maintenance"]),
+    "analytics": ("GET", "/fleet/analytics", ["timeSeries", "totalVehicles", "lastUpdated"]),
+    "ai": ("GET", "/ai/query?q=fuel", ["query", "response", "suggestions", "timestamp"]),
+    "roi": ("POST", "/calculate-roi", ["monthlySavings", "annualSavings", "roi", "breakdown"]),
+    "ai-post": ("POST", "/ai/query", ["query", "response", "suggestions", "timestamp"]),
+}
+
+# JSON bodies sent with POST probes, the same canonical payloads the tester uses
+PROBE_BODIES = {
+    "/calculate-roi": {"trucks": 15, "monthlyFuelCost": 180000, "accidentsPerYear": 3},
+    "/ai/query": {"query": "How is our fuel efficiency trending?"},
+}
+
+
+def resolve_endpoint(name):
+    """(method, path, fields) for a probe name, "/raw/path" or "METHOD /raw/path" """
+    if name in ENDPOINTS:
+        return ENDPOINTS[name]
+    method, _, path = name.rpartition(" ")
+    if path.startswith("/"):
+        return (method or "GET").upper(), path, []
+    raise ValueError(f"Unknown endpoint {name!r}; use one of {sorted(ENDPOINTS)} or a /path")
+
+
+def probe_endpoint(base_url, name, timeout=10.0):
+    """One request over a bare http.client connection, so probes skip the requests import
+
+    POSTs to paths in PROBE_BODIES send that JSON body, others an empty object.
+    """
+    import http.client
+    from urllib.parse import urlsplit
+
+    method, path, fields = resolve_endpoint(name)
+    parts = urlsplit(base_url.rstrip("/") + path)
+    connection_class = (http.client.HTTPSConnection if parts.scheme == "https"
+                        else http.client.HTTPConnection)
+    result = {"test": f"{method} {parts.path}", "suite": "endpoints", "success": False,
+              "timestamp": datetime.now().isoformat()}
+    headers = {"Accept": "application/json"}
+    body = None
+    if method == "POST":
+        body = json.dumps(PROBE_BODIES.get(path.split("?", 1)[0], {}))
+        headers["Content-Type"] = "application/json"
+    start = time.perf_counter()
+    try:
+        connection = connection_class(parts.netloc, timeout=timeout)
+        try:
+            connection.request(method, parts.path + (f"?{parts.query}" if parts.query else ""),
+                               body=body, headers=headers)
+            response = connection.getresponse()
+            result["ttfb"] = time.perf_counter() - start
+            body = response.read()
+        finally:
+            connection.close()
+        result["time"] = time.perf_counter() - start
+        result["status"] = response.status
+        result["bytes"] = len(body)
+        if response.status != 200:
+            result["details"] = f"HTTP {response.status}: {body[:200].decode(errors='replace')}"
+            return result
+        data = json.loads(body)
+        missing = [field for field in fields if field not in data]
+        if missing:
+            result["details"] = f"Missing fields: {missing}"
+            return result
+        result["success"] = True
+        result["details"] = f"HTTP 200, {len(body):,} bytes, TTFB {result['ttfb'] * 1000:.1f}ms"
+    except (OSError, ValueError, http.client.HTTPException) as e:
+        result.setdefault("time", time.perf_counter() - start)
+        result["details"] = f"Exception: {e}"
+    return result
+
+
+class SuiteCollector:
+    """Result sink for the tester that times each check since the previous one"""
+    def __init__(self):
+        self.results = []
+        self.total = 0
+        self.passed = 0
+        self.failed = 0
+        self._mark = time.perf_counter()
+
+    def start(self):
+        self.results = []
+        self._mark = time.perf_counter()
+
+    def write(self, result):
+        now = time.perf_counter()
+        self.results.append(dict(result, time=now - self._mark))
+        self._mark = now
+        self.total += 1
+        if result["success"]:
+            self.passed += 1
+        else:
+            self.failed += 1
+
+    def close(self):
+        pass
+
+
+def run_suites(base_url, names, timeout, retries):
+    """Run tester scenarios serially; returns (suites, per-endpoint metrics)"""
+    # Deferred: pulls in requests and every harness module
+    from backend_test import SCENARIOS, FleetPulseAPITester
+    from http_transport import PooledTransport
+
+    collector = SuiteCollector()
+    tester = FleetPulseAPITester(base_url, verbose=False,
+                                 transport=PooledTransport(timeout=timeout, retries=retries),
+                                 sink=collector)
+    # Suites run one at a time, so streaming validation can trace its memory
+    tester.trace_stream_memory = True
+    # Fast start: skip the pause between the overview dynamic-data calls
+    tester.dynamic_data_delay = 0
+    suites = []
+    try:
+        for name in names:
+            collector.start()
+            start = time.perf_counter()
+            try:
+                getattr(tester, SCENARIOS[name])()
+            except Exception as e:
+                collector.write({"test": name, "success": False, "details": f"Exception: {e}",
+                                 "timestamp": datetime.now().isoformat()})
+            suites.append({"name": name, "time": time.perf_counter() - start,
+                           "tests": [dict(result, suite=name) for result in collector.results]})
+    finally:
+        tester.transport.close()
+    return suites, tester.metrics.to_dict()
+
+
+def suite_names():
+    from backend_test import SCENARIOS
+    return list(SCENARIOS)
+
+
+def write_json(path, report):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+
+
+def write_junit(path, report):
+    import re
+    import xml.etree.ElementTree as ET
+
+    # Response bodies can carry control characters that XML 1.0 cannot represent at all
+    invalid = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+    def text(value):
+        return invalid.sub("\ufffd", str(value))
+
+    root = ET.Element("testsuites", name="fleetpulse", tests=str(report["summary"]["total"]),
+                      failures=str(report["summary"]["failed"]), time=f"{report['duration']:.3f}")
+    for suite in report["suites"]:
+        failures = sum(1 for test in suite["tests"] if not test["success"])
+        element = ET.SubElement(root, "testsuite", name=suite["name"],
+                                tests=str(len(suite["tests"])), failures=str(failures),
+                                time=f"{suite['time']:.3f}", timestamp=report["started_at"])
+        for test in suite["tests"]:
+            case = ET.SubElement(element, "testcase", classname=f"fleetpulse.{suite['name']}",
+                                 name=text(test["test"]), time=f"{test.get('time', 0):.3f}")
+            if not test["success"]:
+                ET.SubElement(case, "failure", message=text(test.get("details", ""))[:500])
+            elif test.get("details"):
+                ET.SubElement(case, "system-out").text = text(test["details"])
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def measure_cold_start(argv, runs):
+    """(wall times, exit codes) of fresh interpreter runs of this CLI with ``argv``"""
+    import subprocess
+
+    command = [sys.executable, os.path.abspath(__file__)] + argv + ["--quiet"]
+    timings = []
+    returncodes = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+        returncodes.append(completed.returncode)
+    return timings, returncodes
+
+
+def strip_option(argv, option, takes_value=True):
+    """argv without ``option`` (and its value), for re-running the same selection"""
+    stripped = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == option:
+            skip = takes_value
+        elif not arg.startswith(option + "="):
+            stripped.append(arg)
+    return stripped
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(description="FleetPulse fast-start test runner")
+    parser.add_argument("-s", "--suite", action="append", default=[],
+                        help="tester scenario to run (repeatable, 'all' for every one)")
+    parser.add_argument("-e", "--endpoint", action="append", default=[],
+                        help=f"endpoint to probe: {', '.join(ENDPOINTS)} or a /path")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--retries", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="write a JSON report here")
+    parser.add_argument("--junit", help="write a JUnit XML report here")
+    parser.add_argument("--quiet", action="store_true", help="only the exit code")
+    parser.add_argument("--list", action="store_true", help="list suites and endpoints")
+    parser.add_argument("--measure-cold-start", type=int, metavar="RUNS",
+                        help="time RUNS fresh processes running the same selection")
+    parser.add_argument("--max-cold-start-ms", type=float,
+                        help="with --measure-cold-start, fail when the median exceeds this")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("Suites:    " + ", ".join(suite_names()))
+        print("Endpoints: " + ", ".join(f"{name} ({method} {path})"
+                                        for name, (method, path, _) in ENDPOINTS.items()))
+        return 0
+
+    if args.measure_cold_start:
+        import statistics
+
+        rerun = argv
+        for option in ("--measure-cold-start", "--max-cold-start-ms", "--json", "--junit"):
+            rerun = strip_option(rerun, option)
+        timings, returncodes = measure_cold_start(rerun, args.measure_cold_start)
+        median = statistics.median(timings) * 1000
+        print(f"🧊 Cold start over {len(timings)} runs: median {median:.0f}ms, "
+              f"min {min(timings) * 1000:.0f}ms, max {max(timings) * 1000:.0f}ms")
+        failed = [code for code in returncodes if code != 0]
+        if failed:
+            # A failing selection exits early, so its timings say nothing about startup
+            print(f"❌ {len(failed)} of {len(returncodes)} runs failed "
+                  f"(exit codes {sorted(set(failed))})")
+            return 1
+        if args.max_cold_start_ms is not None and median > args.max_cold_start_ms:
+            print(f"❌ Median cold start exceeds {args.max_cold_start_ms:.0f}ms")
+            return 1
+        return 0
+
+    if not args.suite and not args.endpoint:
+        parser.error("select at least one --suite or --endpoint (see --list)")
+    # An unknown selection fails like a failed check (rc 1), so CI never reads it as usage noise
+    for name in args.endpoint:
+        try:
+            resolve_endpoint(name)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+    suites_wanted = args.suite
+    if suites_wanted:
+        available = suite_names()
+        if "all" in suites_wanted:
+            suites_wanted = available
+        unknown = [name for name in suites_wanted if name not in available]
+        if unknown:
+            print(f"❌ Unknown suites {unknown}; choose from {available}")
+            return 1
+
+    started_at = datetime.now().isoformat()
+    startup = time.perf_counter() - STARTED
+    start = time.perf_counter()
+    suites = []
+    if args.endpoint:
+        probes = [probe_endpoint(args.base_url, name, args.timeout) for name in args.endpoint]
+        suites.append({"name": "endpoints", "time": sum(p.get("time", 0) for p in probes),
+                       "tests": probes})
+    metrics = None
+    if suites_wanted:
+        tester_suites, metrics = run_suites(args.base_url, suites_wanted, args.timeout,
+                                            args.retries)
+        suites += tester_suites
+    duration = time.perf_counter() - start
+
+    tests = [test for suite in suites for test in suite["tests"]]
+    failed = sum(1 for test in tests if not test["success"])
+    report = {
+        "base_url": args.base_url,
+        "started_at": started_at,
+        "startup": startup,
+        "duration": duration,
+        "summary": {"total": len(tests), "passed": len(tests) - failed, "failed": failed},
+        "suites": suites,
+    }
+    if metrics is not None:
+        report["metrics"] = metrics
+    if args.json_path:
+        write_json(args.json_path, report)
+    if args.junit:
+        write_junit(args.junit, report)
+
+    if not args.quiet:
+        for suite in suites:
+            for test in suite["tests"]:
+                mark = "✅" if test["success"] else "❌"
+                print(f"{mark} [{suite['name']}] {test['test']} "
+                      f"({test.get('time', 0) * 1000:.0f}ms) - {test.get('details', '')}")
+        print(f"📋 {len(tests) - failed}/{len(tests)} passed in {duration:.2f}s "
+              f"(startup {startup * 1000:.0f}ms) against {args.base_url}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Histograms
+HDR-style log-linear histograms with bounded memory for latency and size samples
+"""
+
+import threading
+
+# 2**SUB_BUCKET_BITS linear sub-buckets per power of two (~0.8% relative error)
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKET_COUNT = SUB_BUCKET_COUNT >> 1
+
+
+def bucket_index(value):
+    """Bucket holding a non-negative integer value"""
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    top = value >> shift
+    return SUB_BUCKET_COUNT + (shift - 1) * HALF_SUB_BUCKET_COUNT + (top - HALF_SUB_BUCKET_COUNT)
+
+
+def bucket_bounds(index):
+    """Half-open [low, high) integer range covered by a bucket"""
+    if index < SUB_BUCKET_COUNT:
+        return index, index + 1
+    offset = index - SUB_BUCKET_COUNT
+    shift = offset // HALF_SUB_BUCKET_COUNT + 1
+    top = offset % HALF_SUB_BUCKET_COUNT + HALF_SUB_BUCKET_COUNT
+    return top << shift, (top + 1) << shift
+
+
+class Histogram:
+    """Log-linear histogram; values are scaled to integers (e.g. seconds -> microseconds)
+
+    Memory is bounded by ``max_value``: anything larger is clamped into the top
+    bucket, so one hour of microseconds needs fewer than 1,800 counters.
+    """
+    def __init__(self, scale=1, max_value=3_600_000_000):
+        self.scale = scale
+        self.max_value = max_value
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def record(self, value):
+        scaled = min(max(int(round(value * self.scale)), 0), self.max_value)
+        index = bucket_index(scaled)
+        with self._lock:
+            if index >= len(self.counts):
+                self.counts.extend([0] * (index + 1 - len(self.counts)))
+            self.counts[index] += 1
+            self.count += 1
+            self.total += scaled
+            self.min = scaled if self.min is None else min(self.min, scaled)
+            self.max = scaled if self.max is None else max(self.max, scaled)
+
+    def merge(self, other):
+        """Add another histogram with the same scale into this one"""
+        if other.scale != self.scale:
+            raise ValueError("Cannot merge histograms with different scales")
+        with self._lock:
+            if len(other.counts) > len(self.counts):
+                self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+            for index, bucket_count in enumerate(other.counts):
+                self.counts[index] += bucket_count
+            self.count += other.count
+            self.total += other.total
+            if other.count:
+                self.min = other.min if self.min is None else min(self.min, other.min)
+                self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, pct):
+        """Value at the given percentile, in the caller's unit"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(1, -(-pct * self.count // 100))
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= target:
+                    low, high = bucket_bounds(index)
+                    value = min(max((low + high - 1) / 2, self.min), self.max)
+                    return value / self.scale
+            return self.max / self.scale
+
+    def mean(self):
+        return self.total / self.count / self.scale if self.count else 0.0
+
+    def summary(self, unit_scale=1):
+        """min/mean/percentiles/max, multiplied by unit_scale (e.g. 1000 for ms)"""
+        return {
+            "count": self.count,
+            "min": (self.min or 0) / self.scale * unit_scale,
+            "mean": self.mean() * unit_scale,
+            "p50": self.percentile(50) * unit_scale,
+            "p90": self.percentile(90) * unit_scale,
+            "p95": self.percentile(95) * unit_scale,
+            "p99": self.percentile(99) * unit_scale,
+            "max": (self.max or 0) / self.scale * unit_scale,
+        }
+
+    def to_dict(self):
+        """Compact machine-readable form: only non-empty buckets are kept"""
+        with self._lock:
+            return {
+                "scale": self.scale,
+                "sub_bucket_bits": SUB_BUCKET_BITS,
+                "count": self.count,
+                "total": self.total,
+                "min": self.min,
+                "max": self.max,
+                "buckets": [[index, c] for index, c in enumerate(self.counts) if c],
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("sub_bucket_bits", SUB_BUCKET_BITS) != SUB_BUCKET_BITS:
+            raise ValueError("Histogram was exported with a different bucket layout")
+        histogram = cls(scale=data["scale"])
+        for index, bucket_count in data["buckets"]:
+            if index >= len(histogram.counts):
+                histogram.counts.extend([0] * (index + 1 - len(histogram.counts)))
+            histogram.counts[index] = bucket_count
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Load Generator
+Drives the FleetPulseAPITester scenarios concurrently with asyncio
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from backend_test import BASE_URL, EXCLUSIVE_SCENARIOS, SCENARIOS, FleetPulseAPITester
+from http_transport import PooledTransport
+from request_metrics import RequestMetrics
+from response_cache import CachingTransport, ResponseCache
+from result_sink import ResultSink
+
+# Default scenario mix; exclusive ones (e.g. streaming) can still be chosen explicitly
+LOAD_SCENARIOS = [name for name in SCENARIOS if name not in EXCLUSIVE_SCENARIOS]
+
+
+class LoadGenerator:
+    """Runs tester scenarios at a target concurrency and request rate"""
+    def __init__(self, tester=None, scenarios=None, concurrency=10, rate=None, duration=30):
+        # Size the pool to the concurrency so workers never queue for a connection
+        self.tester = tester or FleetPulseAPITester(verbose=False,
+                                                    transport=PooledTransport(pool_size=concurrency),
+                                                    sink=ResultSink())
+        self.scenarios = list(scenarios or LOAD_SCENARIOS)
+        unknown = [name for name in self.scenarios if name not in SCENARIOS]
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {unknown}")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.rate = rate  # scenario starts per second, None = as fast as concurrency allows
+        self.duration = duration
+        self.metrics = RequestMetrics()
+        self.scenario_runs = 0
+        self.scenario_failures = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def _run_scenario(self, name):
+        try:
+            getattr(self.tester, SCENARIOS[name])()
+            failed = False
+        except Exception:
+            failed = True
+        with self._lock:
+            self.scenario_runs += 1
+            self.scenario_failures += failed
+
+    async def _schedule(self):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        interval = 1.0 / self.rate if self.rate else 0.0
+        tasks = set()
+
+        async def launch(name):
+            try:
+                await loop.run_in_executor(executor, self._run_scenario, name)
+            finally:
+                semaphore.release()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            start = time.monotonic()
+            deadline = start + self.duration
+            next_start = start
+            index = 0
+            while time.monotonic() < deadline:
+                if interval:
+                    delay = next_start - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    next_start += interval
+                await semaphore.acquire()
+                if time.monotonic() >= deadline:
+                    semaphore.release()
+                    break
+                name = self.scenarios[index % len(self.scenarios)]
+                index += 1
+                task = asyncio.create_task(launch(name))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            self.elapsed = time.monotonic() - start
+
+    def run(self):
+        """Run the load test and return the per-endpoint report"""
+        self.tester.request_hooks.append(self.metrics)
+        try:
+            asyncio.run(self._schedule())
+        finally:
+            self.tester.request_hooks.remove(self.metrics)
+        return self.report()
+
+    def report(self):
+        """Throughput, latency percentiles (ms) and error rate per endpoint"""
+        report = {}
+        for key, metrics in sorted(list(self.metrics.endpoints.items())):
+            count = metrics.wall.count
+            report[key] = {
+                "requests": count,
+                "errors": metrics.errors,
+                "error_rate": metrics.errors / count if count else 0.0,
+                "throughput": count / self.elapsed if self.elapsed else 0.0,
+                "p50_ms": metrics.wall.percentile(50) * 1000,
+                "p95_ms": metrics.wall.percentile(95) * 1000,
+                "p99_ms": metrics.wall.percentile(99) * 1000,
+            }
+        return report
+
+    def print_report(self):
+        """Print load test summary"""
+        report = self.report()
+        print("=" * 80)
+        print("📋 LOAD TEST SUMMARY")
+        print(f"Scenarios: {', '.join(self.scenarios)}")
+        print(f"Concurrency: {self.concurrency}, Rate: {self.rate or 'unbounded'}/s, "
+              f"Duration: {self.elapsed:.1f}s")
+        print(f"Scenario runs: {self.scenario_runs}, Crashed: {self.scenario_failures}")
+        connections = self.tester.transport.connection_stats()
+        print(f"Connections: {connections['new_connections']} new, "
+              f"{connections['reused_connections']} reused")
+        if hasattr(self.tester.transport, "cache_stats"):
+            cache = self.tester.transport.cache_stats()
+            print(f"Cache: {cache['hit_rate']:.1%} hit rate, {cache['revalidated']} revalidated, "
+                  f"{cache['bytes_saved'] / 1024:.1f} KB saved")
+        print()
+        print(f"{'Endpoint':<40}{'Reqs':>8}{'RPS':>9}{'p50 ms':>10}{'p95 ms':>10}"
+              f"{'p99 ms':>10}{'Errors':>9}")
+        for key, row in report.items():
+            print(f"{key:<40}{row['requests']:>8}{row['throughput']:>9.1f}{row['p50_ms']:>10.1f}"
+                  f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['error_rate']:>8.1%}")
+        print(f"\n⏰ Completed at: {datetime.now().isoformat()}")
+        print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FleetPulse API load generator")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=LOAD_SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=None,
+                        help="scenario starts per second (default: unbounded)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--pool-size", type=int, default=None,
+                        help="keep-alive connections (default: --concurrency)")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--retries", type=int, default=0)
+    parser.add_argument("--cache-ttl", type=float, default=None,
+                        help="cache static endpoints client-side for this many seconds")
+    parser.add_argument("--results-file", default=None,
+                        help="stream scenario results to this NDJSON file (rotated)")
+    args = parser.parse_args()
+
+    print(f"🚀 Starting FleetPulse load test against {args.base_url}")
+    transport = PooledTransport(pool_size=args.pool_size or args.concurrency,
+                                timeout=args.timeout, retries=args.retries)
+    if args.cache_ttl is not None:
+        transport = CachingTransport(transport, ResponseCache(ttl=args.cache_ttl))
+    tester = FleetPulseAPITester(base_url=args.base_url, verbose=False, transport=transport,
+                                 sink=ResultSink(args.results_file, payload_sample_rate=0.01))
+    generator = LoadGenerator(tester, scenarios=args.scenarios, concurrency=args.concurrency,
+                              rate=args.rate, duration=args.duration)
+    try:
+        generator.run()
+        generator.print_report()
+    finally:
+        transport.close()
+        tester.sink.close()
+
+
+if __name__ == "__main__":
+    main()
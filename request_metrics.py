@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Request Metrics
+Per-endpoint wall time, time-to-first-byte and response size histograms
+"""
+
+import json
+import threading
+
+from histogram import Histogram
+
+MICROSECONDS = 1_000_000
+
+
+def response_size(response):
+    """Body size in bytes without forcing a streamed body to download"""
+    if response is None:
+        return 0
+    if getattr(response, "_content_consumed", False):
+        return len(response.content or b"")
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else 0
+
+
+class EndpointMetrics:
+    """Histograms and counters for one "METHOD /path" key"""
+    def __init__(self):
+        self.wall = Histogram(scale=MICROSECONDS)
+        self.ttfb = Histogram(scale=MICROSECONDS)
+        self.size = Histogram(scale=1, max_value=1 << 36)
+        self.errors = 0
+        self.status_codes = {}
+
+    def to_dict(self):
+        return {
+            "requests": self.wall.count,
+            "errors": self.errors,
+            "status_codes": {str(code): n for code, n in sorted(self.status_codes.items())},
+            "wall_ms": self.wall.summary(unit_scale=1000),
+            "ttfb_ms": self.ttfb.summary(unit_scale=1000),
+            "bytes": self.size.summary(),
+            "histograms": {
+                "wall": self.wall.to_dict(),
+                "ttfb": self.ttfb.to_dict(),
+                "bytes": self.size.to_dict(),
+            },
+        }
+
+
+class RequestMetrics:
+    """Request hook aggregating every tester HTTP call per endpoint"""
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, method, endpoint, elapsed, response, error):
+        self.record(method, endpoint, elapsed, response, error)
+
+    def record(self, method, endpoint, elapsed, response, error):
+        key = f"{method} {endpoint}"
+        cache_status = getattr(response, "cache_status", None)
+        if cache_status:
+            # Cache hits take ~0ms, so they get their own "[cache hit]" row
+            key += f" [cache {cache_status}]"
+        with self._lock:
+            metrics = self.endpoints.get(key)
+            if metrics is None:
+                metrics = self.endpoints[key] = EndpointMetrics()
+            # Transport failures and server errors count against the endpoint;
+            # 4xx responses are expected by some scenarios (e.g. the 404 check)
+            if error is not None or response is None or response.status_code >= 500:
+                metrics.errors += 1
+            if response is not None:
+                metrics.status_codes[response.status_code] = \
+                    metrics.status_codes.get(response.status_code, 0) + 1
+        metrics.wall.record(elapsed)
+        if response is not None:
+            # requests measures elapsed up to the parsed response headers
+            metrics.ttfb.record(response.elapsed.total_seconds())
+            metrics.size.record(response_size(response))
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+    def to_dict(self):
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+        return {"endpoints": {key: metrics.to_dict() for key, metrics in endpoints}}
+
+    def export(self, path, profiles=None):
+        """Write the metrics as JSON for dashboards and regression tooling
+
+        ``profiles`` (a ServerProfiler manifest) links server-side captures to
+        the run so a slow endpoint ships with its CPU profile.
+        """
+        report = self.to_dict()
+        if profiles is not None:
+            report["profiles"] = profiles
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    def print_table(self):
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+        print(f"{'Endpoint':<40}{'Reqs':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+              f"{'TTFB p50':>10}{'Avg KB':>9}")
+        for key, metrics in endpoints:
+            print(f"{key:<40}{metrics.wall.count:>6}"
+                  f"{metrics.wall.percentile(50) * 1000:>9.1f}"
+                  f"{metrics.wall.percentile(95) * 1000:>9.1f}"
+                  f"{metrics.wall.percentile(99) * 1000:>9.1f}"
+                  f"{metrics.ttfb.percentile(50) * 1000:>10.1f}"
+                  f"{metrics.size.mean() / 1024:>9.1f}")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Response Cache
+TTL + LRU client-side cache with ETag revalidation, wrapping the pooled transport
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlsplit, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Endpoints whose payload is static mock data in route.js
+DEFAULT_CACHEABLE = ("/fleet/drivers", "/fleet/routes", "/fleet/compliance")
+
+
+def cache_key(method, url):
+    """(method, path, normalized query) so parameter order does not split entries"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return method, parts.path, query
+
+
+class CacheEntry:
+    __slots__ = ("status_code", "headers", "content", "encoding", "url", "stored_at", "etag")
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.headers = dict(response.headers)
+        self.content = response.content
+        self.encoding = response.encoding
+        self.url = response.url
+        self.etag = response.headers.get("ETag")
+        self.stored_at = time.monotonic()
+
+    def to_response(self, cache_status="hit"):
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response._content_consumed = True
+        response.encoding = self.encoding
+        response.url = self.url
+        response.elapsed = timedelta(0)
+        # Read by RequestMetrics so cached timings stay out of the network histograms
+        response.cache_status = cache_status
+        return response
+
+
+class ResponseCache:
+    """Bounded LRU of GET responses, each fresh for ``ttl`` seconds"""
+    def __init__(self, max_entries=256, ttl=30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(entry, fresh) for a key, or (None, False)"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None, False
+            self.entries.move_to_end(key)
+            return entry, time.monotonic() - entry.stored_at < self.ttl
+
+    def put(self, key, entry):
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def refresh(self, key, entry):
+        """Mark a revalidated entry fresh again"""
+        with self._lock:
+            entry.stored_at = time.monotonic()
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+
+    def record(self, hit=False, revalidated=False, bytes_saved=0):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if revalidated:
+                self.revalidated += 1
+            self.bytes_saved += bytes_saved
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+            }
+
+
+class CachingTransport:
+    """Transport wrapper answering repeat GETs from a ResponseCache
+
+    Fresh entries are served without touching the network. Stale entries that
+    carry an ETag are revalidated with If-None-Match; a 304 counts as a hit
+    because the body did not have to be downloaded again. Streamed requests,
+    non-GET methods and endpoints outside ``cacheable`` always go to the server.
+    Responses served from the cache carry ``cache_status`` ("hit" or
+    "revalidated") so latency metrics can keep them apart from full round trips.
+    """
+    def __init__(self, transport, cache=None, cacheable=DEFAULT_CACHEABLE):
+        self.transport = transport
+        self.cache = cache or ResponseCache()
+        self.cacheable = cacheable
+
+    def _is_cacheable(self, method, url, kwargs):
+        if method.upper() != "GET" or kwargs.get("stream"):
+            return False
+        if self.cacheable is None:
+            return True
+        path = urlsplit(url).path
+        return any(path.endswith(endpoint) for endpoint in self.cacheable)
+
+    def request(self, method, url, **kwargs):
+        if not self._is_cacheable(method, url, kwargs):
+            return self.transport.request(method, url, **kwargs)
+
+        key = cache_key(method.upper(), url)
+        entry, fresh = self.cache.get(key)
+        if entry is not None and fresh:
+            self.cache.record(hit=True, bytes_saved=len(entry.content))
+            return entry.to_response()
+
+        if entry is not None and entry.etag:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers["If-None-Match"] = entry.etag
+            response = self.transport.request(method, url, headers=headers, **kwargs)
+            if response.status_code == 304:
+                self.cache.refresh(key, entry)
+                self.cache.record(hit=True, revalidated=True, bytes_saved=len(entry.content))
+                cached = entry.to_response("revalidated")
+                cached.elapsed = response.elapsed
+                return cached
+        else:
+            response = self.transport.request(method, url, **kwargs)
+
+        self.cache.record(hit=False)
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if response.status_code == 200 and "no-store" not in cache_control:
+            self.cache.put(key, CacheEntry(response))
+        return response
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    def connection_stats(self):
+        return self.transport.connection_stats()
+
+    def close(self):
+        self.transport.close()
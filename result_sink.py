@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Result Sink
+Streams test results to rotating NDJSON files and keeps only running aggregates in memory
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+
+class _ByteRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that sizes the next line in encoded bytes
+
+    The stdlib handler compares characters against maxBytes, so files of
+    non-ASCII results grew past the limit before rolling over.
+    """
+    def shouldRollover(self, record):
+        # Never roll over anything but a regular file, e.g. /dev/null
+        if os.path.exists(self.baseFilename) and not os.path.isfile(self.baseFilename):
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0:
+            size = len(f"{self.format(record)}\n".encode(self.encoding or "utf-8"))
+            self.stream.seek(0, 2)
+            if self.stream.tell() + size >= self.maxBytes:
+                return True
+        return False
+
+
+class ResultSink:
+    """Constant-memory replacement for the tester's test_results/failed_tests lists
+
+    Each result is written as one JSON line as soon as it is logged. Payloads
+    larger than ``max_payload_bytes`` are cut to a preview, and only
+    ``payload_sample_rate`` of passing results keep a payload at all (failures
+    always do). With ``path=None`` nothing is written and only aggregates remain.
+    """
+    def __init__(self, path=None, max_bytes=50 * 1024 * 1024, backup_count=5,
+                 max_payload_bytes=4096, payload_sample_rate=1.0, max_failures_kept=100):
+        self.path = path
+        self.max_payload_bytes = max_payload_bytes
+        self.payload_sample_rate = payload_sample_rate
+        self.total = 0
+        self.passed = 0
+        self.failed = 0
+        self.truncated_payloads = 0
+        self.dropped_payloads = 0
+        # Most recent failures for print_summary; older ones are only on disk
+        self.recent_failures = deque(maxlen=max_failures_kept)
+        self._lock = threading.Lock()
+        self._handler = None
+        if path:
+            self._handler = _ByteRotatingFileHandler(path, maxBytes=max_bytes,
+                                                     backupCount=backup_count, encoding="utf-8")
+            self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def write(self, result):
+        with self._lock:
+            self.total += 1
+            if result["success"]:
+                self.passed += 1
+                keep_payload = (int(self.passed * self.payload_sample_rate)
+                                != int((self.passed - 1) * self.payload_sample_rate))
+            else:
+                self.failed += 1
+                keep_payload = True
+                self.recent_failures.append({"test": result["test"], "details": result["details"],
+                                             "timestamp": result["timestamp"]})
+            record = dict(result, response_data=self._payload(result.get("response_data"),
+                                                              keep_payload))
+        if self._handler is not None:
+            line = json.dumps(record, ensure_ascii=False, default=str)
+            self._handler.handle(logging.makeLogRecord({"msg": line, "args": None}))
+
+    def _payload(self, payload, keep):
+        if payload is None:
+            return None
+        if not keep:
+            self.dropped_payloads += 1
+            return None
+        encoded = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        if len(encoded) <= self.max_payload_bytes:
+            return payload
+        self.truncated_payloads += 1
+        # Cut on bytes; a multi-byte character split at the limit is dropped
+        preview = encoded[:self.max_payload_bytes].decode("utf-8", errors="ignore")
+        return {"_truncated": True, "bytes": len(encoded), "preview": preview}
+
+    @property
+    def success_rate(self):
+        return self.passed / self.total * 100 if self.total else 0.0
+
+    def close(self):
+        if self._handler is not None:
+            self._handler.close()
+            self._handler = None
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+FleetPulse ROI Engine
+Reproduces the /calculate-roi formula from route.js, scalar and batched over parameter grids
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+# Constants from the /calculate-roi handler in route.js
+FUEL_SAVINGS_RATE = 0.15          # 15% fuel savings
+ACCIDENT_COST = 50000             # ₹ per accident
+ACCIDENT_REDUCTION_RATE = 0.4     # 40% accident reduction
+MAINTENANCE_SAVINGS_PER_TRUCK = 8000  # ₹8k per truck per month
+COST_PER_TRUCK = 700              # ₹ per truck per month
+
+ROI_FIELDS = ["monthlySavings", "annualSavings", "netSavings", "roi"]
+BREAKDOWN_FIELDS = ["fuelSavings", "accidentSavings", "maintenanceSavings", "totalCost"]
+
+
+def js_round(value):
+    """Math.round semantics; NaN/Infinity serialize as null like JSON.stringify"""
+    if value is None or math.isnan(value) or math.isinf(value):
+        return None
+    return math.floor(value + 0.5)
+
+
+def js_number(value):
+    """Coerce a JSON value the way JavaScript arithmetic would"""
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip() or 0)
+        except ValueError:
+            return math.nan
+    return math.nan
+
+
+def calculate_roi(trucks, monthly_fuel_cost, accidents_per_year):
+    """The /calculate-roi response body (without timestamp) for one scenario"""
+    trucks = js_number(trucks)
+    monthly_fuel_cost = js_number(monthly_fuel_cost)
+    accidents_per_year = js_number(accidents_per_year)
+
+    # Same operation order as route.js so results match bit for bit
+    fuel_savings = monthly_fuel_cost * FUEL_SAVINGS_RATE
+    accident_reduction = accidents_per_year * ACCIDENT_COST * ACCIDENT_REDUCTION_RATE
+    maintenance_savings = trucks * MAINTENANCE_SAVINGS_PER_TRUCK
+
+    total_monthly_savings = fuel_savings + (accident_reduction / 12) + maintenance_savings
+    annual_savings = total_monthly_savings * 12
+    annual_cost = trucks * COST_PER_TRUCK * 12
+    net_savings = annual_savings - annual_cost
+    if annual_cost:
+        roi = net_savings / annual_cost * 100
+    elif net_savings and not math.isnan(net_savings):
+        roi = math.copysign(math.inf, net_savings)
+    else:
+        roi = math.nan
+
+    return {
+        "monthlySavings": js_round(total_monthly_savings),
+        "annualSavings": js_round(annual_savings),
+        "netSavings": js_round(net_savings),
+        "roi": js_round(roi),
+        "breakdown": {
+            "fuelSavings": js_round(fuel_savings),
+            "accidentSavings": js_round(accident_reduction / 12),
+            "maintenanceSavings": js_round(maintenance_savings),
+            "totalCost": js_round(annual_cost),
+        },
+    }
+
+
+def _load_numpy():
+    # Imported lazily so the tester can use the scalar oracle without NumPy
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class RoiSweep:
+    """Batched /calculate-roi results over the cartesian product of input values
+
+    Columns are NumPy float arrays when NumPy is installed (NaN stands in for
+    the endpoint's null), otherwise plain lists from the scalar formula.
+    """
+    def __init__(self, trucks, monthly_fuel_costs, accidents_per_year):
+        self.np = _load_numpy()
+        start = time.perf_counter()
+        if self.np is not None:
+            self._evaluate_vectorized(trucks, monthly_fuel_costs, accidents_per_year)
+        else:
+            self._evaluate_scalar(trucks, monthly_fuel_costs, accidents_per_year)
+        self.elapsed = time.perf_counter() - start
+
+    def _evaluate_vectorized(self, trucks, monthly_fuel_costs, accidents_per_year):
+        np = self.np
+        t, m, a = np.meshgrid(np.asarray(trucks, dtype=np.float64),
+                              np.asarray(monthly_fuel_costs, dtype=np.float64),
+                              np.asarray(accidents_per_year, dtype=np.float64),
+                              indexing="ij", copy=False)
+        t, m, a = t.ravel(), m.ravel(), a.ravel()
+        fuel_savings = m * FUEL_SAVINGS_RATE
+        accident_reduction = a * ACCIDENT_COST * ACCIDENT_REDUCTION_RATE
+        maintenance_savings = t * MAINTENANCE_SAVINGS_PER_TRUCK
+        total_monthly_savings = fuel_savings + (accident_reduction / 12) + maintenance_savings
+        annual_savings = total_monthly_savings * 12
+        annual_cost = t * COST_PER_TRUCK * 12
+        net_savings = annual_savings - annual_cost
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roi = net_savings / annual_cost * 100
+
+        def rounded(values):
+            out = np.floor(values + 0.5)
+            out[~np.isfinite(out)] = np.nan
+            return out
+
+        self.inputs = {"trucks": t, "monthlyFuelCost": m, "accidentsPerYear": a}
+        self.columns = {
+            "monthlySavings": rounded(total_monthly_savings),
+            "annualSavings": rounded(annual_savings),
+            "netSavings": rounded(net_savings),
+            "roi": rounded(roi),
+            "fuelSavings": rounded(fuel_savings),
+            "accidentSavings": rounded(accident_reduction / 12),
+            "maintenanceSavings": rounded(maintenance_savings),
+            "totalCost": rounded(annual_cost),
+        }
+
+    def _evaluate_scalar(self, trucks, monthly_fuel_costs, accidents_per_year):
+        self.inputs = {"trucks": [], "monthlyFuelCost": [], "accidentsPerYear": []}
+        self.columns = {field: [] for field in ROI_FIELDS + BREAKDOWN_FIELDS}
+        for t in trucks:
+            for m in monthly_fuel_costs:
+                for a in accidents_per_year:
+                    result = calculate_roi(t, m, a)
+                    self.inputs["trucks"].append(float(t))
+                    self.inputs["monthlyFuelCost"].append(float(m))
+                    self.inputs["accidentsPerYear"].append(float(a))
+                    for field in ROI_FIELDS:
+                        self.columns[field].append(_nan_if_none(result[field]))
+                    for field in BREAKDOWN_FIELDS:
+                        self.columns[field].append(_nan_if_none(result["breakdown"][field]))
+
+    def __len__(self):
+        return len(self.inputs["trucks"])
+
+    def request(self, index):
+        """Request body for one scenario"""
+        return {name: _json_number(values[index]) for name, values in self.inputs.items()}
+
+    def response(self, index):
+        """Scenario result in the /calculate-roi response shape (without timestamp)"""
+        result = {field: _json_number(self.columns[field][index]) for field in ROI_FIELDS}
+        result["breakdown"] = {field: _json_number(self.columns[field][index])
+                               for field in BREAKDOWN_FIELDS}
+        return result
+
+    def top(self, n=5, by="roi"):
+        """Indices of the n best scenarios by a result column"""
+        values = self.columns[by]
+        if self.np is not None:
+            ranked = self.np.argsort(self.np.nan_to_num(values, nan=-self.np.inf))[::-1]
+            return [int(i) for i in ranked[:n]]
+        return sorted(range(len(values)),
+                      key=lambda i: -math.inf if math.isnan(values[i]) else values[i],
+                      reverse=True)[:n]
+
+    def cross_check(self, client, sample_size=50, seed=None):
+        """POST a random sample to the live /calculate-roi and return any mismatches
+
+        ``client`` is a FleetPulseClient; responses are compared raw, so a 500 body
+        shows up as a diff rather than an exception.
+        """
+        rng = random.Random(seed)
+        indices = rng.sample(range(len(self)), min(sample_size, len(self)))
+        mismatches = []
+        for index in indices:
+            body = self.request(index)
+            expected = self.response(index)
+            try:
+                response = client.request("POST", "/calculate-roi", json=body)
+                actual = response.json()
+            except Exception as e:
+                mismatches.append({"request": body, "error": str(e)})
+                continue
+            diff = roi_diff(expected, actual)
+            if diff:
+                mismatches.append({"request": body, "diff": diff})
+        return indices, mismatches
+
+
+def _nan_if_none(value):
+    return math.nan if value is None else value
+
+
+def _json_number(value):
+    value = float(value)
+    if math.isnan(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def roi_diff(expected, actual):
+    """{field: (expected, actual)} for every field where a response disagrees"""
+    diff = {}
+    for field in ROI_FIELDS:
+        if actual.get(field) != expected[field]:
+            diff[field] = (expected[field], actual.get(field))
+    breakdown = actual.get("breakdown") or {}
+    for field in BREAKDOWN_FIELDS:
+        if breakdown.get(field) != expected["breakdown"][field]:
+            diff[f"breakdown.{field}"] = (expected["breakdown"][field], breakdown.get(field))
+    return diff
+
+
+def parse_range(spec):
+    """"start:stop:step" (stop inclusive) or a comma-separated list of values"""
+    if ":" in spec:
+        start, stop, step = (float(part) for part in spec.split(":"))
+        if step <= 0:
+            raise argparse.ArgumentTypeError(f"step must be positive in {spec!r}")
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return [start + i * step for i in range(max(count, 0))]
+    return [float(value) for value in spec.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FleetPulse ROI scenario sweep")
+    parser.add_argument("--trucks", type=parse_range, default=parse_range("1:500:1"))
+    parser.add_argument("--fuel", type=parse_range, default=parse_range("50000:1000000:10000"),
+                        help="monthly fuel cost range, start:stop:step or a,b,c")
+    parser.add_argument("--accidents", type=parse_range, default=parse_range("0:20:1"))
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--cross-check", type=int, default=0,
+                        help="POST this many sampled scenarios to the live endpoint")
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    sweep = RoiSweep(args.trucks, args.fuel, args.accidents)
+    engine = "NumPy" if sweep.np is not None else "pure Python"
+    print(f"🚀 Evaluated {len(sweep):,} ROI scenarios in {sweep.elapsed * 1000:.1f} ms ({engine})")
+    for index in sweep.top(args.top):
+        body = sweep.request(index)
+        result = sweep.response(index)
+        print(f"  • {body['trucks']} trucks, ₹{body['monthlyFuelCost']:,}/month fuel, "
+              f"{body['accidentsPerYear']} accidents/yr -> ROI {result['roi']}%, "
+              f"net ₹{result['netSavings']:,}")
+
+    if args.cross_check:
+        # Imported here so offline sweeps do not need requests installed
+        from fleetpulse_client import FleetPulseClient
+
+        with FleetPulseClient(args.base_url) as client:
+            indices, mismatches = sweep.cross_check(client, args.cross_check, args.seed)
+        if mismatches:
+            print(f"❌ {len(mismatches)}/{len(indices)} sampled scenarios disagree with the endpoint")
+            for mismatch in mismatches[:10]:
+                print(f"  • {mismatch}")
+            return 1
+        print(f"✅ {len(indices)} sampled scenarios match the live endpoint")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
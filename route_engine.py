@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Route Engine
+Batched many-to-many distance, ETA and fuel cost over a road graph, in the /fleet/routes shape
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from fleet_generator import CITIES
+from spatial_index import haversine_km
+
+# ETA multipliers per edge traffic level
+TRAFFIC_FACTORS = {"light": 1.0, "moderate": 1.25, "heavy": 1.6}
+
+# Fleet average from /fleet/analytics and a diesel price in ₹/L
+KM_PER_LITRE = 6.2
+DIESEL_PRICE = 95.0
+
+# Synthetic graph: road length over straight-line distance, and cruising speed
+DETOUR_FACTOR = 1.25
+HIGHWAY_SPEED_KMH = 55.0
+
+# Agra is on the mock "Delhi to Agra Highway" route but hosts no vehicles
+ROAD_CITIES = [(name, lat, lng) for name, _state, _code, lat, lng in CITIES] + \
+    [("Agra", 27.1767, 78.0081)]
+
+
+class RoadGraph:
+    """Directed graph with per-edge length, speed and traffic, stored as adjacency lists"""
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self.coordinates = []
+        self.adjacency = []  # node -> [(neighbour, distance_km, hours, traffic)]
+        self.edge_count = 0
+
+    def add_node(self, name, lat=None, lng=None):
+        node = self.index.get(name)
+        if node is None:
+            node = self.index[name] = len(self.names)
+            self.names.append(name)
+            self.coordinates.append((lat, lng))
+            self.adjacency.append([])
+        return node
+
+    def add_edge(self, origin, destination, distance_km, speed_kmh=HIGHWAY_SPEED_KMH,
+                 traffic="moderate", oneway=False):
+        if traffic not in TRAFFIC_FACTORS:
+            raise ValueError(f"Unknown traffic level {traffic!r}")
+        # Zero or negative lengths and speeds would break Dijkstra and the speed round trip
+        if not distance_km > 0 or not speed_kmh > 0:
+            raise ValueError(f"Edge {origin} -> {destination} needs a positive distance and "
+                             f"speed, got {distance_km} km at {speed_kmh} km/h")
+        a, b = self.add_node(origin), self.add_node(destination)
+        hours = distance_km / speed_kmh * TRAFFIC_FACTORS[traffic]
+        self.adjacency[a].append((b, float(distance_km), hours, traffic))
+        self.edge_count += 1
+        if not oneway:
+            self.adjacency[b].append((a, float(distance_km), hours, traffic))
+            self.edge_count += 1
+
+    def node(self, name):
+        try:
+            return self.index[name]
+        except KeyError:
+            raise KeyError(f"Unknown place {name!r}") from None
+
+    def to_dict(self):
+        """load_graph-compatible form; each directed edge is written exactly once
+
+        A directed edge whose identical reverse is also present is written as one
+        two-way edge, anything left over as ``"oneway": true``.
+        """
+        unpaired = Counter((a,) + edge for a, neighbours in enumerate(self.adjacency)
+                           for edge in neighbours)
+        edges = []
+        for a, neighbours in enumerate(self.adjacency):
+            for b, distance, hours, traffic in neighbours:
+                if not unpaired[(a, b, distance, hours, traffic)]:
+                    continue
+                unpaired[(a, b, distance, hours, traffic)] -= 1
+                reverse = (b, a, distance, hours, traffic)
+                oneway = not unpaired[reverse]
+                if not oneway:
+                    unpaired[reverse] -= 1
+                speed = distance / hours * TRAFFIC_FACTORS[traffic]
+                edges.append({"from": self.names[a], "to": self.names[b],
+                              "distance_km": distance, "speed_kmh": round(speed, 3),
+                              "traffic": traffic, "oneway": oneway})
+        nodes = {name: list(coordinates) for name, coordinates in zip(self.names, self.coordinates)}
+        return {"nodes": nodes, "edges": edges}
+
+
+def load_graph(path):
+    """Road graph from JSON {"nodes": {name: [lat, lng]}, "edges": [...]} or a CSV edge list
+
+    Edges carry from, to, distance_km and optionally speed_kmh, traffic and oneway.
+    """
+    graph = RoadGraph()
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            edges = list(csv.DictReader(f))
+    else:
+        with open(path) as f:
+            data = json.load(f)
+        for name, (lat, lng) in data.get("nodes", {}).items():
+            graph.add_node(name, lat, lng)
+        edges = data["edges"]
+    for edge in edges:
+        oneway = str(edge.get("oneway", "")).lower() in ("1", "true", "yes")
+        graph.add_edge(edge["from"], edge["to"], float(edge["distance_km"]),
+                       float(edge.get("speed_kmh") or HIGHWAY_SPEED_KMH),
+                       edge.get("traffic") or "moderate", oneway)
+    return graph
+
+
+def synthetic_graph(places=ROAD_CITIES, neighbours=3):
+    """Each city linked to its nearest ``neighbours`` by straight-line distance times a detour factor"""
+    graph = RoadGraph()
+    for name, lat, lng in places:
+        graph.add_node(name, lat, lng)
+    linked = set()
+    for name, lat, lng in places:
+        nearest = sorted((haversine_km(lat, lng, other_lat, other_lng), other)
+                         for other, other_lat, other_lng in places if other != name)
+        for distance, other in nearest[:neighbours]:
+            pair = tuple(sorted((name, other)))
+            if pair not in linked:
+                linked.add(pair)
+                graph.add_edge(name, other, round(distance * DETOUR_FACTOR, 1))
+    return graph
+
+
+class PathResult:
+    __slots__ = ("distance_km", "hours", "nodes", "traffic_km")
+
+    def __init__(self, distance_km, hours, nodes, traffic_km):
+        self.distance_km = distance_km
+        self.hours = hours
+        self.nodes = nodes
+        self.traffic_km = traffic_km
+
+    @property
+    def traffic(self):
+        """Traffic level covering the most kilometres of the path"""
+        if not self.traffic_km:
+            return "light"
+        return max(self.traffic_km, key=self.traffic_km.get)
+
+
+# Cached in place of a PathResult for pairs with no path, so they are not searched again
+UNREACHABLE = object()
+
+
+class ShortestPathCache:
+    """Bounded LRU of (origin, destination, weight) -> PathResult or UNREACHABLE"""
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+def format_eta(hours, step_minutes=5):
+    """"3h 30m" style, rounded to ``step_minutes``"""
+    minutes = int(round(hours * 60 / step_minutes) * step_minutes)
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60}m"
+
+
+class RouteEngine:
+    """Many-to-many shortest paths with memoization
+
+    Uncached pairs are grouped by origin so each origin costs one Dijkstra run
+    that stops as soon as all of its requested destinations are settled.
+    """
+    def __init__(self, graph, cache=None, weight="time", km_per_litre=KM_PER_LITRE,
+                 diesel_price=DIESEL_PRICE):
+        if weight not in ("time", "distance"):
+            raise ValueError("weight must be 'time' or 'distance'")
+        self.graph = graph
+        self.cache = cache or ShortestPathCache()
+        self.weight = weight
+        self.km_per_litre = km_per_litre
+        self.diesel_price = diesel_price
+        self.dijkstra_runs = 0
+
+    def _dijkstra(self, origin, targets):
+        weight_index = 2 if self.weight == "time" else 1
+        best = {origin: 0.0}
+        previous = {}
+        remaining = set(targets)
+        heap = [(0.0, origin)]
+        settled = set()
+        while heap and remaining:
+            cost, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+            remaining.discard(node)
+            for edge in self.graph.adjacency[node]:
+                neighbour = edge[0]
+                candidate = cost + edge[weight_index]
+                if candidate < best.get(neighbour, float("inf")):
+                    best[neighbour] = candidate
+                    previous[neighbour] = (node, edge)
+                    heapq.heappush(heap, (candidate, neighbour))
+        self.dijkstra_runs += 1
+        return previous, settled
+
+    @staticmethod
+    def _walk(previous, origin, destination):
+        nodes = [destination]
+        distance = hours = 0.0
+        traffic_km = {}
+        node = destination
+        while node != origin:
+            node, edge = previous[node]
+            distance += edge[1]
+            hours += edge[2]
+            traffic_km[edge[3]] = traffic_km.get(edge[3], 0.0) + edge[1]
+            nodes.append(node)
+        nodes.reverse()
+        return PathResult(distance, hours, nodes, traffic_km)
+
+    def paths(self, pairs):
+        """{(origin, destination): PathResult or None when unreachable}"""
+        results = {}
+        pending = {}
+        for origin, destination in pairs:
+            if (origin, destination) in results:
+                continue
+            key = (origin, destination, self.weight)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[(origin, destination)] = None if cached is UNREACHABLE else cached
+            else:
+                results[(origin, destination)] = None
+                pending.setdefault(self.graph.node(origin), set()).add(self.graph.node(destination))
+        for origin, destinations in pending.items():
+            previous, settled = self._dijkstra(origin, destinations)
+            for destination in destinations:
+                pair = (self.graph.names[origin], self.graph.names[destination])
+                if destination not in settled:
+                    self.cache.put(pair + (self.weight,), UNREACHABLE)
+                    continue
+                result = self._walk(previous, origin, destination)
+                self.cache.put(pair + (self.weight,), result)
+                results[pair] = result
+        return results
+
+    def matrix(self, origins, destinations):
+        """Many-to-many: every origin to every destination"""
+        return self.paths([(o, d) for o in origins for d in destinations if o != d])
+
+    def fuel_cost(self, distance_km):
+        return distance_km / self.km_per_litre * self.diesel_price
+
+    def routes(self, pairs, name_format="{origin} to {destination}"):
+        """/fleet/routes response body for the given (origin, destination) pairs"""
+        pairs = list(pairs)
+        paths = self.paths(pairs)
+        routes = []
+        for origin, destination in pairs:
+            path = paths.get((origin, destination))
+            if path is None:
+                continue
+            routes.append({
+                "id": f"R{len(routes) + 1:03d}",
+                "name": name_format.format(origin=origin, destination=destination),
+                "distance": round(path.distance_km),
+                "estimatedTime": format_eta(path.hours),
+                "traffic": path.traffic,
+                "fuelCost": round(self.fuel_cost(path.distance_km)),
+            })
+        return {"routes": routes, "count": len(routes)}
+
+
+ROUTE_NAME = re.compile(r"^(?P<origin>.+?) to (?P<destination>.+?)(?: (?:Express|Highway|Expressway|Route))?$")
+
+
+def parse_route_name(name):
+    """("Mumbai", "Pune") from "Mumbai to Pune Express", or None"""
+    match = ROUTE_NAME.match(name)
+    return (match["origin"], match["destination"]) if match else None
+
+
+def parse_eta(text):
+    """Hours from "3h 30m" / "45m" """
+    hours = re.search(r"(\d+)h", text)
+    minutes = re.search(r"(\d+)m", text)
+    return (int(hours[1]) if hours else 0) + (int(minutes[1]) if minutes else 0) / 60
+
+
+def compare_routes(served, computed):
+    """Per-route deltas between an endpoint payload and engine output, matched by origin/destination"""
+    by_pair = {parse_route_name(route["name"]): route for route in computed["routes"]}
+    rows = []
+    for route in served["routes"]:
+        pair = parse_route_name(route["name"])
+        ours = by_pair.get(pair)
+        if ours is None:
+            rows.append({"name": route["name"], "missing": True})
+            continue
+        rows.append({
+            "name": route["name"],
+            "distance": (route["distance"], ours["distance"]),
+            "hours": (parse_eta(route["estimatedTime"]), parse_eta(ours["estimatedTime"])),
+            "fuelCost": (route["fuelCost"], ours["fuelCost"]),
+            "traffic": (route["traffic"], ours["traffic"]),
+        })
+    return rows
+
+
+def print_comparison(rows):
+    print(f"{'Route':<28}{'km served/ours':>16}{'ETA h':>14}{'Fuel ₹':>16}  Traffic")
+    for row in rows:
+        if row.get("missing"):
+            print(f"{row['name']:<28}  ❌ not reachable in the road graph")
+            continue
+        print(f"{row['name']:<28}{row['distance'][0]:>8}/{row['distance'][1]:<7}"
+              f"{row['hours'][0]:>7.1f}/{row['hours'][1]:<6.1f}"
+              f"{row['fuelCost'][0]:>8}/{row['fuelCost'][1]:<7}  "
+              f"{row['traffic'][0]}/{row['traffic'][1]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FleetPulse route cost and ETA engine")
+    parser.add_argument("--graph", help="road graph JSON/CSV (default: synthetic city graph)")
+    parser.add_argument("--pairs", nargs="*", default=[],
+                        help="origin:destination pairs, e.g. Mumbai:Pune")
+    parser.add_argument("--all-pairs", action="store_true", help="full many-to-many matrix")
+    parser.add_argument("--weight", choices=["time", "distance"], default="time")
+    parser.add_argument("--cache-size", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="recompute the batch N times to exercise the path cache")
+    parser.add_argument("--km-per-litre", type=float, default=KM_PER_LITRE)
+    parser.add_argument("--diesel-price", type=float, default=DIESEL_PRICE)
+    parser.add_argument("--compare", metavar="BASE_URL",
+                        help="compare against /fleet/routes served at this API base URL")
+    parser.add_argument("--write-graph", help="save the graph in use as JSON")
+    parser.add_argument("--out", help="write the /fleet/routes-shaped result here")
+    args = parser.parse_args(argv)
+
+    graph = load_graph(args.graph) if args.graph else synthetic_graph()
+    if args.write_graph:
+        with open(args.write_graph, "w") as f:
+            json.dump(graph.to_dict(), f, indent=2)
+    engine = RouteEngine(graph, ShortestPathCache(args.cache_size), args.weight,
+                         args.km_per_litre, args.diesel_price)
+
+    served = None
+    if args.compare:
+        from fleetpulse_client import FleetPulseClient
+        with FleetPulseClient(args.compare) as client:
+            served = {"routes": [route.to_dict() for route in client.routes()]}
+
+    pairs = [tuple(pair.split(":", 1)) for pair in args.pairs]
+    malformed = [pair for pair, parsed in zip(args.pairs, pairs) if len(parsed) != 2]
+    if malformed:
+        parser.error(f"--pairs must look like origin:destination, got {', '.join(malformed)}")
+    unknown = sorted({name for pair in pairs for name in pair if name not in graph.index})
+    if unknown:
+        parser.error(f"unknown places in --pairs: {', '.join(unknown)}")
+    if args.all_pairs:
+        pairs += [(o, d) for o in graph.names for d in graph.names if o != d]
+    if served:
+        pairs += [pair for pair in map(parse_route_name, (r["name"] for r in served["routes"]))
+                  if pair and pair[0] in graph.index and pair[1] in graph.index]
+    if not pairs:
+        parser.error("give --pairs, --all-pairs or --compare")
+
+    print(f"🚀 {len(pairs):,} origin/destination pairs over {len(graph.names)} places, "
+          f"{graph.edge_count} directed edges")
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        result = engine.routes(pairs)
+    elapsed = time.perf_counter() - start
+    cache = engine.cache.stats()
+    print(f"⏱️  {len(pairs) * args.repeat:,} pair lookups in {elapsed * 1000:.1f}ms "
+          f"({len(pairs) * args.repeat / elapsed:,.0f} pairs/s), {engine.dijkstra_runs} Dijkstra runs")
+    print(f"🗄️  Path cache: {cache['hits']} hits, {cache['misses']} misses "
+          f"({cache['hit_rate']:.1%}), {cache['evictions']} evictions")
+
+    if served:
+        print("\n📊 SERVED vs COMPUTED")
+        print_comparison(compare_routes(served, result))
+    elif len(result["routes"]) <= 20:
+        for route in result["routes"]:
+            print(f"  • {route['name']}: {route['distance']} km, {route['estimatedTime']}, "
+                  f"₹{route['fuelCost']:,} ({route['traffic']})")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"📄 Written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Server Profiler
+CPU profile and heap snapshot capture on the Node server around tester scenarios
+
+The server must expose the V8 inspector, e.g. ``yarn dev:inspect`` (next dev
+with NODE_OPTIONS=--inspect). Next.js serves routes from a child process that
+listens on the next inspector port, so both 9229 and 9230 are probed.
+"""
+
+import base64
+import json
+import os
+import re
+import socket
+import struct
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from request_metrics import RequestMetrics
+
+DEFAULT_INSPECTOR_PORTS = (9229, 9230)
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+
+def discover_targets(host="127.0.0.1", ports=DEFAULT_INSPECTOR_PORTS, timeout=1.0):
+    """Inspector targets reachable on the given ports; unreachable ports are skipped"""
+    targets = []
+    for port in ports:
+        try:
+            with urllib.request.urlopen(f"http://{host}:{port}/json/list", timeout=timeout) as f:
+                listed = json.load(f)
+        except OSError:
+            continue
+        for target in listed:
+            if target.get("webSocketDebuggerUrl"):
+                targets.append(dict(target, port=port))
+    return targets
+
+
+class InspectorSession:
+    """Minimal DevTools protocol client over a stdlib WebSocket"""
+    def __init__(self, url, timeout=120.0):
+        parts = urlsplit(url)
+        self.sock = socket.create_connection((parts.hostname, parts.port or 80), timeout=timeout)
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        self.sock.sendall((f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                           f"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                           f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        self._file = self.sock.makefile("rb")
+        status = self._file.readline()
+        if b" 101 " not in status:
+            self.close()
+            raise ConnectionError(f"Inspector refused WebSocket upgrade: {status!r}")
+        while self._file.readline() not in (b"\r\n", b""):
+            pass
+        self._next_id = 0
+
+    def _read(self, n):
+        data = self._file.read(n)
+        if len(data) < n:
+            raise ConnectionError("Inspector connection closed")
+        return data
+
+    def _send_frame(self, opcode, payload):
+        header = bytearray([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header.append(0x80 | length)
+        elif length < 1 << 16:
+            header.append(0x80 | 126)
+            header += struct.pack("!H", length)
+        else:
+            header.append(0x80 | 127)
+            header += struct.pack("!Q", length)
+        # Client frames must be masked (RFC 6455 5.3)
+        mask = os.urandom(4)
+        self.sock.sendall(bytes(header) + mask +
+                          bytes(b ^ mask[i % 4] for i, b in enumerate(payload)))
+
+    def _receive(self):
+        message = b""
+        while True:
+            first, second = self._read(2)
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self._read(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self._read(8))[0]
+            mask = self._read(4) if second & 0x80 else None
+            data = self._read(length)
+            if mask:
+                data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+            opcode = first & 0x0F
+            if opcode == 0x8:
+                raise ConnectionError("Inspector closed the WebSocket")
+            if opcode == 0x9:
+                self._send_frame(0xA, data)
+                continue
+            if opcode == 0xA:
+                continue
+            message += data
+            if first & 0x80:
+                return json.loads(message)
+
+    def call(self, method, params=None, on_event=None):
+        """Send a protocol command and return its result, passing events to on_event"""
+        self._next_id += 1
+        request_id = self._next_id
+        self._send_frame(0x1, json.dumps({"id": request_id, "method": method,
+                                          "params": params or {}}).encode())
+        while True:
+            message = self._receive()
+            if message.get("id") == request_id:
+                if "error" in message:
+                    raise RuntimeError(f"{method} failed: {message['error'].get('message')}")
+                return message.get("result", {})
+            if on_event and "method" in message:
+                on_event(message["method"], message.get("params", {}))
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class ProfileCapture:
+    """Artifacts and client-side latency for one profiled scenario"""
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.started_at = datetime.now().isoformat()
+        self.duration = 0.0
+        self.metrics = RequestMetrics()
+        self.artifacts = []
+        self.errors = []
+
+    @property
+    def endpoints(self):
+        return sorted(self.metrics.endpoints)
+
+    def to_dict(self):
+        return {
+            "scenario": self.scenario,
+            "endpoints": self.endpoints,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "artifacts": self.artifacts,
+            "errors": self.errors,
+            "latency": self.metrics.to_dict()["endpoints"],
+        }
+
+
+class ServerProfiler:
+    """Wraps scenarios in V8 CPU profiles and heap snapshots of the local server
+
+    Attached to a tester it also acts as a request hook, so each capture keeps
+    the latency samples of exactly the requests made while it was recording.
+    Profiling is process-wide on the server, so captures never overlap.
+    """
+    def __init__(self, host="127.0.0.1", ports=DEFAULT_INSPECTOR_PORTS, output_dir=PROFILE_DIR,
+                 scenarios=None, heap_snapshot=True, sampling_interval_us=None):
+        self.host = host
+        self.ports = tuple(ports)
+        self.scenarios = set(scenarios) if scenarios else None
+        self.heap_snapshot = heap_snapshot
+        self.sampling_interval_us = sampling_interval_us
+        self.run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.output_dir = os.path.join(output_dir, self.run_id)
+        self.captures = []
+        self._active = None
+        self._capture_lock = threading.Lock()
+
+    def attach(self, tester):
+        tester.profiler = self
+        tester.request_hooks.append(self)
+        return self
+
+    def wants(self, scenario):
+        return self.scenarios is None or scenario in self.scenarios
+
+    def __call__(self, method, endpoint, elapsed, response, error):
+        capture = self._active
+        if capture is not None:
+            capture.metrics.record(method, endpoint, elapsed, response, error)
+
+    def _artifact_path(self, scenario, port, suffix):
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", scenario)
+        return os.path.join(self.output_dir, f"{name}-{port}{suffix}")
+
+    def _start(self, target):
+        session = InspectorSession(target["webSocketDebuggerUrl"])
+        session.call("Profiler.enable")
+        if self.sampling_interval_us:
+            session.call("Profiler.setSamplingInterval", {"interval": self.sampling_interval_us})
+        session.call("Profiler.start")
+        return session
+
+    def _stop(self, session, target, capture):
+        artifact = {"target": target.get("title") or target.get("id"), "port": target["port"]}
+        profile = session.call("Profiler.stop")["profile"]
+        session.call("Profiler.disable")
+        artifact["cpu_profile"] = self._artifact_path(capture.scenario, target["port"],
+                                                      ".cpuprofile")
+        with open(artifact["cpu_profile"], "w") as f:
+            json.dump(profile, f)
+
+        if self.heap_snapshot:
+            path = self._artifact_path(capture.scenario, target["port"], ".heapsnapshot")
+            # Snapshots can be hundreds of MB, so chunks go straight to disk
+            with open(path, "w") as f:
+                def on_event(method, params):
+                    if method == "HeapProfiler.addHeapSnapshotChunk":
+                        f.write(params["chunk"])
+                session.call("HeapProfiler.takeHeapSnapshot", {"reportProgress": False},
+                             on_event=on_event)
+            artifact["heap_snapshot"] = path
+        capture.artifacts.append(artifact)
+
+    @contextmanager
+    def capture(self, scenario):
+        """Profile the server for the duration of the with-block"""
+        with self._capture_lock:
+            capture = ProfileCapture(scenario)
+            sessions = []
+            for target in discover_targets(self.host, self.ports):
+                try:
+                    sessions.append((self._start(target), target))
+                except (OSError, RuntimeError) as e:
+                    capture.errors.append(f"{target['port']}: {e}")
+            if not sessions and not capture.errors:
+                capture.errors.append(f"No inspector on {self.host} ports {list(self.ports)}")
+            self._active = capture
+            start = time.perf_counter()
+            try:
+                yield capture
+            finally:
+                capture.duration = time.perf_counter() - start
+                self._active = None
+                for session, target in sessions:
+                    try:
+                        self._stop(session, target, capture)
+                    except (OSError, RuntimeError) as e:
+                        capture.errors.append(f"{target['port']}: {e}")
+                    finally:
+                        session.close()
+                self.captures.append(capture)
+
+    def to_dict(self):
+        return {"run_id": self.run_id, "output_dir": self.output_dir,
+                "captures": [capture.to_dict() for capture in self.captures]}
+
+    def export(self, path=None):
+        """Write the capture manifest next to the artifacts; returns its path"""
+        path = path or os.path.join(self.output_dir, "manifest.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def print_captures(self):
+        for capture in self.captures:
+            print(f"  • {capture.scenario} ({capture.duration:.2f}s)")
+            for key in capture.endpoints:
+                wall = capture.metrics.endpoints[key].wall
+                print(f"      {key:<28} n={wall.count:<4} p50={wall.percentile(50) * 1000:.1f}ms "
+                      f"p99={wall.percentile(99) * 1000:.1f}ms")
+            for artifact in capture.artifacts:
+                print(f"      📎 {artifact['cpu_profile']}")
+                if artifact.get("heap_snapshot"):
+                    print(f"      📎 {artifact['heap_snapshot']}")
+            for error in capture.errors:
+                print(f"      ⚠️  {error}")
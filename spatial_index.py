@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Spatial Index
+Grid index over live vehicle positions with nearest, radius and geofence queries
+"""
+
+import argparse
+import heapq
+import math
+import random
+import sys
+import time
+
+from fleet_generator import CITIES, FleetGenerator
+from histogram import Histogram
+from request_metrics import MICROSECONDS
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.195
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def point_in_polygon(lat, lng, polygon):
+    """Ray casting over [(lat, lng), ...]; the polygon is closed implicitly"""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lng_i = polygon[i]
+        lat_j, lng_j = polygon[j]
+        if (lat_i > lat) != (lat_j > lat) and \
+                lng < (lng_j - lng_i) * (lat - lat_i) / (lat_j - lat_i) + lng_i:
+            inside = not inside
+        j = i
+    return inside
+
+
+def vehicle_position(item):
+    """(id, lat, lng) from a /fleet/vehicles item or a fleetpulse_client.Vehicle"""
+    if isinstance(item, dict):
+        location = item["location"]
+        return item["id"], location["lat"], location["lng"]
+    return item.id, item.location.lat, item.location.lng
+
+
+class Geofence:
+    __slots__ = ("name", "polygon", "bbox")
+
+    def __init__(self, name, polygon):
+        if len(polygon) < 3:
+            raise ValueError("A geofence polygon needs at least 3 points")
+        self.name = name
+        self.polygon = [(float(lat), float(lng)) for lat, lng in polygon]
+        lats = [lat for lat, _ in self.polygon]
+        lngs = [lng for _, lng in self.polygon]
+        self.bbox = (min(lats), min(lngs), max(lats), max(lngs))
+
+    def contains(self, lat, lng):
+        min_lat, min_lng, max_lat, max_lng = self.bbox
+        if not (min_lat <= lat <= max_lat and min_lng <= lng <= max_lng):
+            return False
+        return point_in_polygon(lat, lng, self.polygon)
+
+
+class GridIndex:
+    """Uniform lat/lng grid: each position lives in one cell keyed by integer coordinates
+
+    Moves only touch the old and new cell, so streaming updates never rebuild
+    the index. ``cell_km`` should be close to the typical query radius.
+    """
+    def __init__(self, cell_km=5.0):
+        self.cell_km = cell_km
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self.cells = {}
+        self.positions = {}
+        self.geofences = {}
+        # Geofence names each vehicle is currently inside, for enter/exit events
+        self.inside = {}
+        self._bounds = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lng / self.cell_deg))
+
+    def _grow_bounds(self, cell):
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[1], cell[0], cell[1]]
+        else:
+            bounds = self._bounds
+            bounds[0] = min(bounds[0], cell[0])
+            bounds[1] = min(bounds[1], cell[1])
+            bounds[2] = max(bounds[2], cell[0])
+            bounds[3] = max(bounds[3], cell[1])
+
+    def update(self, vehicle_id, lat, lng):
+        """Insert or move a vehicle; returns [(geofence, "enter"|"exit"), ...]"""
+        cell = self._cell(lat, lng)
+        previous = self.positions.get(vehicle_id)
+        if previous is None or previous[2] != cell:
+            if previous is not None:
+                members = self.cells[previous[2]]
+                members.discard(vehicle_id)
+                if not members:
+                    del self.cells[previous[2]]
+            self.cells.setdefault(cell, set()).add(vehicle_id)
+            self._grow_bounds(cell)
+        self.positions[vehicle_id] = (lat, lng, cell)
+        if not self.geofences:
+            return []
+        now = {name for name, fence in self.geofences.items() if fence.contains(lat, lng)}
+        before = self.inside.get(vehicle_id, set())
+        if now:
+            self.inside[vehicle_id] = now
+        else:
+            self.inside.pop(vehicle_id, None)
+        return ([(name, "enter") for name in sorted(now - before)] +
+                [(name, "exit") for name in sorted(before - now)])
+
+    def ingest(self, items):
+        """Apply a batch of /fleet/vehicles items; returns geofence events per vehicle"""
+        events = {}
+        for item in items:
+            vehicle_id, lat, lng = vehicle_position(item)
+            changed = self.update(vehicle_id, lat, lng)
+            if changed:
+                events[vehicle_id] = changed
+        return events
+
+    def remove(self, vehicle_id):
+        lat, lng, cell = self.positions.pop(vehicle_id)
+        members = self.cells[cell]
+        members.discard(vehicle_id)
+        if not members:
+            del self.cells[cell]
+        self.inside.pop(vehicle_id, None)
+
+    def add_geofence(self, name, polygon):
+        """Register a named fence; current members are computed from the index
+
+        Re-registering a name replaces the fence and recomputes its members from
+        scratch, so later enter/exit events are relative to the new polygon.
+        """
+        if name in self.geofences:
+            for vehicle_id in self.members(name):
+                names = self.inside[vehicle_id]
+                names.discard(name)
+                if not names:
+                    del self.inside[vehicle_id]
+        fence = self.geofences[name] = Geofence(name, polygon)
+        for vehicle_id in self.within_polygon(fence.polygon):
+            self.inside.setdefault(vehicle_id, set()).add(name)
+        return fence
+
+    def _cells_in_box(self, min_lat, min_lng, max_lat, max_lng):
+        (x0, y0), (x1, y1) = self._cell(min_lat, min_lng), self._cell(max_lat, max_lng)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            # Box covers more cells than exist: walk the occupied ones instead
+            for (x, y), members in self.cells.items():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    yield members
+            return
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                members = self.cells.get((x, y))
+                if members:
+                    yield members
+
+    def radius(self, lat, lng, km):
+        """[(distance_km, vehicle_id), ...] within ``km``, nearest first"""
+        dlat = km / KM_PER_DEGREE
+        dlng = km / (KM_PER_DEGREE * max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 1e-6))
+        found = []
+        for members in self._cells_in_box(lat - dlat, lng - dlng, lat + dlat, lng + dlng):
+            for vehicle_id in members:
+                v_lat, v_lng, _ = self.positions[vehicle_id]
+                distance = haversine_km(lat, lng, v_lat, v_lng)
+                if distance <= km:
+                    found.append((distance, vehicle_id))
+        found.sort()
+        return found
+
+    def nearest(self, lat, lng, k=1, max_km=None):
+        """The ``k`` closest vehicles as [(distance_km, vehicle_id), ...]
+
+        Searches rings of cells outward from the query cell and stops once no
+        unvisited cell can hold anything closer than the current k-th result.
+        """
+        if not self.positions or k <= 0:
+            return []
+        cx, cy = self._cell(lat, lng)
+        min_x, min_y, max_x, max_y = self._bounds
+        max_ring = max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
+        best = []  # max-heap of (-distance, id)
+        ring = 0
+        while ring <= max_ring:
+            for x, y in self._ring(cx, cy, ring):
+                for vehicle_id in self.cells.get((x, y), ()):
+                    v_lat, v_lng, _ = self.positions[vehicle_id]
+                    distance = haversine_km(lat, lng, v_lat, v_lng)
+                    if max_km is not None and distance > max_km:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, vehicle_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, vehicle_id))
+            # Anything outside this ring is at least ``ring`` whole cells away;
+            # longitude cells shrink with cos(lat), so bound with the worst case
+            shrink = math.cos(math.radians(min(abs(lat) + (ring + 1) * self.cell_deg, 89.9)))
+            reach = ring * self.cell_km * shrink
+            if len(best) == k and reach >= -best[0][0]:
+                break
+            if max_km is not None and reach > max_km:
+                break
+            ring += 1
+        return sorted((-distance, vehicle_id) for distance, vehicle_id in best)
+
+    @staticmethod
+    def _ring(cx, cy, ring):
+        if ring == 0:
+            yield cx, cy
+            return
+        for x in range(cx - ring, cx + ring + 1):
+            yield x, cy - ring
+            yield x, cy + ring
+        for y in range(cy - ring + 1, cy + ring):
+            yield cx - ring, y
+            yield cx + ring, y
+
+    def within_polygon(self, polygon):
+        """Ids of vehicles inside a [(lat, lng), ...] polygon"""
+        fence = polygon if isinstance(polygon, Geofence) else Geofence(None, polygon)
+        found = []
+        for members in self._cells_in_box(*fence.bbox):
+            for vehicle_id in members:
+                v_lat, v_lng, _ = self.positions[vehicle_id]
+                if fence.contains(v_lat, v_lng):
+                    found.append(vehicle_id)
+        return found
+
+    def members(self, geofence_name):
+        return [vehicle_id for vehicle_id, names in self.inside.items() if geofence_name in names]
+
+
+def circle_polygon(lat, lng, km, sides=16):
+    """Regular polygon approximating a circle, handy for ad-hoc geofences"""
+    dlat = km / KM_PER_DEGREE
+    dlng = km / (KM_PER_DEGREE * math.cos(math.radians(lat)))
+    return [(lat + dlat * math.sin(2 * math.pi * i / sides),
+             lng + dlng * math.cos(2 * math.pi * i / sides)) for i in range(sides)]
+
+
+def _linear_nearest(positions, lat, lng, k):
+    return heapq.nsmallest(k, ((haversine_km(lat, lng, p[0], p[1]), vehicle_id)
+                               for vehicle_id, p in positions.items()))
+
+
+def benchmark(vehicles=100_000, queries=1000, moves=100_000, cell_km=5.0, k=10,
+              radius_km=20.0, seed=0, verify=20):
+    """Build, move and query timings for a generated fleet; prints a summary table"""
+    rng = random.Random(seed)
+    generator = FleetGenerator(vehicles=vehicles, seed=seed)
+    print(f"🚀 Generating {vehicles:,} vehicle positions (seed {seed})")
+    fleet = list(generator.vehicles())
+
+    index = GridIndex(cell_km=cell_km)
+    start = time.perf_counter()
+    index.ingest(fleet)
+    build = time.perf_counter() - start
+
+    ids = [vehicle["id"] for vehicle in fleet]
+    start = time.perf_counter()
+    for _ in range(moves):
+        vehicle_id = ids[rng.randrange(len(ids))]
+        lat, lng, _ = index.positions[vehicle_id]
+        index.update(vehicle_id, lat + rng.gauss(0, 0.01), lng + rng.gauss(0, 0.01))
+    move_time = time.perf_counter() - start
+
+    points = []
+    for _ in range(queries):
+        _, _, _, lat, lng = rng.choice(CITIES)
+        points.append((lat + rng.gauss(0, 0.1), lng + rng.gauss(0, 0.1)))
+
+    timings = {name: Histogram(scale=MICROSECONDS) for name in ("nearest", "radius", "polygon")}
+    results = {"nearest": 0, "radius": 0, "polygon": 0}
+    for lat, lng in points:
+        start = time.perf_counter()
+        results["nearest"] += len(index.nearest(lat, lng, k))
+        timings["nearest"].record(time.perf_counter() - start)
+        start = time.perf_counter()
+        results["radius"] += len(index.radius(lat, lng, radius_km))
+        timings["radius"].record(time.perf_counter() - start)
+        polygon = circle_polygon(lat, lng, radius_km)
+        start = time.perf_counter()
+        results["polygon"] += len(index.within_polygon(polygon))
+        timings["polygon"].record(time.perf_counter() - start)
+
+    # Spot-check against a full scan, which is also the baseline being replaced
+    mismatches = 0
+    scan = Histogram(scale=MICROSECONDS)
+    for lat, lng in points[:verify]:
+        start = time.perf_counter()
+        expected = _linear_nearest(index.positions, lat, lng, k)
+        scan.record(time.perf_counter() - start)
+        got = index.nearest(lat, lng, k)
+        if [round(d, 9) for d, _ in got] != [round(d, 9) for d, _ in expected]:
+            mismatches += 1
+
+    print("=" * 80)
+    print("📋 SPATIAL INDEX BENCHMARK")
+    print(f"Vehicles: {len(index):,} in {len(index.cells):,} cells of {cell_km} km")
+    print(f"Build: {build:.2f}s ({len(index) / build:,.0f} inserts/s)")
+    print(f"Moves: {moves:,} in {move_time:.2f}s ({moves / move_time:,.0f} updates/s)")
+    print(f"\n{'Query':<22}{'Count':>8}{'p50 ms':>10}{'p99 ms':>10}{'Avg hits':>10}")
+    labels = {"nearest": f"{k}-nearest", "radius": f"radius {radius_km:g} km",
+              "polygon": f"polygon {radius_km:g} km"}
+    for name, histogram in timings.items():
+        print(f"{labels[name]:<22}{histogram.count:>8}{histogram.percentile(50) * 1000:>10.3f}"
+              f"{histogram.percentile(99) * 1000:>10.3f}{results[name] / len(points):>10.1f}")
+    print(f"{'linear scan ' + str(k) + '-nearest':<22}{scan.count:>8}"
+          f"{scan.percentile(50) * 1000:>10.3f}{scan.percentile(99) * 1000:>10.3f}")
+    if scan.count and timings["nearest"].percentile(50):
+        print(f"⚡ Index is {scan.percentile(50) / timings['nearest'].percentile(50):,.0f}x faster "
+              f"than a linear scan for {k}-nearest")
+    print(f"{'✅' if not mismatches else '❌'} Verified {min(verify, len(points))} nearest "
+          f"queries against a full scan: {mismatches} mismatches")
+    print("=" * 80)
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FleetPulse spatial index benchmark")
+    parser.add_argument("--vehicles", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--moves", type=int, default=100_000)
+    parser.add_argument("--cell-km", type=float, default=5.0)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--radius-km", type=float, default=20.0)
+    parser.add_argument("--verify", type=int, default=20, help="queries checked against a full scan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    mismatches = benchmark(args.vehicles, args.queries, args.moves, args.cell_km, args.k,
+                           args.radius_km, args.seed, args.verify)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
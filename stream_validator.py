@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Stream Validator
+Incremental JSON array parsing and per-item schema checks while a response is still arriving
+"""
+
+import codecs
+import json
+import time
+import tracemalloc
+
+# Per-item required fields for the list endpoints
+VEHICLE_FIELDS = ["id", "driver", "status", "location", "speed", "fuel"]
+LOCATION_FIELDS = ["lat", "lng"]
+DRIVER_FIELDS = ["id", "name", "safetyScore", "totalDistance", "violations", "rating"]
+ROUTE_FIELDS = ["id", "name", "distance", "estimatedTime", "traffic", "fuelCost"]
+
+WHITESPACE = " \t\n\r"
+NUMBER_CHARS = "0123456789+-.eE"
+
+
+class StreamingArrayParser:
+    """Yields the items of one top-level array field from a stream of byte chunks
+
+    Only the current item (plus one network chunk) is held in memory. Other
+    top-level fields are decoded whole and collected in ``rest`` once the
+    iteration finishes, e.g. ``count`` next to ``vehicles``.
+    """
+    def __init__(self, chunks, key):
+        self.chunks = iter(chunks)
+        self.key = key
+        self.rest = {}
+        self.bytes_read = 0
+        self.found = False
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Append the next chunk; False once the stream is exhausted"""
+        if self._eof:
+            return False
+        if self._pos:
+            # Drop consumed text so the buffer never grows past one partial item
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        for chunk in self.chunks:
+            if chunk:
+                self.bytes_read += len(chunk)
+                self._buffer += self._text.decode(chunk)
+                return True
+        self._buffer += self._text.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def _peek(self):
+        """Next non-whitespace character, consuming the whitespace"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.bytes_read}, "
+                             f"got {self._buffer[self._pos]!r}")
+        self._pos += 1
+
+    def _value(self):
+        """Decode one complete JSON value, pulling more chunks until it fits"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number touching the buffer end or a "." / "e" may still be arriving
+                if end < len(self._buffer):
+                    complete = self._eof or self._buffer[end] not in NUMBER_CHARS
+                else:
+                    complete = not isinstance(value, (int, float)) or isinstance(value, bool)
+                    if self._eof and not complete:
+                        raise ValueError("Unexpected end of JSON stream")
+                if complete:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def __iter__(self):
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            name = self._value()
+            self._expect(":")
+            if name == self.key and self._peek() == "[":
+                self.found = True
+                self._pos += 1
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._peek() == ",":
+                            self._pos += 1
+                            continue
+                        self._expect("]")
+                        break
+            else:
+                self.rest[name] = self._value()
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("}")
+            return
+
+
+def check_vehicle(item):
+    """Problems with one vehicle item, empty when valid"""
+    problems = [f"missing {field}" for field in VEHICLE_FIELDS if field not in item]
+    location = item.get("location")
+    if isinstance(location, dict):
+        problems += [f"missing location.{field}" for field in LOCATION_FIELDS
+                     if field not in location]
+    elif "location" in item:
+        problems.append("location is not an object")
+    return problems
+
+
+def required_fields_check(fields):
+    def check(item):
+        return [f"missing {field}" for field in fields if field not in item]
+    return check
+
+
+class StreamValidationReport:
+    """Outcome of validating one streamed array"""
+    def __init__(self):
+        self.items = 0
+        self.invalid = 0
+        self.errors = []
+        self.bytes = 0
+        self.elapsed = 0.0
+        self.peak_memory = None
+        self.rest = {}
+        self.found = False
+
+    @property
+    def items_per_second(self):
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def ok(self):
+        return self.found and self.invalid == 0
+
+    def summary(self):
+        memory = (f", peak memory {self.peak_memory / 1024:.0f} KB"
+                  if self.peak_memory is not None else "")
+        return (f"{self.items} items validated ({self.invalid} invalid) from "
+                f"{self.bytes / 1024:.0f} KB at {self.items_per_second:,.0f} items/s{memory}")
+
+
+def validate_stream(chunks, key, check, max_errors=10, track_memory=False):
+    """Parse ``key``'s array item by item from ``chunks`` and run ``check`` on each
+
+    ``track_memory`` starts and stops the global tracemalloc, so only enable it
+    when no other thread is validating a stream at the same time.
+    """
+    report = StreamValidationReport()
+    parser = StreamingArrayParser(chunks, key)
+    # tracemalloc only sees allocations made after it starts, i.e. this parse
+    tracing = track_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        for index, item in enumerate(parser):
+            report.items += 1
+            problems = check(item) if isinstance(item, dict) else ["item is not an object"]
+            if problems:
+                report.invalid += 1
+                if len(report.errors) < max_errors:
+                    report.errors.append({"index": index, "problems": problems})
+    finally:
+        report.elapsed = time.perf_counter() - start
+        if tracing:
+            report.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    report.bytes = parser.bytes_read
+    report.rest = parser.rest
+    report.found = parser.found
+    return report
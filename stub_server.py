@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Stub Server
+In-process asyncio stand-in for app/api/[[...path]]/route.js with injectable latency and errors
+"""
+
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import random
+import threading
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+
+from fleet_generator import FleetGenerator
+from roi_engine import calculate_roi, js_round
+
+# Mirrors mockFleetData in route.js
+MOCK_FLEET_DATA = {
+    "vehicles": [
+        {
+            "id": "MH-12-AB-1234",
+            "driver": "Rajesh Kumar",
+            "status": "active",
+            "location": {"lat": 19.0760, "lng": 72.8777, "address": "Mumbai, Maharashtra"},
+            "speed": 45,
+            "fuel": 75,
+        },
+        {
+            "id": "GJ-01-CD-5678",
+            "driver": "Amit Patel",
+            "status": "active",
+            "location": {"lat": 23.0225, "lng": 72.5714, "address": "Ahmedabad, Gujarat"},
+            "speed": 60,
+            "fuel": 45,
+        },
+        {
+            "id": "DL-03-EF-9012",
+            "driver": "Priya Sharma",
+            "status": "inactive",
+            "location": {"lat": 28.7041, "lng": 77.1025, "address": "Delhi"},
+            "speed": 0,
+            "fuel": 90,
+        },
+    ],
+    "analytics": {
+        "totalVehicles": 28,
+        "activeVehicles": 25,
+        "totalDistance": 1247,
+        "fuelEfficiency": 6.2,
+        "safetyScore": 94,
+        "monthlyFuelCost": 245000,
+        "accidentReduction": 40,
+        "costSavings": {"monthly": 47500, "annual": 570000},
+    },
+    "drivers": [
+        {"id": "D001", "name": "Rajesh Kumar", "safetyScore": 98, "totalDistance": 15420,
+         "violations": 0, "rating": 4.9},
+        {"id": "D002", "name": "Amit Patel", "safetyScore": 92, "totalDistance": 12350,
+         "violations": 1, "rating": 4.7},
+        {"id": "D003", "name": "Priya Sharma", "safetyScore": 96, "totalDistance": 8900,
+         "violations": 0, "rating": 4.8},
+    ],
+    "routes": [
+        {"id": "R001", "name": "Mumbai to Pune Express", "distance": 148,
+         "estimatedTime": "3h 30m", "traffic": "moderate", "fuelCost": 2800},
+        {"id": "R002", "name": "Delhi to Agra Highway", "distance": 233,
+         "estimatedTime": "4h 15m", "traffic": "heavy", "fuelCost": 4200},
+    ],
+    "compliance": {
+        "permits": {"valid": 25, "expiring": 3, "expired": 0},
+        "insurance": {"valid": 27, "expiring": 1, "expired": 0},
+        "maintenance": {"upToDate": 24, "due": 4, "overdue": 0},
+    },
+}
+
+TIME_SERIES = {
+    "fuelEfficiency": [
+        {"date": "2025-01-01", "value": 5.8},
+        {"date": "2025-01-02", "value": 6.1},
+        {"date": "2025-01-03", "value": 6.0},
+        {"date": "2025-01-04", "value": 6.3},
+        {"date": "2025-01-05", "value": 6.2},
+        {"date": "2025-01-06", "value": 6.4},
+        {"date": "2025-01-07", "value": 6.2},
+    ],
+    "safetyScores": [
+        {"date": "2025-01-01", "value": 89},
+        {"date": "2025-01-02", "value": 91},
+        {"date": "2025-01-03", "value": 93},
+        {"date": "2025-01-04", "value": 92},
+        {"date": "2025-01-05", "value": 94},
+        {"date": "2025-01-06", "value": 95},
+        {"date": "2025-01-07", "value": 94},
+    ],
+}
+
+GET_SUGGESTIONS = [
+    "Show me top drivers this week",
+    "How is our fuel efficiency?",
+    "What's our safety score?",
+    "Recommend optimal routes",
+]
+
+POST_SUGGESTIONS = [
+    "Show me fuel efficiency trends",
+    "Which routes need optimization?",
+    "How are driver safety scores?",
+    "Calculate cost savings this month",
+]
+
+STATUS_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+                  405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    """Malformed request that cannot be routed"""
+
+
+def encode_json(payload):
+    """Body bytes as NextResponse.json would send them"""
+    if payload is None:
+        return None
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def iso_now():
+    """JavaScript Date.toISOString() format"""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class FleetPulseStubApp:
+    """Route handlers returning (status, payload) with the same shapes as route.js"""
+    def __init__(self, data=None, rng=None):
+        self.data = data or MOCK_FLEET_DATA
+        self.rng = rng or random.Random()
+        # route.js stamps vehicle lastUpdate once, when the module loads
+        self.loaded_at = iso_now()
+
+    def add_random_variation(self, base_value, variation=0.1):
+        offset = (self.rng.random() - 0.5) * 2 * variation
+        return js_round(base_value * (1 + offset))
+
+    def get(self, path, query):
+        data = self.data
+        if path == "/":
+            return 200, {"message": "FleetPulse API is running!", "timestamp": iso_now(),
+                         "version": "1.0.0"}
+
+        if path == "/fleet/overview":
+            analytics = data["analytics"]
+            dynamic_analytics = dict(
+                analytics,
+                totalDistance=self.add_random_variation(analytics["totalDistance"], 0.05),
+                activeVehicles=min(analytics["totalVehicles"],
+                                   self.add_random_variation(analytics["activeVehicles"], 0.1)),
+            )
+            return 200, {"analytics": dynamic_analytics,
+                         "vehicles": [dict(v, lastUpdate=self.loaded_at) for v in data["vehicles"]],
+                         "lastUpdated": iso_now()}
+
+        if path == "/fleet/vehicles":
+            now = iso_now()
+            vehicles = [
+                dict(vehicle,
+                     speed=(self.add_random_variation(vehicle["speed"], 0.2)
+                            if vehicle["status"] == "active" else 0),
+                     fuel=max(10, self.add_random_variation(vehicle["fuel"], 0.1)),
+                     lastUpdate=now)
+                for vehicle in data["vehicles"]
+            ]
+            return 200, {"vehicles": vehicles, "count": len(vehicles)}
+
+        if path == "/fleet/drivers":
+            return 200, {"drivers": data["drivers"], "count": len(data["drivers"])}
+
+        if path == "/fleet/routes":
+            return 200, {"routes": data["routes"], "count": len(data["routes"])}
+
+        if path == "/fleet/compliance":
+            return 200, data["compliance"]
+
+        if path == "/fleet/analytics":
+            time_series = copy.deepcopy(TIME_SERIES)
+            time_series["costSavings"] = {
+                "monthly": data["analytics"]["costSavings"]["monthly"],
+                "breakdown": {"fuel": 28500, "maintenance": 12000, "insurance": 7000},
+            }
+            return 200, dict(data["analytics"], timeSeries=time_series, lastUpdated=iso_now())
+
+        if path == "/ai/query":
+            q = query.get("q", [""])[0]
+            lowered = q.lower()
+            response = ("I'm a demo AI assistant. I can help you with fleet analytics, "
+                        "but I need real AI integration to provide detailed insights.")
+            if "top driver" in lowered:
+                response = ("Based on current data, Rajesh Kumar is your top driver with a "
+                            "safety score of 98/100 and zero violations this month.")
+            elif "fuel" in lowered:
+                response = ("Your fleet's current fuel efficiency is 6.2 km/L, which is 5% better "
+                            "than last month. Vehicle MH-12-AB-1234 has the best efficiency at 7.1 km/L.")
+            elif "safety" in lowered or "accident" in lowered:
+                response = ("Your fleet safety score is 94/100. There have been 40% fewer accidents "
+                            "compared to last year, saving approximately ₹2.1L in insurance costs.")
+            elif "route" in lowered:
+                response = ("The Mumbai to Pune Express route is most efficient with moderate traffic. "
+                            "I recommend scheduling deliveries during 10 AM - 2 PM for optimal fuel savings.")
+            return 200, {"query": q, "response": response, "suggestions": GET_SUGGESTIONS,
+                         "timestamp": iso_now()}
+
+        return 404, {"error": "Endpoint not found", "path": path}
+
+    def post(self, path, body):
+        if body is None:
+            raise TypeError("Cannot destructure 'body' as it is null.")
+        if path == "/ai/query":
+            query = body.get("query") if isinstance(body, dict) else None
+            if query is not None and not isinstance(query, str):
+                raise TypeError("query?.toLowerCase is not a function")
+            lowered = (query or "").lower()
+            response = ("I'm a demo AI assistant for FleetPulse. Ask me about your fleet "
+                        "performance, drivers, routes, or safety metrics.")
+            if "top driver" in lowered:
+                response = ("Your top performing drivers this week are:\n"
+                            "1. Rajesh Kumar - 98 safety score, 0 violations\n"
+                            "2. Priya Sharma - 96 safety score, 0 violations\n"
+                            "3. Amit Patel - 92 safety score, 1 minor violation")
+            elif "fuel" in lowered:
+                response = ("Fuel Analysis:\n• Current efficiency: 6.2 km/L (+5% from last month)\n"
+                            "• Monthly fuel cost: ₹2,45,000\n"
+                            "• Potential savings: ₹28,500/month with route optimization\n"
+                            "• Best performing vehicle: MH-12-AB-1234 (7.1 km/L)")
+            elif "cost" in lowered or "saving" in lowered:
+                response = ("Cost Savings Summary:\n• Monthly savings: ₹47,500\n"
+                            "• Annual savings: ₹5,70,000\n• ROI: 285%\n"
+                            "• Main contributors: Fuel efficiency (60%), Accident reduction (25%), "
+                            "Maintenance optimization (15%)")
+            payload = {"response": response, "suggestions": POST_SUGGESTIONS,
+                       "timestamp": iso_now()}
+            # JSON.stringify drops undefined keys, so a missing query disappears
+            if isinstance(body, dict) and "query" in body:
+                payload = dict({"query": query}, **payload)
+            return 200, payload
+
+        if path == "/calculate-roi":
+            body = body if isinstance(body, dict) else {}
+            result = calculate_roi(body.get("trucks"), body.get("monthlyFuelCost"),
+                                   body.get("accidentsPerYear"))
+            result["timestamp"] = iso_now()
+            return 200, result
+
+        return 404, {"error": "POST endpoint not found", "path": path}
+
+
+class StubServer:
+    """HTTP/1.1 keep-alive server for the FleetPulse API on asyncio streams
+
+    ``latency`` seconds plus up to ``jitter`` extra are awaited before each
+    response, and ``error_rate`` of requests fail with the route's 500 shape,
+    so slow or flaky backends can be reproduced offline. With ``etags`` every
+    successful GET carries a body-hash ETag and honours If-None-Match with 304.
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 seed=None, app=None, etags=False):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.etags = etags
+        self.not_modified = 0
+        self.rng = random.Random(seed)
+        self.app = app or FleetPulseStubApp(rng=self.rng)
+        self.requests_served = 0
+        self.injected_errors = 0
+        self._server = None
+        self._loop = None
+        self._thread = None
+        # Open keep-alive connection handlers, cancelled on stop()
+        self._handlers = set()
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/api"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        handlers = list(self._handlers)
+        for handler in handlers:
+            handler.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    def start_in_thread(self):
+        """Serve from a background event loop so synchronous clients can call in"""
+        started = threading.Event()
+        failure = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self.start())
+            except Exception as e:
+                failure.append(e)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="fleetpulse-stub", daemon=True)
+        self._thread.start()
+        started.wait()
+        if failure:
+            raise failure[0]
+        return self
+
+    def stop_thread(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+            self._thread = None
+
+    def __enter__(self):
+        return self.start_in_thread()
+
+    def __exit__(self, *exc_info):
+        self.stop_thread()
+
+    async def _handle_connection(self, reader, writer):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError:
+                    await self._write(writer, 400, encode_json({"error": "Bad request"}),
+                                      keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload, extra_headers = await self._dispatch(method, target, headers, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                response_body = encode_json(payload)
+                if self.etags and method == "GET" and status == 200:
+                    etag = f'"{hashlib.sha1(response_body).hexdigest()[:20]}"'
+                    extra_headers["ETag"] = etag
+                    candidates = [tag.strip() for tag in headers.get("if-none-match", "").split(",")]
+                    if etag in candidates or "*" in candidates:
+                        self.not_modified += 1
+                        status, response_body = 304, None
+                await self._write(writer, status, response_body, keep_alive, extra_headers)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Cancelled by stop(); returning normally keeps asyncio from logging the
+            # cancellation as an unhandled callback error for every idle connection
+            pass
+        finally:
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HTTPError("Truncated request head")
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError("Request head too large")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(f"Malformed request line: {lines[0]!r}")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        length = headers.get("content-length", "0")
+        if not length.isdigit():
+            raise HTTPError("Invalid Content-Length")
+        body = await reader.readexactly(int(length)) if int(length) else b""
+        return method.upper(), target, headers, body
+
+    async def _dispatch(self, method, target, headers, body):
+        self.requests_served += 1
+        delay = self.latency + (self.rng.random() * self.jitter if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        url = urlsplit(target)
+        # route.js strips the first "/api" occurrence from the pathname
+        path = url.path.replace("/api", "", 1) or "/"
+        if method not in ("GET", "POST"):
+            return 405, None, {}
+
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.injected_errors += 1
+            return 500, {"error": "Internal server error", "message": "Injected failure",
+                         "timestamp": iso_now()}, {}
+
+        try:
+            if method == "GET":
+                status, payload = self.app.get(path, parse_qs(url.query, keep_blank_values=True))
+            else:
+                status, payload = self.app.post(path, json.loads(body.decode("utf-8")))
+        except Exception as e:
+            return 500, {"error": "Internal server error", "message": str(e),
+                         "timestamp": iso_now()}, {}
+        return status, payload, {}
+
+    async def _write(self, writer, status, body, keep_alive, extra_headers=None):
+        headers = [
+            f"HTTP/1.1 {status} {STATUS_REASONS.get(status, 'Unknown')}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status != 304:
+            headers.append(f"Content-Length: {len(body or b'')}")
+        if body is not None:
+            headers.append("Content-Type: application/json")
+        for name, value in (extra_headers or {}).items():
+            headers.append(f"{name}: {value}")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FleetPulse API stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds, uniform")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500 responses")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--etags", action="store_true",
+                        help="send ETags and answer If-None-Match with 304")
+    parser.add_argument("--vehicles", type=int, default=0,
+                        help="serve a generated fleet of this size instead of the 3 mock vehicles")
+    args = parser.parse_args()
+
+    app = None
+    if args.vehicles:
+        fleet = FleetGenerator(vehicles=args.vehicles, seed=args.seed or 0).mock_fleet_data()
+        app = FleetPulseStubApp(data=dict(MOCK_FLEET_DATA, **fleet), rng=random.Random(args.seed))
+    server = StubServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, seed=args.seed, app=app, etags=args.etags)
+
+    async def serve():
+        await server.start()
+        print(f"🚀 FleetPulse stub server listening on {server.base_url}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n📋 Served {server.requests_served} requests "
+              f"({server.injected_errors} injected errors, {server.not_modified} not modified)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ai_benchmark import (CLASS_NAMES, DEFAULT_CORPUS, AIQueryBenchmark, InFlightCoalescer,
+                          classify, load_corpus, normalize_query)
+from fleetpulse_client import FleetPulseClient
+from http_transport import PooledTransport
+from stub_server import StubServer
+
+
+def join_concurrently(coalescer, key, func, callers):
+    """Run ``callers`` threads through the coalescer; returns [(result or error, coalesced)]"""
+    outcomes = [None] * callers
+
+    def call(slot):
+        try:
+            outcomes[slot] = coalescer.call(key, func)
+        except Exception as e:
+            outcomes[slot] = (e, None)
+
+    threads = [threading.Thread(target=call, args=(slot,)) for slot in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def wait_for_followers(coalescer, count):
+    deadline = time.monotonic() + 5
+    while coalescer.followers < count:
+        assert time.monotonic() < deadline, "followers never joined"
+        time.sleep(0.001)
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    coalescer = InFlightCoalescer()
+    release = threading.Event()
+    upstream = []
+
+    def fetch():
+        upstream.append(1)
+        release.wait(5)
+        return {"response": "answer"}
+
+    threads, outcomes = join_concurrently(coalescer, ("POST", "fuel"), fetch, 6)
+    wait_for_followers(coalescer, 5)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(upstream) == 1
+    assert all(result == {"response": "answer"} for result, _ in outcomes)
+    assert sorted(coalesced for _, coalesced in outcomes) == [False] + [True] * 5
+    assert (coalescer.leaders, coalescer.followers) == (1, 5)
+
+
+def test_leader_failure_reaches_every_waiter_and_is_not_cached():
+    coalescer = InFlightCoalescer()
+    release = threading.Event()
+    upstream = []
+
+    def failing():
+        upstream.append(1)
+        release.wait(5)
+        raise ConnectionError("upstream down")
+
+    threads, outcomes = join_concurrently(coalescer, "key", failing, 4)
+    wait_for_followers(coalescer, 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(upstream) == 1
+    assert all(isinstance(error, ConnectionError) for error, _ in outcomes)
+    # The failure is gone once the leader finishes: the next call goes upstream again
+    assert coalescer.call("key", lambda: "recovered") == ("recovered", False)
+    assert coalescer._in_flight == {}
+
+
+def test_different_keys_are_not_merged():
+    coalescer = InFlightCoalescer()
+    assert coalescer.call("a", lambda: 1) == (1, False)
+    assert coalescer.call("b", lambda: 2) == (2, False)
+    assert coalescer.call("a", lambda: 3) == (3, False)
+    assert coalescer.followers == 0
+
+
+@pytest.mark.parametrize("query,method,expected", [
+    ("top driver", "GET", "top driver"),
+    ("Show me TOP DRIVERS", "POST", "top driver"),
+    ("fuel cost", "POST", "fuel"),
+    ("safety score", "GET", "safety"),
+    ("accident history", "GET", "safety"),
+    ("safety score", "POST", "other"),
+    ("route optimization", "GET", "route"),
+    ("route optimization", "POST", "other"),
+    ("cost savings", "POST", "cost"),
+    ("cost savings", "GET", "other"),
+    ("What are our savings?", "post", "cost"),
+    ("", "GET", "other"),
+    (None, "POST", "other"),
+])
+def test_classify_follows_each_methods_branches(query, method, expected):
+    assert classify(query, method) == expected
+
+
+def test_class_names_cover_both_methods_once():
+    assert CLASS_NAMES == ["top driver", "fuel", "safety", "route", "cost", "other"]
+
+
+def test_duplicate_work():
+    corpus = [{"query": q, "method": m} for q, m in [
+        ("Fuel efficiency", "POST"), ("fuel  efficiency ", "POST"), ("Fuel efficiency", "POST"),
+        ("Fuel efficiency", "GET"), ("top driver", "GET")]]
+    benchmark = AIQueryBenchmark(client=object(), corpus=corpus, repeat=2)
+    assert normalize_query("  Fuel \t Efficiency ") == "fuel efficiency"
+    assert benchmark.duplicate_work() == {
+        "queries": 10, "distinct_exact": 4, "distinct_normalized": 3,
+        "memoizable_exact": 6, "memoizable_normalized": 7, "memoizable_ratio": 0.7}
+
+
+def test_shuffled_replay_is_drawn_once():
+    benchmark = AIQueryBenchmark(client=object(), repeat=3, shuffle=True, seed=4)
+    first = benchmark._queries()
+    assert benchmark._queries() is first
+    assert sorted(map(str, first)) == sorted(map(str, DEFAULT_CORPUS * 3))
+
+
+def test_load_corpus(tmp_path):
+    path = tmp_path / "queries.jsonl"
+    path.write_text('{"query": "fuel", "count": 3}\n\n{"query": "route", "method": "get"}\n')
+    assert load_corpus(str(path)) == [{"query": "fuel", "method": "POST"}] * 3 + \
+        [{"query": "route", "method": "GET"}]
+    path.write_text('{"query": "fuel", "method": "PUT"}\n')
+    with pytest.raises(ValueError, match="unsupported method"):
+        load_corpus(str(path))
+    path.write_text('{"q": "fuel"}\n')
+    with pytest.raises(ValueError, match=":1: missing 'query'"):
+        load_corpus(str(path))
+
+
+class SlowClient:
+    """ask() stand-in that takes a while and fails for one query"""
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def ask(self, query, method="POST"):
+        with self._lock:
+            self.calls.append((method, query))
+        time.sleep(0.05)
+        if query == "broken":
+            raise ConnectionError("reset")
+        return SimpleNamespace(response="ok")
+
+
+def test_coalescing_run_reports_saved_calls_and_errors():
+    corpus = [{"query": "fuel", "method": "POST"}] * 8 + [{"query": "broken", "method": "GET"}]
+    client = SlowClient()
+    benchmark = AIQueryBenchmark(client, corpus, concurrency=9, coalesce=True)
+    report = benchmark.run()
+    assert len(client.calls) == report["server_calls"] == 2
+    assert (report["queries"], report["errors"]) == (9, 1)
+    assert report["classes"]["fuel"]["count"] == 8
+    assert report["classes"]["other"] == {"errors": 1}
+    assert report["coalescing"]["coalesced"] == 7
+
+
+def test_run_against_the_stub():
+    with StubServer(seed=2) as stub:
+        client = FleetPulseClient(stub.base_url, PooledTransport())
+        try:
+            report = AIQueryBenchmark(client, concurrency=4, repeat=2).run()
+        finally:
+            client.close()
+    assert (report["queries"], report["errors"], report["server_calls"]) == (14, 0, 14)
+    assert {name: stats["count"] for name, stats in report["classes"].items()} == {
+        "top driver": 4, "fuel": 4, "safety": 2, "route": 2, "cost": 2}
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+import backend_test
+from backend_test import FleetPulseAPITester
+
+
+class DelayedTester(FleetPulseAPITester):
+    """Runs fake scenarios that sleep for a fixed delay and log when they ran"""
+    def __init__(self, delays):
+        super().__init__(base_url="http://fleetpulse.test/api")
+        self.delays = delays
+        self.spans = {}
+        self.threads = set()
+
+    def scenario(self, name):
+        start = time.perf_counter()
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delays[name])
+        self.log_test(f"check {name}", name != "fails", f"slept {self.delays[name]}s")
+        self.spans[name] = (start, time.perf_counter())
+
+    def __getattr__(self, attribute):
+        # SCENARIOS maps names to "scenario_<name>" methods
+        if attribute.startswith("scenario_"):
+            return lambda: self.scenario(attribute[len("scenario_"):])
+        raise AttributeError(attribute)
+
+
+@pytest.fixture
+def scenarios(monkeypatch):
+    def configure(delays, exclusive=(), dependencies=None):
+        monkeypatch.setattr(backend_test, "SCENARIOS",
+                            {name: f"scenario_{name}" for name in delays})
+        monkeypatch.setattr(backend_test, "SCENARIO_SECTIONS", {})
+        monkeypatch.setattr(backend_test, "EXCLUSIVE_SCENARIOS", set(exclusive))
+        monkeypatch.setattr(backend_test, "SCENARIO_DEPENDENCIES", dependencies or {})
+        return DelayedTester(delays)
+    return configure
+
+
+def overlaps(a, b):
+    return a[0] < b[1] and b[0] < a[1]
+
+
+def test_results_replay_in_declaration_order(scenarios, capsys):
+    # The first scenario finishes last, the last one first
+    tester = scenarios({"a": 0.15, "b": 0.1, "fails": 0.05, "d": 0.0})
+    tester._run_parallel(workers=4)
+    assert [result["test"] for result in tester.test_results] == \
+        ["check a", "check b", "check fails", "check d"]
+    assert [result["test"] for result in tester.failed_tests] == ["check fails"]
+    assert (tester.sink.passed, tester.sink.failed) == (3, 1)
+    lines = [line for line in capsys.readouterr().out.splitlines() if line]
+    assert lines == ["✅ check a: PASSED - slept 0.15s", "✅ check b: PASSED - slept 0.1s",
+                     "❌ check fails: FAILED - slept 0.05s", "✅ check d: PASSED - slept 0.0s"]
+    assert list(tester.scenario_durations) == ["a", "b", "fails", "d"]
+    assert overlaps(tester.spans["a"], tester.spans["b"])
+    assert tester.parallel_wall_time < sum(tester.delays.values())
+
+
+def test_exclusive_scenarios_run_alone_after_the_pool(scenarios):
+    tester = scenarios({"a": 0.1, "solo": 0.05, "b": 0.1, "c": 0.05}, exclusive={"solo"})
+    tester._run_parallel(workers=4)
+    solo = tester.spans.pop("solo")
+    assert all(span[1] <= solo[0] for span in tester.spans.values())
+    assert [result["test"] for result in tester.test_results] == \
+        ["check a", "check solo", "check b", "check c"]
+
+
+def test_dependencies_start_after_their_prerequisites(scenarios):
+    tester = scenarios({"slow": 0.15, "after": 0.0, "free": 0.1, "last": 0.0},
+                       dependencies={"after": ["slow"], "last": ["after", "free"]})
+    tester._run_parallel(workers=4)
+    spans = tester.spans
+    assert spans["after"][0] >= spans["slow"][1]
+    assert spans["last"][0] >= max(spans["after"][1], spans["free"][1])
+    assert overlaps(spans["slow"], spans["free"])
+    assert [result["test"] for result in tester.test_results] == \
+        ["check slow", "check after", "check free", "check last"]
+
+
+@pytest.mark.parametrize("dependencies", [
+    {"a": ["b"], "b": ["a"]},
+    {"a": ["missing"]},
+    # Exclusive scenarios only run after the pool drains
+    {"a": ["solo"]},
+])
+def test_unsatisfiable_dependencies_raise(scenarios, dependencies):
+    tester = scenarios({"a": 0.0, "b": 0.0, "solo": 0.0}, exclusive={"solo"},
+                       dependencies=dependencies)
+    with pytest.raises(RuntimeError, match="Unsatisfiable"):
+        tester._run_parallel(workers=2)
+
+
+def test_single_worker_still_orders_results(scenarios):
+    tester = scenarios({"a": 0.02, "b": 0.0})
+    tester._run_parallel(workers=1)
+    assert len(tester.threads) == 1
+    assert [result["test"] for result in tester.test_results] == ["check a", "check b"]
@@ -0,0 +1,122 @@
+import pytest
+
+pytest.importorskip("requests")
+
+import benchmark
+from backend_test import FleetPulseAPITester
+from benchmark import BenchmarkSuite, compare, endpoint_key, load_baseline, save_baseline
+from http_transport import PooledTransport
+from stub_server import StubServer
+
+
+def result(endpoints):
+    """A run where every endpoint has the same metrics apart from the overrides given"""
+    defaults = {"p50_ms": 10.0, "p95_ms": 20.0, "throughput": 100.0, "error_rate": 0.0}
+    return {"endpoints": {key: dict(defaults, **overrides) for key, overrides in endpoints.items()}}
+
+
+def regressed(rows):
+    return {(row["endpoint"], row["metric"]) for row in rows if row["regressed"]}
+
+
+@pytest.fixture
+def suite_for():
+    testers = []
+
+    def make(stub, endpoints):
+        tester = FleetPulseAPITester(base_url=stub.base_url, verbose=False,
+                                     transport=PooledTransport(retries=0))
+        testers.append(tester)
+        return BenchmarkSuite(tester, endpoints, warmup=1, rounds=2, requests_per_round=5)
+
+    yield make
+    for tester in testers:
+        tester.transport.close()
+
+
+def test_endpoint_key_drops_the_query():
+    assert endpoint_key("GET", "/ai/query?q=fuel") == "GET /ai/query"
+
+
+def test_identical_runs_pass():
+    assert regressed(compare(result({"GET /a": {}}), result({"GET /a": {}}))) == set()
+
+
+@pytest.mark.parametrize("p95,expected", [(23.9, False), (24.1, True)])
+def test_latency_threshold(p95, expected):
+    rows = compare(result({"GET /a": {}}), result({"GET /a": {"p95_ms": p95}}),
+                   latency_threshold=0.2)
+    assert (("GET /a", "p95_ms") in regressed(rows)) is expected
+
+
+def test_small_absolute_latency_changes_are_ignored():
+    baseline = result({"GET /a": {"p50_ms": 0.5}})
+    assert regressed(compare(baseline, result({"GET /a": {"p50_ms": 1.2}}))) == set()
+    rows = compare(baseline, result({"GET /a": {"p50_ms": 1.6}}))
+    assert regressed(rows) == {("GET /a", "p50_ms")}
+
+
+def test_throughput_drop_regresses():
+    rows = compare(result({"GET /a": {}}), result({"GET /a": {"throughput": 70.0}}))
+    assert regressed(rows) == {("GET /a", "throughput")}
+    rows = compare(result({"GET /a": {}}), result({"GET /a": {"throughput": 85.0}}))
+    assert regressed(rows) == set()
+
+
+def test_new_errors_on_a_clean_endpoint_regress():
+    rows = compare(result({"GET /a": {}}), result({"GET /a": {"error_rate": 0.01}}))
+    assert regressed(rows) == {("GET /a", "error_rate")}
+    # An endpoint that already failed sometimes only regresses on latency/throughput
+    flaky = result({"GET /a": {"error_rate": 0.1}})
+    assert regressed(compare(flaky, result({"GET /a": {"error_rate": 0.2}}))) == set()
+
+
+def test_missing_endpoints_fail_and_new_ones_do_not():
+    rows = compare(result({"GET /a": {}, "GET /b": {}}), result({"GET /a": {}, "GET /c": {}}))
+    assert regressed(rows) == {("GET /b", "-")}
+    notes = {row["endpoint"]: row.get("note") for row in rows if row["metric"] == "-"}
+    assert notes == {"GET /b": "missing from run", "GET /c": "no baseline"}
+
+
+def test_baseline_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark, "BASELINE_DIR", str(tmp_path / "baselines"))
+    run = dict(result({"GET /a": {"p50_ms": 1.25}}), created="2025-01-01T00:00:00",
+               config={"warmup": 1, "rounds": 2, "requests_per_round": 5})
+    path = save_baseline(run, "ci")
+    assert path == str(tmp_path / "baselines" / "ci.json")
+    assert load_baseline("ci") == run
+    with pytest.raises(FileNotFoundError):
+        load_baseline("other")
+
+
+def test_suite_measures_the_stub(suite_for):
+    with StubServer(seed=1) as stub:
+        run = suite_for(stub, [("GET", "/", None),
+                               ("POST", "/calculate-roi", {"trucks": 3, "monthlyFuelCost": 9000,
+                                                           "accidentsPerYear": 1})]).run()
+    assert set(run["endpoints"]) == {"GET /", "POST /calculate-roi"}
+    for metrics in run["endpoints"].values():
+        assert metrics["error_rate"] == 0
+        assert metrics["throughput"] > 0
+        assert 0 < metrics["p50_ms"] <= metrics["p95_ms"]
+    assert regressed(compare(run, run)) == set()
+
+
+def test_client_errors_count_towards_the_error_rate(suite_for):
+    with StubServer(seed=1) as stub:
+        run = suite_for(stub, [("GET", "/fleet/missing", None),
+                               ("POST", "/calculate-roi", None)]).run()
+    assert run["endpoints"]["GET /fleet/missing"]["error_rate"] == 1.0
+    # route.js answers a bodyless POST with a 500
+    assert run["endpoints"]["POST /calculate-roi"]["error_rate"] == 1.0
+
+
+def test_server_errors_are_not_retried_away(suite_for):
+    with StubServer(seed=2, error_rate=0.5) as stub:
+        run = suite_for(stub, [("GET", "/", None)]).run()
+    assert 0 < run["endpoints"]["GET /"]["error_rate"] < 1
+
+
+def test_rounds_must_be_positive():
+    with pytest.raises(ValueError):
+        BenchmarkSuite(tester=object(), rounds=0)
@@ -0,0 +1,102 @@
+import json
+import re
+
+import pytest
+
+from fleet_generator import (REGISTRATION_SPACE, FleetGenerator, read_columnar, registration_number,
+                             write_columnar, write_jsonl)
+from stream_validator import check_vehicle
+
+REGISTRATION = re.compile(r"^[A-Z]{2}-\d{2}-[A-HJ-NP-Z]{2}-\d{4}$")
+
+
+def test_records_are_reproducible_per_index():
+    first = FleetGenerator(vehicles=50, seed=4)
+    second = FleetGenerator(vehicles=50, seed=4)
+    assert list(first.vehicles()) == list(second.vehicles())
+    # Any slice regenerates without the rest of the fleet
+    assert list(first.vehicles(20, 25)) == [second.vehicle(i) for i in range(20, 25)]
+    assert list(first.drivers(3, 6)) == [second.driver(i) for i in range(3, 6)]
+
+
+def test_seed_changes_the_fleet():
+    assert FleetGenerator(seed=1).vehicle(0) != FleetGenerator(seed=2).vehicle(0)
+
+
+def test_vehicles_match_the_api_shape():
+    generator = FleetGenerator(vehicles=200)
+    for vehicle in generator.vehicles():
+        assert check_vehicle(vehicle) == []
+        assert REGISTRATION.match(vehicle["id"]), vehicle["id"]
+        if vehicle["status"] == "inactive":
+            assert vehicle["speed"] == 0
+
+
+def test_registration_numbers_are_unique():
+    generator = FleetGenerator(vehicles=200_000, seed=9)
+    ids = {registration_number(index, "MH", generator.registration_offset)
+           for index in range(generator.vehicle_count)}
+    assert len(ids) == generator.vehicle_count
+
+
+def test_registration_number_wraps_within_the_space():
+    assert registration_number(0, "KA") == "KA-01-AA-0001"
+    assert registration_number(REGISTRATION_SPACE, "KA") == registration_number(0, "KA")
+
+
+def test_fleet_larger_than_registration_space_is_rejected():
+    with pytest.raises(ValueError):
+        FleetGenerator(vehicles=REGISTRATION_SPACE + 1)
+
+
+def test_drivers_are_bounded():
+    for driver in FleetGenerator(vehicles=500).drivers():
+        assert 50 <= driver["safetyScore"] <= 100
+        assert 1.0 <= driver["rating"] <= 5.0
+        assert 0 <= driver["violations"] <= 9
+
+
+def test_telemetry_traces():
+    generator = FleetGenerator(vehicles=5)
+    readings = list(generator.telemetry(readings_per_vehicle=10, interval=30))
+    assert len(readings) == 50
+    first = [reading for reading in readings if reading["vehicle"] == 0]
+    assert [reading["timestamp"] for reading in first] == \
+        [int(generator.start) + step * 30 for step in range(10)]
+    assert all(reading["vehicleId"] == generator.vehicle(0)["id"] for reading in first)
+
+
+def test_columnar_round_trip(tmp_path):
+    readings = list(FleetGenerator(vehicles=7).telemetry(readings_per_vehicle=11))
+    path = tmp_path / "telemetry.fpcol"
+    assert write_columnar(readings, str(path), row_group_size=20) == len(readings)
+    groups = list(read_columnar(str(path)))
+    assert [len(group["vehicle"]) for group in groups] == [20, 20, 20, 17]
+    rows = [dict(zip(group, values)) for group in groups for values in zip(*group.values())]
+    assert len(rows) == len(readings)
+    for row, reading in zip(rows, readings):
+        assert row["vehicle"] == reading["vehicle"]
+        assert row["timestamp"] == reading["timestamp"]
+        assert row["speed"] == pytest.approx(reading["speed"], abs=1e-4)
+
+
+def test_columnar_rejects_other_files(tmp_path):
+    path = tmp_path / "other.fpcol"
+    path.write_bytes(b"not columnar")
+    with pytest.raises(ValueError):
+        list(read_columnar(str(path)))
+
+
+def test_jsonl(tmp_path):
+    path = tmp_path / "vehicles.jsonl"
+    vehicles = list(FleetGenerator(vehicles=3).vehicles())
+    assert write_jsonl(vehicles, str(path)) == 3
+    assert [json.loads(line) for line in path.read_text().splitlines()] == vehicles
+
+
+def test_mock_fleet_data_counts():
+    data = FleetGenerator(vehicles=40).mock_fleet_data()
+    assert data["analytics"]["totalVehicles"] == len(data["vehicles"]) == 40
+    assert data["analytics"]["activeVehicles"] == \
+        sum(1 for vehicle in data["vehicles"] if vehicle["status"] == "active")
+    assert len(data["drivers"]) == 40
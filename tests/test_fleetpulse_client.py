@@ -0,0 +1,130 @@
+import asyncio
+import random
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("requests")
+
+from fleet_generator import FleetGenerator
+from fleetpulse_client import (Analytics, AsyncFleetPulseClient, Compliance, Driver,
+                               FleetOverview, FleetPulseAPIError, FleetPulseClient, Route,
+                               Vehicle)
+from http_transport import PooledTransport
+from stub_server import MOCK_FLEET_DATA, FleetPulseStubApp, StubServer
+
+
+class RefusingTransport:
+    """Fails the test if the client sends anything"""
+    def request(self, method, url, **kwargs):
+        raise AssertionError(f"unexpected request {method} {url}")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(scope="module")
+def stub():
+    fleet = FleetGenerator(vehicles=25, seed=3).mock_fleet_data()
+    app = FleetPulseStubApp(data=dict(MOCK_FLEET_DATA, **fleet), rng=random.Random(3))
+    with StubServer(seed=3, app=app) as server:
+        yield server
+
+
+@pytest.fixture
+def client(stub):
+    with FleetPulseClient(stub.base_url, PooledTransport()) as client:
+        yield client
+
+
+def test_models_parse_stub_payloads():
+    app = FleetPulseStubApp()
+    _, overview = app.get("/fleet/overview", {})
+    parsed = FleetOverview.from_dict(overview)
+    assert parsed.analytics.total_vehicles == overview["analytics"]["totalVehicles"]
+    assert [v.to_dict() for v in parsed.vehicles] == overview["vehicles"]
+    assert parsed.vehicles[0].active == (overview["vehicles"][0]["status"] == "active")
+
+    _, drivers = app.get("/fleet/drivers", {})
+    assert [Driver.from_dict(d).to_dict() for d in drivers["drivers"]] == drivers["drivers"]
+    _, routes = app.get("/fleet/routes", {})
+    assert [Route.from_dict(r).to_dict() for r in routes["routes"]] == routes["routes"]
+    _, compliance = app.get("/fleet/compliance", {})
+    assert Compliance.from_dict(compliance).to_dict() == {
+        key: compliance[key] for key in ("permits", "insurance", "maintenance")}
+
+    _, analytics = app.get("/fleet/analytics", {})
+    parsed = Analytics.from_dict(analytics)
+    assert [p.to_dict() for p in parsed.fuel_efficiency_series] == \
+        analytics["timeSeries"]["fuelEfficiency"]
+    assert len(parsed.safety_score_series) == len(analytics["timeSeries"]["safetyScores"])
+
+
+def test_models_use_slots():
+    vehicle = Vehicle.from_dict(MOCK_FLEET_DATA["vehicles"][0])
+    assert not hasattr(vehicle, "__dict__")
+    with pytest.raises(AttributeError):
+        vehicle.colour = "red"
+
+
+def test_import_does_not_load_asyncio():
+    # Sync callers such as the runner's cold start should not pay for asyncio
+    code = "import sys, fleetpulse_client; sys.exit('asyncio' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_fetch_many_rejects_names_outside_the_allowlist():
+    client = FleetPulseClient("http://fleetpulse.test/api", RefusingTransport())
+    with pytest.raises(ValueError, match="close"):
+        client.fetch_many(["vehicles", "close"])
+    facade = AsyncFleetPulseClient("http://fleetpulse.test/api", RefusingTransport())
+    with pytest.raises(ValueError, match="ask"):
+        asyncio.run(facade.fetch_many(["ask"]))
+    asyncio.run(facade.close())
+
+
+def test_fetch_many(client):
+    results = client.fetch_many(["drivers", "compliance", "vehicles"])
+    assert list(results) == ["drivers", "compliance", "vehicles"]
+    assert len(results["vehicles"]) == 25
+    assert isinstance(results["compliance"], Compliance)
+
+
+@pytest.mark.parametrize("page_size,sizes", [(10, [10, 10, 5]), (5, [5] * 5), (100, [25])])
+def test_iter_pages_stops_after_the_last_page(client, page_size, sizes):
+    pages = list(client.iter_pages("vehicles", page_size=page_size))
+    assert [len(page) for page in pages] == sizes
+    ids = [vehicle.id for page in pages for vehicle in page]
+    assert ids == [vehicle.id for vehicle in client.vehicles()]
+
+
+def test_errors_raise_api_errors(client):
+    with pytest.raises(FleetPulseAPIError) as info:
+        client._json("GET", "/fleet/nope")
+    assert info.value.status_code == 404
+
+
+def test_request_hooks_tag_streamed_requests(client):
+    seen = []
+    client.request_hooks.append(lambda method, endpoint, *rest: seen.append((method, endpoint)))
+    client.drivers()
+    list(client.iter_pages("drivers"))
+    assert seen == [("GET", "/fleet/drivers"), ("GET", "/fleet/drivers [stream]")]
+
+
+def test_async_facade_against_the_stub(stub):
+    async def run():
+        async with AsyncFleetPulseClient(stub.base_url, PooledTransport()) as facade:
+            results = await facade.fetch_many(["overview", "drivers", "routes"])
+            answer = await facade.ask("Which driver is safest?")
+            pages = [len(page) async for page in facade.iter_pages("vehicles", page_size=10)]
+            return results, answer, pages
+
+    results, answer, pages = asyncio.run(run())
+    assert len(results["overview"].vehicles) == 25
+    assert all(isinstance(driver, Driver) for driver in results["drivers"])
+    assert results["routes"]
+    assert answer.query == "Which driver is safest?"
+    assert answer.suggestions
+    assert pages == [10, 10, 5]
@@ -0,0 +1,214 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from fleetpulse_runner import (ENDPOINTS, PROBE_BODIES, main, probe_endpoint, resolve_endpoint,
+                               strip_option, write_junit)
+from stub_server import StubServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def stub():
+    with StubServer(seed=3) as server:
+        yield server
+
+
+@pytest.fixture
+def recorder():
+    """A server that records each request and answers every path with the given JSON"""
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def _answer(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            requests_seen.append({"method": self.command, "path": self.path,
+                                  "content_type": self.headers.get("Content-Type"),
+                                  "body": self.rfile.read(length)})
+            body = json.dumps(server.reply).encode()
+            self.send_response(server.status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _answer
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.reply, server.status, server.seen = {}, 200, requests_seen
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/api"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("argv,option,takes_value,expected", [
+    (["-e", "root", "--json", "out.json", "--quiet"], "--json", True, ["-e", "root", "--quiet"]),
+    (["--junit=r.xml", "-e", "root"], "--junit", True, ["-e", "root"]),
+    (["--json", "a.json", "--json", "b.json"], "--json", True, []),
+    # Only the exact option or option=value goes, never a longer option sharing the prefix
+    (["--json-pretty", "--json", "a"], "--json", True, ["--json-pretty"]),
+    (["--quiet", "-e", "root"], "--quiet", False, ["-e", "root"]),
+    (["-e", "root"], "--json", True, ["-e", "root"]),
+])
+def test_strip_option(argv, option, takes_value, expected):
+    assert strip_option(argv, option, takes_value) == expected
+
+
+def test_resolve_endpoint():
+    assert resolve_endpoint("overview") == ENDPOINTS["overview"]
+    assert resolve_endpoint("/fleet/vehicles?limit=5") == ("GET", "/fleet/vehicles?limit=5", [])
+    assert resolve_endpoint("post /calculate-roi") == ("POST", "/calculate-roi", [])
+    assert resolve_endpoint("ai-post")[:2] == ("POST", "/ai/query")
+    for name in ("nope", "GET fleet/vehicles", ""):
+        with pytest.raises(ValueError, match="Unknown endpoint"):
+            resolve_endpoint(name)
+
+
+@pytest.mark.parametrize("name,path", [("roi", "/calculate-roi"), ("ai-post", "/ai/query"),
+                                       ("POST /calculate-roi?dry=1", "/calculate-roi")])
+def test_post_probes_send_the_canonical_body(recorder, name, path):
+    method, _, fields = resolve_endpoint(name)
+    recorder.reply = {field: 1 for field in fields}
+    result = probe_endpoint(recorder.base_url, name)
+    assert result["success"], result["details"]
+    seen, = recorder.seen
+    assert (seen["method"], seen["content_type"]) == ("POST", "application/json")
+    assert json.loads(seen["body"]) == PROBE_BODIES[path]
+
+
+def test_unlisted_post_paths_send_an_empty_object_and_gets_no_body(recorder):
+    assert probe_endpoint(recorder.base_url, "POST /fleet/notes")["success"]
+    assert probe_endpoint(recorder.base_url, "/fleet/vehicles")["success"]
+    assert [(seen["method"], seen["body"]) for seen in recorder.seen] == \
+        [("POST", b"{}"), ("GET", b"")]
+
+
+def test_probes_report_failures(recorder):
+    recorder.reply = {"message": "hi"}
+    result = probe_endpoint(recorder.base_url, "root")
+    assert not result["success"]
+    assert result["details"] == "Missing fields: ['timestamp', 'version']"
+    recorder.status = 503
+    result = probe_endpoint(recorder.base_url, "root")
+    assert (result["success"], result["status"]) == (False, 503)
+    assert result["details"].startswith("HTTP 503")
+
+
+def test_probes_pass_against_the_stub(stub):
+    results = [probe_endpoint(stub.base_url, name) for name in ENDPOINTS]
+    assert [result["test"] for result in results if not result["success"]] == []
+
+
+@pytest.mark.parametrize("argv", [["-e", "nope"], ["-e", "root", "-e", "fleet/vehicles"]])
+def test_unknown_endpoints_exit_1_before_probing(recorder, capsys, argv):
+    assert main(argv + ["--base-url", recorder.base_url]) == 1
+    assert "Unknown endpoint" in capsys.readouterr().out
+    assert recorder.seen == []
+
+
+def test_unknown_suites_exit_1(capsys):
+    pytest.importorskip("requests")
+    assert main(["-s", "nope"]) == 1
+    assert "Unknown suites ['nope']" in capsys.readouterr().out
+
+
+def test_no_selection_is_a_usage_error():
+    with pytest.raises(SystemExit) as exited:
+        main([])
+    assert exited.value.code == 2
+
+
+def parse_junit(path):
+    """Parse a JUnit report and check the structure CI consumers rely on"""
+    root = ET.parse(path).getroot()
+    assert root.tag == "testsuites"
+    suites = root.findall("testsuite")
+    assert int(root.get("tests")) == sum(int(suite.get("tests")) for suite in suites)
+    assert int(root.get("failures")) == sum(int(suite.get("failures")) for suite in suites)
+    for suite in suites:
+        cases = suite.findall("testcase")
+        assert int(suite.get("tests")) == len(cases)
+        assert int(suite.get("failures")) == sum(case.find("failure") is not None
+                                                 for case in cases)
+        for case in cases:
+            assert case.get("name") and case.get("classname").startswith("fleetpulse.")
+            assert float(case.get("time")) >= 0
+    return root
+
+
+def test_reports_validate_and_agree(stub, tmp_path, capsys):
+    junit, report_path = tmp_path / "report.xml", tmp_path / "report.json"
+    rc = main(["-e", "root", "-e", "roi", "-e", "/fleet/missing", "--base-url", stub.base_url,
+               "--junit", str(junit), "--json", str(report_path)])
+    assert rc == 1
+    assert "📋 2/3 passed" in capsys.readouterr().out
+    root = parse_junit(junit)
+    suite, = root.findall("testsuite")
+    assert (suite.get("name"), suite.get("tests"), suite.get("failures")) == ("endpoints", "3", "1")
+    failure = suite.findall("testcase")[2].find("failure")
+    assert failure.get("message").startswith("HTTP 404")
+    with open(report_path) as f:
+        report = json.load(f)
+    assert report["summary"] == {"total": 3, "passed": 2, "failed": 1}
+    assert [test["test"] for test in report["suites"][0]["tests"]] == \
+        ["GET /api/", "POST /api/calculate-roi", "GET /api/fleet/missing"]
+
+
+def test_junit_stays_well_formed_with_control_characters(tmp_path):
+    path = tmp_path / "report.xml"
+    report = {"summary": {"total": 2, "failed": 1}, "duration": 0.5,
+              "started_at": "2025-01-01T00:00:00",
+              "suites": [{"name": "endpoints", "time": 0.5, "tests": [
+                  {"test": "GET /a\x01<b>", "success": False,
+                   "details": "HTTP 500: \x1b[31mboom\x00 & more"},
+                  {"test": "GET /c", "success": True, "details": "ok \x08 🚚", "time": 0.25}]}]}
+    write_junit(str(path), report)
+    failing, passing = parse_junit(path).iter("testcase")
+    assert failing.get("name") == "GET /a�<b>"
+    assert failing.find("failure").get("message") == "HTTP 500: �[31mboom� & more"
+    assert (passing.find("system-out").text, passing.get("time")) == ("ok � 🚚", "0.250")
+
+
+def test_cold_start_threshold_gates_the_median(stub, capsys):
+    selection = ["-e", "root", "--base-url", stub.base_url]
+    assert main(selection + ["--measure-cold-start", "2", "--max-cold-start-ms", "30000"]) == 0
+    assert "Cold start over 2 runs" in capsys.readouterr().out
+    assert main(selection + ["--measure-cold-start", "2", "--max-cold-start-ms", "1"]) == 1
+    assert "Median cold start exceeds 1ms" in capsys.readouterr().out
+
+
+def test_cold_start_fails_when_the_selection_fails(recorder, tmp_path, capsys):
+    recorder.status = 500
+    report_path = tmp_path / "report.json"
+    argv = ["-e", "root", "--base-url", recorder.base_url, "--measure-cold-start", "2",
+            "--max-cold-start-ms", "30000", "--json", str(report_path)]
+    assert main(argv) == 1
+    assert "2 of 2 runs failed (exit codes [1])" in capsys.readouterr().out
+    # The re-runs drop the report options, so only the probes themselves ran
+    assert len(recorder.seen) == 2
+    assert not report_path.exists()
+
+
+def test_endpoint_probes_stay_off_the_heavy_imports(stub):
+    # Cold start regression guard: a probe run must not load the harness or its dependencies
+    code = ("import sys, fleetpulse_runner\n"
+            f"rc = fleetpulse_runner.main(['-e', 'overview', '--base-url', {stub.base_url!r}, "
+            "'--quiet'])\n"
+            "heavy = ['asyncio', 'requests', 'urllib3', 'numpy', 'backend_test', "
+            "'fleetpulse_client', 'http_transport']\n"
+            "print(rc, [name for name in heavy if name in sys.modules])\n")
+    completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                               text=True, timeout=60)
+    assert completed.stdout.split(None, 1) == ["0", "[]\n"], completed.stderr
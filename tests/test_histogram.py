@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from histogram import SUB_BUCKET_COUNT, Histogram, bucket_bounds, bucket_index
+
+
+def test_bucket_bounds_contain_their_values():
+    for value in list(range(4 * SUB_BUCKET_COUNT)) + [10 ** 6, 3_600_000_000, 2 ** 40 + 12345]:
+        low, high = bucket_bounds(bucket_index(value))
+        assert low <= value < high
+
+
+def test_buckets_are_contiguous_and_increasing():
+    previous_high = 0
+    for index in range(2000):
+        low, high = bucket_bounds(index)
+        assert low == previous_high
+        assert bucket_index(low) == index
+        assert bucket_index(high - 1) == index
+        previous_high = high
+
+
+def test_relative_error_is_bounded():
+    for value in [SUB_BUCKET_COUNT, 999, 12_345, 1_000_000, 987_654_321]:
+        low, high = bucket_bounds(bucket_index(value))
+        assert (high - low) / low <= 2 / SUB_BUCKET_COUNT
+
+
+def test_percentiles_match_sorted_samples():
+    rng = random.Random(3)
+    samples = [rng.lognormvariate(-4, 1) for _ in range(20000)]
+    histogram = Histogram(scale=1_000_000)
+    for sample in samples:
+        histogram.record(sample)
+    ordered = sorted(samples)
+    for pct in (50, 90, 99):
+        exact = ordered[int(len(ordered) * pct / 100) - 1]
+        assert histogram.percentile(pct) == pytest.approx(exact, rel=0.02)
+    assert histogram.count == len(samples)
+    assert histogram.mean() == pytest.approx(sum(samples) / len(samples), rel=1e-3)
+
+
+def test_percentile_is_clamped_to_observed_range():
+    histogram = Histogram()
+    histogram.record(1000)
+    assert histogram.percentile(50) == 1000
+    assert histogram.percentile(100) == 1000
+
+
+def test_values_are_clamped_to_max_value():
+    histogram = Histogram(max_value=1000)
+    histogram.record(-5)
+    histogram.record(10 ** 9)
+    assert histogram.min == 0
+    assert histogram.max == 1000
+
+
+def test_empty_histogram_summary():
+    summary = Histogram().summary(unit_scale=1000)
+    assert summary["count"] == 0
+    assert summary["p99"] == 0.0
+
+
+def test_merge_equals_recording_everything():
+    left, right, combined = Histogram(), Histogram(), Histogram()
+    for value in range(0, 5000, 7):
+        (left if value % 2 else right).record(value)
+        combined.record(value)
+    left.merge(right)
+    assert left.to_dict() == combined.to_dict()
+
+
+def test_merge_rejects_different_scales():
+    with pytest.raises(ValueError):
+        Histogram(scale=1).merge(Histogram(scale=1000))
+
+
+def test_dict_round_trip():
+    histogram = Histogram(scale=1000)
+    for value in (0.001, 0.25, 3.5, 42.0):
+        histogram.record(value)
+    restored = Histogram.from_dict(histogram.to_dict())
+    assert restored.to_dict() == histogram.to_dict()
+    assert restored.percentile(75) == histogram.percentile(75)
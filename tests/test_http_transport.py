@@ -0,0 +1,110 @@
+import socket
+import threading
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from http_transport import DEFAULT_TIMEOUT, PooledTransport
+from stub_server import StubServer
+
+
+@pytest.fixture(scope="module")
+def stub():
+    with StubServer(seed=5) as server:
+        yield server
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_sequential_requests_reuse_one_connection(stub):
+    transport = PooledTransport()
+    try:
+        for _ in range(5):
+            assert transport.request("GET", f"{stub.base_url}/").status_code == 200
+        assert transport.connection_stats() == {"requests": 5, "new_connections": 1,
+                                                "reused_connections": 4}
+    finally:
+        transport.close()
+
+
+def test_concurrent_requests_stay_within_the_pool(stub):
+    transport = PooledTransport(pool_size=4)
+    barrier = threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        for _ in range(10):
+            transport.request("GET", f"{stub.base_url}/fleet/drivers").raise_for_status()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = transport.connection_stats()
+        assert stats["requests"] == 40
+        assert 1 <= stats["new_connections"] <= 4
+        assert stats["reused_connections"] == 40 - stats["new_connections"]
+    finally:
+        transport.close()
+
+
+def test_retries_are_off_by_default():
+    transport = PooledTransport()
+    assert transport.adapter.max_retries.total == 0
+    assert transport.timeout == DEFAULT_TIMEOUT
+    with StubServer(seed=1, error_rate=1.0) as stub:
+        try:
+            response = transport.request("GET", f"{stub.base_url}/")
+        finally:
+            transport.close()
+    assert response.status_code == 500
+    assert stub.requests_served == stub.injected_errors == 1
+
+
+def test_explicit_retries_replay_idempotent_requests_only():
+    transport = PooledTransport(retries=2, backoff_factor=0, retry_statuses=(500,))
+    with StubServer(seed=1, error_rate=1.0) as stub:
+        try:
+            assert transport.request("GET", f"{stub.base_url}/").status_code == 500
+            assert stub.injected_errors == 3
+            transport.request("POST", f"{stub.base_url}/calculate-roi", json={"trucks": 1})
+            assert stub.injected_errors == 4
+        finally:
+            transport.close()
+
+
+def test_connection_errors_are_not_retried():
+    transport = PooledTransport()
+    try:
+        with pytest.raises(requests.ConnectionError):
+            transport.request("GET", f"http://127.0.0.1:{closed_port()}/api/")
+    finally:
+        transport.close()
+
+
+def test_default_timeout_applies_and_can_be_overridden():
+    transport = PooledTransport(timeout=0.05)
+    with StubServer(seed=1, latency=0.3) as stub:
+        try:
+            with pytest.raises(requests.Timeout):
+                transport.request("GET", f"{stub.base_url}/")
+            assert transport.request("GET", f"{stub.base_url}/", timeout=2).status_code == 200
+        finally:
+            transport.close()
+
+
+def test_close_releases_pooled_connections(stub):
+    transport = PooledTransport()
+    transport.request("GET", f"{stub.base_url}/")
+    assert transport.connection_stats()["new_connections"] == 1
+    transport.close()
+    assert len(transport.adapter.poolmanager.pools) == 0
+    assert transport.connection_stats() == {"requests": 0, "new_connections": 0,
+                                            "reused_connections": 0}
@@ -0,0 +1,112 @@
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("requests")
+
+from load_generator import LOAD_SCENARIOS, LoadGenerator
+
+
+def fake_response(status, elapsed):
+    return SimpleNamespace(status_code=status, elapsed=timedelta(seconds=elapsed), headers={},
+                           content=b"{}", _content_consumed=True)
+
+
+class FakeTester:
+    """Scenarios that report canned requests to the hooks instead of calling an API
+
+    Every tenth root request fails at the transport and every fifth overview
+    request returns a 500; the overview 404 check is expected and not an error.
+    """
+    def __init__(self):
+        self.request_hooks = []
+        self.transport = SimpleNamespace(connection_stats=lambda: {"new_connections": 1,
+                                                                   "reused_connections": 9})
+        self.runs = {"root": 0, "overview": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.runs[name] += 1
+            return self.runs[name]
+
+    def _notify(self, method, endpoint, elapsed, response, error=None):
+        for hook in self.request_hooks:
+            hook(method, endpoint, elapsed, response, error)
+
+    def test_root_endpoint(self):
+        run = self._count("root")
+        if run % 10 == 0:
+            self._notify("GET", "/", 0.5, None, ConnectionError("reset"))
+        else:
+            # 10ms, 20ms, ... 90ms
+            self._notify("GET", "/", run % 10 / 100, fake_response(200, 0.001))
+
+    def test_fleet_overview_api(self):
+        run = self._count("overview")
+        self._notify("GET", "/fleet/overview", 0.05, fake_response(500 if run % 5 == 0 else 200,
+                                                                   0.01))
+        self._notify("GET", "/fleet/nope", 0.002, fake_response(404, 0.001))
+
+    def test_ai_assistant_api(self):
+        raise RuntimeError("scenario crashed")
+
+
+def drive(generator, runs):
+    generator.tester.request_hooks.append(generator.metrics)
+    for _ in range(runs):
+        for name in generator.scenarios:
+            generator._run_scenario(name)
+
+
+def test_report_per_endpoint():
+    generator = LoadGenerator(FakeTester(), scenarios=["root", "overview"])
+    drive(generator, 100)
+    generator.elapsed = 4.0
+    report = generator.report()
+    assert list(report) == ["GET /", "GET /fleet/nope", "GET /fleet/overview"]
+
+    root = report["GET /"]
+    assert root["requests"] == 100
+    assert (root["errors"], root["error_rate"]) == (10, 0.1)
+    assert root["throughput"] == 25.0
+    assert root["p50_ms"] == pytest.approx(50, rel=0.02)
+    assert root["p95_ms"] == pytest.approx(500, rel=0.02)
+    assert root["p50_ms"] <= root["p95_ms"] <= root["p99_ms"]
+
+    overview = report["GET /fleet/overview"]
+    assert (overview["errors"], overview["error_rate"]) == (20, 0.2)
+    assert overview["p99_ms"] == pytest.approx(50, rel=0.02)
+    assert report["GET /fleet/nope"]["error_rate"] == 0.0
+
+
+def test_report_before_any_run():
+    generator = LoadGenerator(FakeTester(), scenarios=["root"])
+    assert generator.report() == {}
+    generator.metrics("GET", "/", 0.01, fake_response(200, 0.001), None)
+    assert generator.report()["GET /"]["throughput"] == 0.0
+
+
+def test_run_counts_crashed_scenarios_and_removes_its_hook(capsys):
+    tester = FakeTester()
+    generator = LoadGenerator(tester, scenarios=["root", "ai"], concurrency=2, rate=100,
+                              duration=0.2)
+    report = generator.run()
+    assert tester.request_hooks == []
+    assert 15 <= generator.scenario_runs <= 21
+    assert generator.scenario_failures == generator.scenario_runs // 2
+    assert report["GET /"]["requests"] == tester.runs["root"]
+    assert report["GET /"]["throughput"] == pytest.approx(tester.runs["root"] / generator.elapsed)
+    generator.print_report()
+    out = capsys.readouterr().out
+    assert "Crashed: " in out and "GET /" in out
+
+
+def test_rejects_bad_settings():
+    with pytest.raises(ValueError):
+        LoadGenerator(FakeTester(), scenarios=["nope"])
+    with pytest.raises(ValueError):
+        LoadGenerator(FakeTester(), scenarios=["root"], concurrency=0)
+    assert "streaming" not in LOAD_SCENARIOS
@@ -0,0 +1,148 @@
+import time
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from http_transport import PooledTransport
+from request_metrics import RequestMetrics
+from response_cache import CachingTransport, ResponseCache, cache_key
+from stub_server import StubServer
+
+BASE = "http://fleetpulse.test/api"
+
+
+def make_response(status=200, body=b'{"drivers": []}', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = BASE
+    return response
+
+
+class FakeTransport:
+    """Records requests and answers from a queue of canned responses"""
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+    def connection_stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def test_cache_key_normalizes_query_order():
+    assert cache_key("GET", f"{BASE}/x?b=2&a=1") == cache_key("GET", f"{BASE}/x?a=1&b=2")
+    assert cache_key("GET", f"{BASE}/x?a=1") != cache_key("GET", f"{BASE}/x?a=2")
+
+
+def test_fresh_hit_skips_the_network():
+    inner = FakeTransport(make_response())
+    transport = CachingTransport(inner, ResponseCache(ttl=60))
+    first = transport.request("GET", f"{BASE}/fleet/drivers")
+    second = transport.request("GET", f"{BASE}/fleet/drivers")
+    assert len(inner.calls) == 1
+    assert not hasattr(first, "cache_status")
+    assert second.cache_status == "hit"
+    assert second.json() == first.json()
+    stats = transport.cache_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert stats["bytes_saved"] == len(first.content)
+
+
+def test_stale_entry_revalidates_with_etag():
+    inner = FakeTransport(make_response(headers={"ETag": '"v1"'}),
+                          make_response(304, b"", {"ETag": '"v1"'}))
+    cache = ResponseCache(ttl=0)
+    transport = CachingTransport(inner, cache)
+    transport.request("GET", f"{BASE}/fleet/routes")
+    revalidated = transport.request("GET", f"{BASE}/fleet/routes")
+    assert inner.calls[1][2]["headers"]["If-None-Match"] == '"v1"'
+    assert revalidated.status_code == 200
+    assert revalidated.content == b'{"drivers": []}'
+    assert revalidated.cache_status == "revalidated"
+    assert cache.revalidated == 1
+
+
+def test_changed_entry_is_replaced():
+    inner = FakeTransport(make_response(headers={"ETag": '"v1"'}),
+                          make_response(body=b'{"v": 2}', headers={"ETag": '"v2"'}))
+    cache = ResponseCache(ttl=0)
+    transport = CachingTransport(inner, cache)
+    transport.request("GET", f"{BASE}/fleet/routes")
+    assert transport.request("GET", f"{BASE}/fleet/routes").json() == {"v": 2}
+    entry, _ = cache.get(cache_key("GET", f"{BASE}/fleet/routes"))
+    assert entry.etag == '"v2"'
+
+
+def test_uncacheable_requests_pass_through():
+    inner = FakeTransport(*[make_response() for _ in range(6)])
+    transport = CachingTransport(inner, ResponseCache(ttl=60))
+    for _ in range(2):
+        transport.request("GET", f"{BASE}/fleet/vehicles")
+        transport.request("POST", f"{BASE}/fleet/drivers")
+        transport.request("GET", f"{BASE}/fleet/drivers", stream=True)
+    assert len(inner.calls) == 6
+    assert transport.cache_stats()["entries"] == 0
+
+
+def test_no_store_and_errors_are_not_cached():
+    inner = FakeTransport(make_response(headers={"Cache-Control": "no-store"}),
+                          make_response(500), make_response(), make_response())
+    transport = CachingTransport(inner, ResponseCache(ttl=60))
+    for _ in range(3):
+        transport.request("GET", f"{BASE}/fleet/compliance")
+    assert transport.request("GET", f"{BASE}/fleet/compliance").cache_status == "hit"
+    assert len(inner.calls) == 3
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    inner = FakeTransport(*[make_response() for _ in range(4)])
+    transport = CachingTransport(inner, cache, cacheable=None)
+    for path in ("/a", "/b", "/a", "/c", "/b"):
+        transport.request("GET", BASE + path)
+    # /a was used more recently than /b, so /b went when /c arrived
+    assert cache.evictions == 2
+    assert len(inner.calls) == 4
+
+
+def test_ttl_expiry_without_etag_refetches():
+    inner = FakeTransport(make_response(), make_response())
+    transport = CachingTransport(inner, ResponseCache(ttl=0.05))
+    transport.request("GET", f"{BASE}/fleet/drivers")
+    time.sleep(0.06)
+    transport.request("GET", f"{BASE}/fleet/drivers")
+    assert len(inner.calls) == 2
+    assert "headers" not in inner.calls[1][2]
+
+
+def test_metrics_keep_cache_hits_apart():
+    metrics = RequestMetrics()
+    inner = FakeTransport(make_response())
+    transport = CachingTransport(inner, ResponseCache(ttl=60))
+    for _ in range(3):
+        response = transport.request("GET", f"{BASE}/fleet/drivers")
+        metrics("GET", "/fleet/drivers", 0.01, response, None)
+    assert metrics.endpoints["GET /fleet/drivers"].wall.count == 1
+    assert metrics.endpoints["GET /fleet/drivers [cache hit]"].wall.count == 2
+
+
+def test_revalidation_against_stub_etags():
+    with StubServer(seed=3, etags=True) as stub:
+        transport = CachingTransport(PooledTransport(), ResponseCache(ttl=0))
+        try:
+            first = transport.request("GET", f"{stub.base_url}/fleet/drivers")
+            second = transport.request("GET", f"{stub.base_url}/fleet/drivers")
+        finally:
+            transport.close()
+    assert second.json() == first.json()
+    assert second.cache_status == "revalidated"
+    assert stub.not_modified == 1
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from result_sink import ResultSink
+
+
+def result(index, success=True, payload=None):
+    return {"test": f"check {index}", "success": success, "details": f"detail {index}",
+            "timestamp": f"2025-01-01T00:00:{index % 60:02d}", "response_data": payload}
+
+
+def read_lines(*paths):
+    lines = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            lines += [json.loads(line) for line in f]
+    return lines
+
+
+def test_aggregates_without_a_file():
+    sink = ResultSink(max_failures_kept=2)
+    for index in range(5):
+        sink.write(result(index, success=index % 2 == 0))
+    assert (sink.total, sink.passed, sink.failed) == (5, 3, 2)
+    assert sink.success_rate == 60.0
+    assert [failure["test"] for failure in sink.recent_failures] == ["check 1", "check 3"]
+    sink.write(result(5, success=False))
+    assert [failure["test"] for failure in sink.recent_failures] == ["check 3", "check 5"]
+    assert ResultSink().success_rate == 0.0
+
+
+@pytest.mark.parametrize("limit", range(1, 24))
+def test_truncation_never_splits_a_multibyte_character(limit):
+    payload = {"driver": "Müller 東京 🚚"}
+    sink = ResultSink(max_payload_bytes=limit)
+    encoded = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    record = sink._payload(payload, keep=True)
+    if len(encoded) <= limit:
+        assert record == payload
+        return
+    assert record["_truncated"] and record["bytes"] == len(encoded)
+    preview = record["preview"].encode("utf-8")
+    assert len(preview) <= limit
+    # Only a partial character at the cut is dropped, never more
+    assert limit - len(preview) < 4
+    assert encoded.startswith(preview)
+    assert sink.truncated_payloads == 1
+
+
+@pytest.mark.parametrize("rate,kept", [(0.0, 0), (1.0, 12), (0.25, 3)])
+def test_payload_sample_rate(tmp_path, rate, kept):
+    path = tmp_path / "results.jsonl"
+    sink = ResultSink(str(path), payload_sample_rate=rate)
+    for index in range(12):
+        sink.write(result(index, payload={"n": index}))
+    sink.write(result(12, success=False, payload={"n": 12}))
+    sink.close()
+    records = read_lines(path)
+    passing = [record for record in records if record["success"]]
+    assert sum(record["response_data"] is not None for record in passing) == kept
+    assert sink.dropped_payloads == 12 - kept
+    # Failures always keep their payload
+    assert records[-1]["response_data"] == {"n": 12}
+
+
+def test_sampling_is_repeatable(tmp_path):
+    runs = []
+    for name in ("a.jsonl", "b.jsonl"):
+        sink = ResultSink(str(tmp_path / name), payload_sample_rate=0.3)
+        for index in range(40):
+            sink.write(result(index, success=index % 7 != 0, payload={"n": index}))
+        sink.close()
+        runs.append([record["response_data"] for record in read_lines(tmp_path / name)])
+    assert runs[0] == runs[1]
+    # Sampling is by count, so passing payloads are kept evenly: one per 1/rate passes
+    kept = [data["n"] for data in runs[0] if data is not None and data["n"] % 7]
+    assert len(kept) == 10
+
+
+def test_rotation_keeps_every_line_valid(tmp_path):
+    path = tmp_path / "results.jsonl"
+    max_bytes = 2000
+    sink = ResultSink(str(path), max_bytes=max_bytes, backup_count=50)
+    for index in range(300):
+        sink.write(result(index, success=index % 5 != 0, payload={"text": "é" * (index % 40)}))
+    sink.close()
+    files = sorted(tmp_path.glob("results.jsonl*"), key=lambda p: (len(p.name), p.name))
+    assert len(files) > 5
+    assert all(f.stat().st_size <= max_bytes for f in files)
+    # Backups are numbered newest first, so read them oldest first
+    ordered = files[:1] + files[1:][::-1]
+    records = read_lines(*ordered[1:], ordered[0])
+    assert [record["test"] for record in records] == [f"check {i}" for i in range(300)]
+
+
+def test_rotation_drops_the_oldest_backups(tmp_path):
+    path = tmp_path / "results.jsonl"
+    sink = ResultSink(str(path), max_bytes=500, backup_count=2)
+    for index in range(100):
+        sink.write(result(index))
+    sink.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == \
+        ["results.jsonl", "results.jsonl.1", "results.jsonl.2"]
+    assert read_lines(path)[-1]["test"] == "check 99"
+    assert sink.total == 100
+
+
+def test_close_flushes_and_later_writes_only_count(tmp_path):
+    path = tmp_path / "results.jsonl"
+    sink = ResultSink(str(path))
+    for index in range(3):
+        sink.write(result(index, payload={"non-json": {1, 2}} if index == 2 else None))
+    sink.close()
+    records = read_lines(path)
+    assert [record["test"] for record in records] == ["check 0", "check 1", "check 2"]
+    assert records[2]["response_data"] == {"non-json": "{1, 2}"}
+    sink.write(result(3))
+    sink.close()
+    assert len(read_lines(path)) == 3
+    assert sink.total == 4
@@ -0,0 +1,144 @@
+import math
+from types import SimpleNamespace
+
+import pytest
+
+import roi_engine
+from roi_engine import RoiSweep, calculate_roi, js_number, js_round, parse_range, roi_diff
+
+# Expected bodies computed by the route.js arithmetic under Node
+ROUTE_JS_CASES = [
+    ((15, 180000, 3), {"monthlySavings": 152000, "annualSavings": 1824000, "netSavings": 1698000,
+                       "roi": 1348, "breakdown": {"fuelSavings": 27000, "accidentSavings": 5000,
+                                                  "maintenanceSavings": 120000,
+                                                  "totalCost": 126000}}),
+    ((1, 12345.5, 1), {"monthlySavings": 11518, "annualSavings": 138222, "netSavings": 129822,
+                       "roi": 1545, "breakdown": {"fuelSavings": 1852, "accidentSavings": 1667,
+                                                  "maintenanceSavings": 8000, "totalCost": 8400}}),
+    ((0, 50000, 2), {"monthlySavings": 10833, "annualSavings": 130000, "netSavings": 130000,
+                     "roi": None, "breakdown": {"fuelSavings": 7500, "accidentSavings": 3333,
+                                                "maintenanceSavings": 0, "totalCost": 0}}),
+    (("5", 1000, 0), {"monthlySavings": 40150, "annualSavings": 481800, "netSavings": 439800,
+                      "roi": 1047, "breakdown": {"fuelSavings": 150, "accidentSavings": 0,
+                                                 "maintenanceSavings": 40000, "totalCost": 42000}}),
+    # A missing field is undefined in route.js, so everything it touches is NaN -> null
+    ((None, 100, 1), {"monthlySavings": None, "annualSavings": None, "netSavings": None,
+                      "roi": None, "breakdown": {"fuelSavings": 15, "accidentSavings": 1667,
+                                                 "maintenanceSavings": None, "totalCost": None}}),
+    ((7, -2.5, 1), {"monthlySavings": 57666, "annualSavings": 691996, "netSavings": 633196,
+                    "roi": 1077, "breakdown": {"fuelSavings": 0, "accidentSavings": 1667,
+                                               "maintenanceSavings": 56000, "totalCost": 58800}}),
+]
+
+TRUCKS = [0, 1, 2.5, 15, 400]
+FUEL_COSTS = [0, 999.5, 180000, 2.5e6]
+ACCIDENTS = [0, 1, 3, 12]
+
+
+@pytest.mark.parametrize("args,expected", ROUTE_JS_CASES)
+def test_calculate_roi_matches_route_js(args, expected):
+    assert calculate_roi(*args) == expected
+
+
+def test_js_round_matches_math_round():
+    assert js_round(2.5) == 3
+    assert js_round(-2.5) == -2
+    assert js_round(-0.4) == 0
+    assert js_round(math.nan) is None
+    assert js_round(math.inf) is None
+
+
+def test_js_number_coercion():
+    assert js_number("12") == 12.0
+    assert js_number("") == 0.0
+    assert js_number(True) == 1.0
+    assert math.isnan(js_number("abc"))
+    assert math.isnan(js_number(None))
+
+
+def scalar_sweep(monkeypatch):
+    monkeypatch.setattr(roi_engine, "_load_numpy", lambda: None)
+    return RoiSweep(TRUCKS, FUEL_COSTS, ACCIDENTS)
+
+
+def test_scalar_sweep_matches_calculate_roi(monkeypatch):
+    sweep = scalar_sweep(monkeypatch)
+    assert len(sweep) == len(TRUCKS) * len(FUEL_COSTS) * len(ACCIDENTS)
+    for index in range(len(sweep)):
+        body = sweep.request(index)
+        expected = calculate_roi(body["trucks"], body["monthlyFuelCost"],
+                                 body["accidentsPerYear"])
+        assert roi_diff(expected, sweep.response(index)) == {}
+
+
+def test_vectorized_sweep_matches_scalar(monkeypatch):
+    numpy = pytest.importorskip("numpy")
+    vectorized = RoiSweep(TRUCKS, FUEL_COSTS, ACCIDENTS)
+    assert vectorized.np is numpy
+    scalar = scalar_sweep(monkeypatch)
+    assert len(vectorized) == len(scalar)
+    for index in range(len(scalar)):
+        assert vectorized.request(index) == scalar.request(index)
+        assert vectorized.response(index) == scalar.response(index)
+    assert vectorized.top(5) == scalar.top(5)
+
+
+def test_top_ranks_null_roi_last(monkeypatch):
+    sweep = scalar_sweep(monkeypatch)
+    ranked = sweep.top(len(sweep))
+    rois = [sweep.response(index)["roi"] for index in ranked]
+    nulls = rois.count(None)
+    assert nulls
+    assert rois[-nulls:] == [None] * nulls
+    assert rois[:-nulls] == sorted(rois[:-nulls], reverse=True)
+
+
+def test_roi_diff_reports_fields():
+    expected = calculate_roi(15, 180000, 3)
+    actual = dict(expected, roi=1, breakdown=dict(expected["breakdown"], totalCost=0))
+    assert roi_diff(expected, actual) == {"roi": (1348, 1), "breakdown.totalCost": (126000, 0)}
+
+
+class SkewedClient:
+    """Answers /calculate-roi with the route.js body, one field off for a few trucks"""
+    def __init__(self, skew_trucks):
+        self.skew_trucks = skew_trucks
+        self.requests = []
+
+    def request(self, method, path, json=None):
+        self.requests.append((method, path, json))
+        body = calculate_roi(json["trucks"], json["monthlyFuelCost"], json["accidentsPerYear"])
+        if json["trucks"] in self.skew_trucks:
+            body = dict(body, roi=-1)
+        return SimpleNamespace(json=lambda: body)
+
+
+def test_cross_check_reports_mismatching_samples(monkeypatch):
+    sweep = scalar_sweep(monkeypatch)
+    client = SkewedClient(skew_trucks={15})
+    indices, mismatches = sweep.cross_check(client, sample_size=20, seed=3)
+    assert len(indices) == len(client.requests) == 20
+    assert {(method, path) for method, path, _ in client.requests} == {("POST", "/calculate-roi")}
+    skewed = [sweep.request(i) for i in indices if sweep.request(i)["trucks"] == 15]
+    assert skewed
+    assert [mismatch["request"] for mismatch in mismatches] == skewed
+    assert all(set(mismatch["diff"]) == {"roi"} for mismatch in mismatches)
+
+
+def test_cross_check_against_the_stub(monkeypatch):
+    pytest.importorskip("requests")
+    from fleetpulse_client import FleetPulseClient
+    from http_transport import PooledTransport
+    from stub_server import StubServer
+
+    sweep = scalar_sweep(monkeypatch)
+    with StubServer(seed=4) as stub, FleetPulseClient(stub.base_url, PooledTransport()) as client:
+        indices, mismatches = sweep.cross_check(client, sample_size=15, seed=1)
+    assert len(indices) == 15
+    assert mismatches == []
+
+
+def test_parse_range():
+    assert parse_range("1:5:2") == [1.0, 3.0, 5.0]
+    assert parse_range("0:1:0.25") == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert parse_range("10,20") == [10.0, 20.0]
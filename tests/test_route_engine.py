@@ -0,0 +1,209 @@
+import itertools
+import json
+import random
+
+import pytest
+
+import route_engine
+from route_engine import (DIESEL_PRICE, KM_PER_LITRE, RoadGraph, RouteEngine, ShortestPathCache,
+                          compare_routes, format_eta, load_graph, parse_eta, parse_route_name,
+                          synthetic_graph)
+from stub_server import FleetPulseStubApp
+
+
+def adjacency(graph):
+    return sorted((graph.names[a], graph.names[b], distance, round(hours, 9), traffic)
+                  for a, edges in enumerate(graph.adjacency)
+                  for b, distance, hours, traffic in edges)
+
+
+def random_graph(nodes=25, edges=70, seed=0):
+    rng = random.Random(seed)
+    graph = RoadGraph()
+    for i in range(nodes):
+        graph.add_node(f"N{i}")
+    for _ in range(edges):
+        a, b = rng.sample(range(nodes), 2)
+        graph.add_edge(f"N{a}", f"N{b}", rng.randint(5, 300), rng.choice([40, 55, 80]),
+                       rng.choice(["light", "moderate", "heavy"]), oneway=rng.random() < 0.4)
+    return graph
+
+
+def floyd_warshall(graph, weight_index):
+    n = len(graph.names)
+    best = [[0.0 if i == j else float("inf") for j in range(n)] for i in range(n)]
+    for a, edges in enumerate(graph.adjacency):
+        for edge in edges:
+            best[a][edge[0]] = min(best[a][edge[0]], edge[weight_index])
+    for k, i, j in itertools.product(range(n), repeat=3):
+        if best[i][k] + best[k][j] < best[i][j]:
+            best[i][j] = best[i][k] + best[k][j]
+    return best
+
+
+def write_and_load(graph, tmp_path):
+    path = tmp_path / "graph.json"
+    path.write_text(json.dumps(graph.to_dict()))
+    return load_graph(str(path))
+
+
+def test_round_trip_keeps_oneway_edges(tmp_path):
+    graph = RoadGraph()
+    graph.add_edge("Pune", "Mumbai", 150)
+    graph.add_edge("Mumbai", "Nashik", 170, oneway=True)
+    graph.add_edge("Surat", "Mumbai", 280, traffic="heavy", oneway=True)
+    graph.add_edge("Mumbai", "Surat", 290, traffic="light", oneway=True)
+    loaded = write_and_load(graph, tmp_path)
+    assert adjacency(loaded) == adjacency(graph)
+    assert loaded.edge_count == graph.edge_count == 5
+    oneway = {(edge["from"], edge["to"]): edge["oneway"] for edge in graph.to_dict()["edges"]}
+    assert oneway == {("Pune", "Mumbai"): False, ("Mumbai", "Nashik"): True,
+                      ("Surat", "Mumbai"): True, ("Mumbai", "Surat"): True}
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_round_trip_random_graphs(tmp_path, seed):
+    graph = random_graph(seed=seed)
+    loaded = write_and_load(graph, tmp_path)
+    assert adjacency(loaded) == adjacency(graph)
+    # Writing the reloaded graph again is stable
+    assert loaded.to_dict() == graph.to_dict()
+
+
+def test_round_trip_synthetic_graph_keeps_coordinates(tmp_path):
+    graph = synthetic_graph()
+    loaded = write_and_load(graph, tmp_path)
+    assert adjacency(loaded) == adjacency(graph)
+    assert loaded.coordinates == [tuple(c) for c in graph.coordinates]
+
+
+def test_csv_edge_list(tmp_path):
+    path = tmp_path / "roads.csv"
+    path.write_text("from,to,distance_km,speed_kmh,traffic,oneway\n"
+                    "A,B,10,50,light,false\n"
+                    "B,C,20,,heavy,true\n")
+    graph = load_graph(str(path))
+    assert graph.edge_count == 3
+    engine = RouteEngine(graph)
+    paths = engine.paths([("A", "C"), ("C", "A")])
+    assert paths[("A", "C")].distance_km == 30
+    assert paths[("C", "A")] is None
+
+
+@pytest.mark.parametrize("weight,weight_index", [("time", 2), ("distance", 1)])
+def test_paths_match_floyd_warshall(weight, weight_index):
+    graph = random_graph(seed=4)
+    engine = RouteEngine(graph, weight=weight)
+    pairs = [(o, d) for o in graph.names for d in graph.names if o != d]
+    paths = engine.paths(pairs)
+    best = floyd_warshall(graph, weight_index)
+    for origin, destination in pairs:
+        expected = best[graph.node(origin)][graph.node(destination)]
+        path = paths[(origin, destination)]
+        if expected == float("inf"):
+            assert path is None
+            continue
+        cost = path.hours if weight == "time" else path.distance_km
+        assert cost == pytest.approx(expected)
+        assert path.nodes[0] == graph.node(origin)
+        assert path.nodes[-1] == graph.node(destination)
+    # One Dijkstra run per origin covers every destination
+    assert engine.dijkstra_runs == len(graph.names)
+
+
+def test_repeat_batches_hit_the_cache_including_unreachable_pairs():
+    graph = RoadGraph()
+    graph.add_edge("A", "B", 10, oneway=True)
+    graph.add_node("C")
+    engine = RouteEngine(graph, ShortestPathCache())
+    pairs = [("A", "B"), ("B", "A"), ("A", "C")]
+    first = engine.paths(pairs)
+    second = engine.paths(pairs)
+    assert first.keys() == second.keys()
+    assert second[("B", "A")] is None and second[("A", "C")] is None
+    assert engine.dijkstra_runs == 2
+    assert engine.cache.stats()["hits"] == 3
+
+
+@pytest.mark.parametrize("distance,speed", [(0, 60), (-5, 60), (10, 0), (float("nan"), 60)])
+def test_edges_need_positive_distance_and_speed(distance, speed):
+    with pytest.raises(ValueError, match="positive"):
+        RoadGraph().add_edge("A", "B", distance, speed)
+
+
+def test_load_graph_rejects_zero_length_edges(tmp_path):
+    path = tmp_path / "roads.csv"
+    path.write_text("from,to,distance_km\nA,B,0\n")
+    with pytest.raises(ValueError, match="A -> B"):
+        load_graph(str(path))
+
+
+def test_cache_eviction():
+    cache = ShortestPathCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, key)
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_unknown_place():
+    with pytest.raises(KeyError):
+        RouteEngine(synthetic_graph()).paths([("Mumbai", "Atlantis")])
+
+
+def test_routes_shape():
+    engine = RouteEngine(synthetic_graph())
+    body = engine.routes([("Mumbai", "Pune"), ("Delhi", "Agra")])
+    assert body["count"] == 2
+    route = body["routes"][0]
+    assert route["id"] == "R001"
+    assert route["name"] == "Mumbai to Pune"
+    assert set(route) == {"id", "name", "distance", "estimatedTime", "traffic", "fuelCost"}
+    path = engine.paths([("Mumbai", "Pune")])[("Mumbai", "Pune")]
+    assert route["distance"] == round(path.distance_km)
+    assert route["fuelCost"] == round(path.distance_km / KM_PER_LITRE * DIESEL_PRICE)
+    assert route["estimatedTime"] == format_eta(path.hours)
+
+
+def test_format_and_parse_eta():
+    assert format_eta(3.5) == "3h 30m"
+    assert format_eta(0.25) == "15m"
+    assert format_eta(4.24) == "4h 15m"
+    assert parse_eta("4h 15m") == 4.25
+    assert parse_eta("45m") == 0.75
+
+
+def test_parse_route_name():
+    assert parse_route_name("Mumbai to Pune Express") == ("Mumbai", "Pune")
+    assert parse_route_name("Delhi to Agra Highway") == ("Delhi", "Agra")
+    assert parse_route_name("Ring Road") is None
+
+
+def test_compare_with_served_routes():
+    _, served = FleetPulseStubApp().get("/fleet/routes", {})
+    engine = RouteEngine(synthetic_graph())
+    pairs = [parse_route_name(route["name"]) for route in served["routes"]]
+    rows = compare_routes(served, engine.routes(pairs))
+    assert [row["name"] for row in rows] == [route["name"] for route in served["routes"]]
+    assert not any(row.get("missing") for row in rows)
+
+
+def test_cli_rejects_unknown_and_malformed_pairs(capsys):
+    with pytest.raises(SystemExit) as info:
+        route_engine.main(["--pairs", "Mumbai:Pune", "Mumbai:Atlantis", "Gotham:Pune"])
+    assert info.value.code == 2
+    assert "unknown places in --pairs: Atlantis, Gotham" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        route_engine.main(["--pairs", "Mumbai-Pune"])
+    assert "origin:destination, got Mumbai-Pune" in capsys.readouterr().err
+
+
+def test_cli_prints_routes_and_writes_the_graph(tmp_path, capsys):
+    graph_path = tmp_path / "graph.json"
+    out = tmp_path / "routes.json"
+    assert route_engine.main(["--pairs", "Mumbai:Pune", "--write-graph", str(graph_path),
+                              "--out", str(out)]) == 0
+    assert "  • Mumbai to Pune: " in capsys.readouterr().out
+    assert json.loads(out.read_text())["count"] == 1
+    assert route_engine.main(["--graph", str(graph_path), "--pairs", "Pune:Mumbai"]) == 0
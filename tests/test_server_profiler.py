@@ -0,0 +1,275 @@
+import json
+import socket
+import struct
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from server_profiler import InspectorSession, ServerProfiler
+
+
+def frame(opcode, payload, fin=True, mask=None):
+    """A server frame; servers normally send unmasked, but masked ones must decode too"""
+    header = bytearray([(0x80 if fin else 0) | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", length)
+    if mask:
+        header += mask
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return bytes(header) + payload
+
+
+def read_frame(f):
+    """(fin, opcode, unmasked payload, mask, length field) of the next frame, None on EOF"""
+    head = f.read(2)
+    if len(head) < 2:
+        return None
+    first, second = head
+    length = field = second & 0x7F
+    if field == 126:
+        length = struct.unpack("!H", f.read(2))[0]
+    elif field == 127:
+        length = struct.unpack("!Q", f.read(8))[0]
+    mask = f.read(4) if second & 0x80 else None
+    payload = f.read(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return bool(first & 0x80), first & 0x0F, payload, mask, field
+
+
+def message(**fields):
+    return frame(0x1, json.dumps(fields).encode())
+
+
+@pytest.fixture
+def session_pair():
+    """An InspectorSession wired to the test through a socketpair, skipping the handshake"""
+    client, server = socket.socketpair()
+    session = object.__new__(InspectorSession)
+    session.sock = client
+    session._file = client.makefile("rb")
+    session._next_id = 0
+    reader = server.makefile("rb")
+    yield session, server, reader
+    reader.close()
+    server.close()
+    session._file.close()
+    session.close()
+
+
+def feed(sock, *frames):
+    # Large frames can outgrow the socket buffer before the session reads them
+    thread = threading.Thread(target=sock.sendall, args=(b"".join(frames),))
+    thread.start()
+    return thread
+
+
+@pytest.mark.parametrize("size,field", [(0, 0), (125, 125), (126, 126), (200, 126),
+                                        (65535, 126), (65536, 127), (70000, 127)])
+def test_client_frames_are_masked_with_the_right_length_encoding(session_pair, size, field):
+    session, server, reader = session_pair
+    payload = bytes(i % 251 for i in range(size))
+    thread = threading.Thread(target=session._send_frame, args=(0x1, payload))
+    thread.start()
+    fin, opcode, received, mask, length_field = read_frame(reader)
+    thread.join()
+    assert (fin, opcode, length_field) == (True, 0x1, field)
+    assert mask is not None and len(mask) == 4
+    assert received == payload
+
+
+@pytest.mark.parametrize("size", [10, 200, 65535, 70000])
+@pytest.mark.parametrize("mask", [None, b"\x01\x80\xfe\x37"])
+def test_receive_decodes_each_length_encoding(session_pair, size, mask):
+    session, server, reader = session_pair
+    text = "x" * (size - 2)
+    thread = feed(server, frame(0x1, json.dumps(text).encode(), mask=mask))
+    assert session._receive() == text
+    thread.join()
+
+
+def test_fragments_are_joined_around_control_frames(session_pair):
+    session, server, reader = session_pair
+    body = json.dumps({"method": "Debugger.paused", "params": {"reason": "é" * 300}}).encode()
+    thread = feed(server,
+                  frame(0x1, body[:100], fin=False),
+                  frame(0x9, b"are you there", fin=True),
+                  frame(0x0, body[100:250], fin=False),
+                  frame(0xA, b"unsolicited pong"),
+                  frame(0x0, body[250:], fin=True))
+    assert session._receive() == json.loads(body)
+    thread.join()
+    # The ping in the middle of the message was answered straight away
+    fin, opcode, payload, mask, _ = read_frame(reader)
+    assert (fin, opcode, payload) == (True, 0xA, b"are you there")
+    assert mask is not None
+
+
+def test_close_frame_and_eof_raise_connection_error(session_pair):
+    session, server, reader = session_pair
+    feed(server, frame(0x8, struct.pack("!H", 1000))).join()
+    with pytest.raises(ConnectionError, match="closed the WebSocket"):
+        session._receive()
+    feed(server, frame(0x1, b'{"id": 1}')[:5]).join()
+    server.shutdown(socket.SHUT_WR)
+    with pytest.raises(ConnectionError, match="connection closed"):
+        session._receive()
+
+
+def test_call_routes_events_and_matches_the_response_id(session_pair):
+    session, server, reader = session_pair
+    session._next_id = 6
+    events = []
+    thread = feed(server,
+                  message(method="HeapProfiler.addHeapSnapshotChunk", params={"chunk": "{"}),
+                  message(id=3, result={"stale": True}),
+                  message(method="HeapProfiler.reportHeapSnapshotProgress"),
+                  message(id=7, result={"profile": {"nodes": []}}))
+    result = session.call("Profiler.stop", on_event=lambda *event: events.append(event))
+    thread.join()
+    assert result == {"profile": {"nodes": []}}
+    assert events == [("HeapProfiler.addHeapSnapshotChunk", {"chunk": "{"}),
+                      ("HeapProfiler.reportHeapSnapshotProgress", {})]
+    _, opcode, payload, _, _ = read_frame(reader)
+    assert opcode == 0x1
+    assert json.loads(payload) == {"id": 7, "method": "Profiler.stop", "params": {}}
+
+
+def test_call_raises_protocol_errors(session_pair):
+    session, server, reader = session_pair
+    feed(server, message(id=1, error={"code": -32601, "message": "'Nope' wasn't found"})).join()
+    with pytest.raises(RuntimeError, match="Nope.enable failed: 'Nope' wasn't found"):
+        session.call("Nope.enable")
+
+
+class FakeInspector:
+    """A V8 inspector stand-in: /json/list over HTTP plus a WebSocket answering canned replies"""
+    def __init__(self):
+        self.methods = []
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        ws_port = self.listener.getsockname()[1]
+        targets = [{"id": "node-1", "title": "next-router-worker",
+                    "webSocketDebuggerUrl": f"ws://127.0.0.1:{ws_port}/node-1"}]
+
+        class ListHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(targets).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), ListHandler)
+        self.port = self.http.server_address[1]
+        self.threads = [threading.Thread(target=self.http.serve_forever, daemon=True),
+                        threading.Thread(target=self._accept, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            with conn, conn.makefile("rb") as f:
+                while f.readline() not in (b"\r\n", b""):
+                    pass
+                conn.sendall(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                             b"Connection: Upgrade\r\n\r\n")
+                while (received := read_frame(f)) is not None:
+                    if received[1] == 0x1:
+                        conn.sendall(self._reply(json.loads(received[2])))
+
+    def _reply(self, request):
+        self.methods.append(request["method"])
+        if request["method"] == "Profiler.stop":
+            return message(id=request["id"], result={"profile": {"nodes": [], "startTime": 1}})
+        if request["method"] == "HeapProfiler.takeHeapSnapshot":
+            chunk = json.dumps({"method": "HeapProfiler.addHeapSnapshotChunk",
+                                "params": {"chunk": '{"snapshot": '}}).encode()
+            return (frame(0x1, chunk[:20], fin=False) + frame(0x9, b"") +
+                    frame(0x0, chunk[20:]) +
+                    message(method="HeapProfiler.addHeapSnapshotChunk", params={"chunk": "{}}"}) +
+                    message(id=request["id"], result={}))
+        return message(id=request["id"], result={})
+
+    def close(self):
+        self.http.shutdown()
+        self.http.server_close()
+        self.listener.close()
+
+
+def fake_response(status=200):
+    return SimpleNamespace(status_code=status, elapsed=timedelta(seconds=0.001), headers={},
+                           content=b"{}", _content_consumed=True)
+
+
+def test_capture_writes_artifacts_and_keeps_only_its_own_requests(tmp_path):
+    inspector = FakeInspector()
+    tester = SimpleNamespace(request_hooks=[])
+    profiler = ServerProfiler(ports=[inspector.port], output_dir=str(tmp_path),
+                              sampling_interval_us=50).attach(tester)
+    hook = tester.request_hooks[0]
+    try:
+        hook("GET", "/fleet/overview", 0.5, fake_response(), None)
+        with profiler.capture("Fleet API / overview") as capture:
+            hook("GET", "/fleet/drivers", 0.02, fake_response(), None)
+            hook("GET", "/fleet/drivers", 0.04, fake_response(), None)
+            hook("POST", "/calculate-roi", 0.1, None, ConnectionError("reset"))
+        with profiler.capture("ai") as second:
+            hook("POST", "/ai-assistant", 0.3, fake_response(500), None)
+        hook("GET", "/fleet/overview", 0.5, fake_response(), None)
+    finally:
+        inspector.close()
+
+    assert tester.profiler is profiler
+    assert capture.errors == [] and second.errors == []
+    assert capture.endpoints == ["GET /fleet/drivers", "POST /calculate-roi"]
+    assert capture.metrics.endpoints["GET /fleet/drivers"].wall.count == 2
+    assert capture.metrics.endpoints["POST /calculate-roi"].errors == 1
+    assert second.endpoints == ["POST /ai-assistant"]
+    assert profiler.captures == [capture, second]
+    assert inspector.methods[:5] == ["Profiler.enable", "Profiler.setSamplingInterval",
+                                     "Profiler.start", "Profiler.stop", "Profiler.disable"]
+    assert inspector.methods.count("HeapProfiler.takeHeapSnapshot") == 2
+
+    artifact, = capture.artifacts
+    assert artifact["target"] == "next-router-worker"
+    assert artifact["cpu_profile"].endswith(f"Fleet_API_overview-{inspector.port}.cpuprofile")
+    with open(artifact["cpu_profile"]) as f:
+        assert json.load(f) == {"nodes": [], "startTime": 1}
+    with open(artifact["heap_snapshot"]) as f:
+        assert json.load(f) == {"snapshot": {}}
+    with open(profiler.export()) as f:
+        manifest = json.load(f)
+    assert [entry["scenario"] for entry in manifest["captures"]] == ["Fleet API / overview", "ai"]
+
+
+def test_capture_without_an_inspector_still_attributes_requests(tmp_path):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    tester = SimpleNamespace(request_hooks=[])
+    profiler = ServerProfiler(ports=[port], output_dir=str(tmp_path),
+                              scenarios=["overview"]).attach(tester)
+    assert profiler.wants("overview") and not profiler.wants("ai")
+    with profiler.capture("overview") as capture:
+        tester.request_hooks[0]("GET", "/fleet/overview", 0.01, fake_response(), None)
+    assert capture.errors == [f"No inspector on 127.0.0.1 ports [{port}]"]
+    assert capture.artifacts == []
+    assert capture.endpoints == ["GET /fleet/overview"]
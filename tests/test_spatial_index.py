@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+from fleet_generator import FleetGenerator
+from spatial_index import (GridIndex, _linear_nearest, circle_polygon, haversine_km,
+                           point_in_polygon)
+
+SQUARE = [(0, 0), (0, 10), (10, 10), (10, 0)]
+
+
+def random_index(count=3000, cell_km=5.0, seed=0):
+    rng = random.Random(seed)
+    index = GridIndex(cell_km)
+    for i in range(count):
+        index.update(f"V{i}", rng.uniform(18.0, 20.0), rng.uniform(72.0, 74.5))
+    return index, rng
+
+
+def linear_radius(index, lat, lng, km):
+    return sorted((haversine_km(lat, lng, p[0], p[1]), vehicle_id)
+                  for vehicle_id, p in index.positions.items()
+                  if haversine_km(lat, lng, p[0], p[1]) <= km)
+
+
+def test_haversine_known_distance():
+    # Mumbai to Pune is ~120 km as the crow flies
+    assert haversine_km(19.0760, 72.8777, 18.5204, 73.8567) == pytest.approx(119.9, abs=1)
+    assert haversine_km(10, 20, 10, 20) == 0
+
+
+def test_point_in_polygon():
+    assert point_in_polygon(5, 5, SQUARE)
+    assert not point_in_polygon(15, 5, SQUARE)
+    assert not point_in_polygon(5, -1, SQUARE)
+
+
+@pytest.mark.parametrize("cell_km,k", [(1.0, 1), (5.0, 10), (40.0, 25)])
+def test_nearest_matches_linear_scan(cell_km, k):
+    index, rng = random_index(cell_km=cell_km)
+    for _ in range(50):
+        # Queries inside, near and well outside the populated area
+        lat, lng = rng.uniform(17.0, 21.0), rng.uniform(71.0, 75.5)
+        assert index.nearest(lat, lng, k) == _linear_nearest(index.positions, lat, lng, k)
+
+
+def test_nearest_respects_max_km():
+    index, rng = random_index()
+    for _ in range(20):
+        lat, lng = rng.uniform(18.0, 20.0), rng.uniform(72.0, 74.5)
+        expected = [hit for hit in _linear_nearest(index.positions, lat, lng, 5) if hit[0] <= 3]
+        assert index.nearest(lat, lng, 5, max_km=3) == expected
+
+
+def test_radius_matches_linear_scan():
+    index, rng = random_index(cell_km=2.0)
+    for km in (0.5, 5, 30, 500):
+        lat, lng = rng.uniform(18.0, 20.0), rng.uniform(72.0, 74.5)
+        assert index.radius(lat, lng, km) == linear_radius(index, lat, lng, km)
+
+
+def test_within_polygon_matches_linear_scan():
+    index, _ = random_index()
+    polygon = [(18.5, 72.5), (19.5, 72.8), (19.2, 74.0), (18.4, 73.6)]
+    expected = {vehicle_id for vehicle_id, (lat, lng, _) in index.positions.items()
+                if point_in_polygon(lat, lng, polygon)}
+    assert set(index.within_polygon(polygon)) == expected
+    assert expected
+
+
+def test_moves_and_removal_keep_cells_consistent():
+    index, rng = random_index(count=500, cell_km=1.0)
+    for _ in range(2000):
+        index.update(f"V{rng.randrange(500)}", rng.uniform(18.0, 20.0), rng.uniform(72.0, 74.5))
+    for i in range(0, 500, 3):
+        index.remove(f"V{i}")
+    in_cells = [vehicle_id for members in index.cells.values() for vehicle_id in members]
+    assert sorted(in_cells) == sorted(index.positions)
+    assert all(members for members in index.cells.values())
+    for vehicle_id, (lat, lng, cell) in index.positions.items():
+        assert cell == index._cell(lat, lng)
+    lat, lng = 19.0, 73.0
+    assert index.nearest(lat, lng, 7) == _linear_nearest(index.positions, lat, lng, 7)
+
+
+def test_geofence_enter_and_exit_events():
+    index = GridIndex(cell_km=1.0)
+    index.update("A", 19.0, 73.0)
+    index.add_geofence("depot", circle_polygon(19.0, 73.0, 2.0))
+    assert index.members("depot") == ["A"]
+    assert index.update("B", 19.001, 73.001) == [("depot", "enter")]
+    assert index.update("A", 19.5, 73.5) == [("depot", "exit")]
+    assert index.update("A", 19.6, 73.6) == []
+    assert index.members("depot") == ["B"]
+
+
+def test_ingest_accepts_endpoint_items():
+    vehicles = list(FleetGenerator(vehicles=300, seed=5).vehicles())
+    index = GridIndex()
+    index.ingest(vehicles)
+    assert len(index) == 300
+    first = vehicles[0]
+    hits = index.nearest(first["location"]["lat"], first["location"]["lng"], 1)
+    assert hits == [(0.0, first["id"])]
+
+
+def test_empty_index():
+    index = GridIndex()
+    assert index.nearest(19.0, 73.0, 3) == []
+    assert index.radius(19.0, 73.0, 10) == []
+
+
+def test_re_registering_a_geofence_recomputes_membership():
+    index = GridIndex(cell_km=1.0)
+    index.update("A", 19.0, 73.0)
+    index.update("B", 19.5, 73.5)
+    index.add_geofence("depot", circle_polygon(19.0, 73.0, 2.0))
+    index.add_geofence("yard", circle_polygon(19.0, 73.0, 5.0))
+    assert index.members("depot") == ["A"]
+    # Moved to cover B instead of A
+    index.add_geofence("depot", circle_polygon(19.5, 73.5, 2.0))
+    assert index.members("depot") == ["B"]
+    assert index.inside == {"A": {"yard"}, "B": {"depot"}}
+    # Leaving the new fence is an exit; moving within the old area is not an enter
+    assert index.update("B", 19.6, 73.6) == [("depot", "exit")]
+    assert index.update("A", 19.001, 73.001) == []
+    assert index.update("A", 19.5, 73.5) == [("depot", "enter"), ("yard", "exit")]
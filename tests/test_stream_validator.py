@@ -0,0 +1,169 @@
+import json
+import random
+
+import pytest
+
+from stream_validator import (StreamingArrayParser, check_vehicle, required_fields_check,
+                              validate_stream)
+from stub_server import MOCK_FLEET_DATA
+
+TRICKY_ITEMS = [
+    {"id": 1, "speed": 12345.678, "fuel": -0.5e-3},
+    {"name": 'quote " and ] [ } { , inside', "note": "back\\slash \\\" \\u0041"},
+    {"driver": "Müller – 東京 🚚", "tags": ["é", "ß", " "]},
+    [1, [2, [3]], {"nested": "]"}],
+    "plain string item",
+    1234567890123,
+    None,
+    True,
+]
+
+
+def one_byte(data):
+    return [data[i:i + 1] for i in range(len(data))]
+
+
+def random_sizes(data, seed, largest=16):
+    rng = random.Random(seed)
+    chunks, start = [], 0
+    while start < len(data):
+        size = rng.randint(1, largest)
+        chunks.append(data[start:start + size])
+        start += size
+    return chunks
+
+
+def encode(document):
+    return json.dumps(document, ensure_ascii=False).encode("utf-8")
+
+
+def parse(chunks, key="items"):
+    parser = StreamingArrayParser(chunks, key)
+    return list(parser), parser
+
+
+@pytest.mark.parametrize("splitter", [one_byte] + [
+    (lambda data, seed=seed: random_sizes(data, seed)) for seed in range(20)])
+def test_items_survive_any_chunking(splitter):
+    data = encode({"before": {"a": [1, "]"]}, "items": TRICKY_ITEMS, "count": 8, "after": "}"})
+    items, parser = parse(splitter(data))
+    assert items == TRICKY_ITEMS
+    assert parser.rest == {"before": {"a": [1, "]"]}, "count": 8, "after": "}"}
+    assert parser.found
+    assert parser.bytes_read == len(data)
+
+
+@pytest.mark.parametrize("number", ["7", "-12", "12345.678", "1e10", "-0.5E-3", "123456789012"])
+def test_numbers_split_at_every_boundary(number):
+    data = f'{{"items": [{number}, {number}], "count": {number}}}'.encode()
+    for cut in range(1, len(data)):
+        items, parser = parse([data[:cut], data[cut:]])
+        assert items == [json.loads(number)] * 2
+        assert parser.rest == {"count": json.loads(number)}
+
+
+def test_multibyte_characters_split_inside_a_code_point():
+    text = "🚚 東京 Müller"
+    data = encode({"items": [text]})
+    for cut in range(1, len(data)):
+        assert parse([data[:cut], data[cut:]])[0] == [text]
+
+
+def test_escapes_split_between_backslash_and_quote():
+    data = b'{"items": ["a\\"]", "b\\\\", "\\u00e9\\n"]}'
+    for cut in range(1, len(data)):
+        assert parse([data[:cut], data[cut:]])[0] == ['a"]', "b\\", "é\n"]
+
+
+def test_empty_array_and_whitespace():
+    items, parser = parse(one_byte(b' { "items" : [ ] , "count" : 0 } '))
+    assert items == []
+    assert parser.found
+    assert parser.rest == {"count": 0}
+
+
+def test_missing_array_key():
+    items, parser = parse(random_sizes(encode({"vehicles": [1, 2], "count": 2}), 1))
+    assert items == []
+    assert not parser.found
+    assert parser.rest == {"vehicles": [1, 2], "count": 2}
+    items, parser = parse([b"{}"])
+    assert items == []
+    assert not parser.found
+
+
+def test_non_array_value_under_the_key_is_kept_in_rest():
+    items, parser = parse([b'{"items": {"not": "a list"}}'])
+    assert items == []
+    assert not parser.found
+    assert parser.rest == {"items": {"not": "a list"}}
+
+
+@pytest.mark.parametrize("data,complete", [
+    (b'{"items": [{"a": 1}, {"a": 2', [{"a": 1}]),
+    (b'{"items": [{"a": 1}, {"a": 2}', [{"a": 1}, {"a": 2}]),
+    (b'{"items": [1, 23', [1]),
+    (b'{"items": ["abc', []),
+    (b'{"items": [1], "count": 4', [1]),
+    (b'{"items": [1]', [1]),
+    (b'{"ite', []),
+    (b'', []),
+])
+def test_truncated_input_raises_without_a_partial_item(data, complete):
+    for chunks in (one_byte(data), [data]):
+        parser = StreamingArrayParser(chunks, "items")
+        items = []
+        with pytest.raises(ValueError):
+            for item in parser:
+                items.append(item)
+        assert items == complete
+
+
+def test_malformed_separators_raise():
+    with pytest.raises(ValueError):
+        list(StreamingArrayParser([b'{"items": [1 2]}'], "items"))
+    with pytest.raises(ValueError):
+        list(StreamingArrayParser([b'["items"]'], "items"))
+
+
+def test_buffer_stays_bounded_on_a_large_payload():
+    vehicles = [dict(MOCK_FLEET_DATA["vehicles"][i % 3], id=f"V{i:05d}") for i in range(2000)]
+    data = encode({"vehicles": vehicles, "count": len(vehicles)})
+    chunk_size = 4096
+    parser = StreamingArrayParser(
+        (data[i:i + chunk_size] for i in range(0, len(data), chunk_size)), "vehicles")
+    largest_item = max(len(encode(vehicle)) for vehicle in vehicles)
+    peak = 0
+    count = 0
+    for item in parser:
+        count += 1
+        peak = max(peak, len(parser._buffer))
+        assert item["id"] == f"V{count - 1:05d}"
+    assert count == 2000
+    assert parser.rest == {"count": 2000}
+    # Never more than one partial item plus the chunk that completed it
+    assert peak <= chunk_size + largest_item
+    assert len(data) > 50 * peak
+
+
+def test_validate_stream_reports_invalid_items():
+    vehicles = [dict(vehicle) for vehicle in MOCK_FLEET_DATA["vehicles"]]
+    del vehicles[1]["fuel"]
+    vehicles.append("not an object")
+    data = encode({"vehicles": vehicles, "count": len(vehicles)})
+    report = validate_stream(random_sizes(data, 2, largest=64), "vehicles", check_vehicle)
+    assert (report.items, report.invalid) == (4, 2)
+    assert report.errors == [{"index": 1, "problems": ["missing fuel"]},
+                             {"index": 3, "problems": ["item is not an object"]}]
+    assert report.rest == {"count": 4}
+    assert report.bytes == len(data)
+    assert report.peak_memory is None
+    assert not report.ok
+
+
+def test_validate_stream_tracks_memory_on_request():
+    data = encode({"drivers": MOCK_FLEET_DATA["drivers"]})
+    report = validate_stream([data], "drivers", required_fields_check(["id", "name"]),
+                             track_memory=True)
+    assert report.ok
+    assert report.peak_memory > 0
@@ -0,0 +1,166 @@
+import http.client
+import json
+import socket
+
+import pytest
+
+from roi_engine import calculate_roi
+from stub_server import FleetPulseStubApp, StubServer
+
+
+@pytest.fixture
+def app():
+    return FleetPulseStubApp()
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StubServer(seed=7, etags=True) as stub:
+        yield stub
+
+
+def fetch(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    try:
+        payload = None if body is None else json.dumps(body)
+        connection.request(method, "/api" + path, body=payload, headers=headers or {})
+        response = connection.getresponse()
+        data = response.read()
+        return response.status, dict(response.getheaders()), json.loads(data) if data else None
+    finally:
+        connection.close()
+
+
+def test_root(app):
+    status, payload = app.get("/", {})
+    assert status == 200
+    assert payload["message"] == "FleetPulse API is running!"
+    assert payload["version"] == "1.0.0"
+    assert payload["timestamp"].endswith("Z")
+
+
+def test_overview_varies_analytics_but_not_vehicles(app):
+    _, first = app.get("/fleet/overview", {})
+    _, second = app.get("/fleet/overview", {})
+    assert set(first) == {"analytics", "vehicles", "lastUpdated"}
+    # route.js stamps vehicle lastUpdate once at module load
+    assert first["vehicles"] == second["vehicles"]
+    analytics = first["analytics"]
+    assert analytics["activeVehicles"] <= analytics["totalVehicles"]
+
+
+def test_inactive_vehicles_report_zero_speed(app):
+    _, payload = app.get("/fleet/vehicles", {})
+    assert payload["count"] == len(payload["vehicles"])
+    for vehicle in payload["vehicles"]:
+        if vehicle["status"] != "active":
+            assert vehicle["speed"] == 0
+        assert vehicle["fuel"] >= 10
+
+
+def test_static_lists_have_counts(app):
+    for path, key in (("/fleet/drivers", "drivers"), ("/fleet/routes", "routes")):
+        _, payload = app.get(path, {})
+        assert payload["count"] == len(payload[key])
+
+
+def test_ai_get_branches(app):
+    cases = {"top driver": "Rajesh Kumar", "fuel": "6.2 km/L", "accident": "94/100",
+             "route": "Mumbai to Pune", "cost": "demo AI assistant"}
+    for query, expected in cases.items():
+        _, payload = app.get("/ai/query", {"q": [query]})
+        assert expected in payload["response"], query
+        assert payload["query"] == query
+
+
+def test_ai_post_branches_and_missing_query(app):
+    _, payload = app.post("/ai/query", {"query": "cost savings"})
+    assert payload["response"].startswith("Cost Savings Summary")
+    _, payload = app.post("/ai/query", {"query": "safety"})
+    assert "demo AI assistant for FleetPulse" in payload["response"]
+    # JSON.stringify drops the undefined query key
+    _, payload = app.post("/ai/query", {})
+    assert "query" not in payload
+
+
+def test_post_null_body_fails_like_route_js(app):
+    with pytest.raises(TypeError):
+        app.post("/ai/query", None)
+
+
+def test_unknown_paths(app):
+    assert app.get("/nope", {}) == (404, {"error": "Endpoint not found", "path": "/nope"})
+    assert app.post("/nope", {}) == (404, {"error": "POST endpoint not found", "path": "/nope"})
+
+
+def test_calculate_roi_uses_shared_formula(server):
+    body = {"trucks": 15, "monthlyFuelCost": 180000, "accidentsPerYear": 3}
+    status, _, payload = fetch(server, "POST", "/calculate-roi", body)
+    assert status == 200
+    payload.pop("timestamp")
+    assert payload == calculate_roi(15, 180000, 3)
+
+
+def test_invalid_json_is_a_500(server):
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    try:
+        connection.request("POST", "/api/ai/query", body="{", headers={})
+        response = connection.getresponse()
+        assert response.status == 500
+        assert json.loads(response.read())["error"] == "Internal server error"
+    finally:
+        connection.close()
+
+
+def test_unsupported_method(server):
+    status, _, payload = fetch(server, "DELETE", "/fleet/vehicles")
+    assert status == 405
+    assert payload is None
+
+
+def test_etag_revalidation(server):
+    status, headers, _ = fetch(server, "GET", "/fleet/drivers")
+    assert status == 200
+    etag = headers["ETag"]
+    status, _, payload = fetch(server, "GET", "/fleet/drivers", headers={"If-None-Match": etag})
+    assert status == 304
+    assert payload is None
+
+
+def test_keep_alive_serves_several_requests_per_connection(server):
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    try:
+        for _ in range(3):
+            connection.request("GET", "/api/")
+            response = connection.getresponse()
+            assert response.status == 200
+            response.read()
+    finally:
+        connection.close()
+
+
+def test_malformed_request_line_gets_400(server):
+    with socket.create_connection((server.host, server.port), timeout=5) as sock:
+        sock.sendall(b"garbage\r\n\r\n")
+        assert sock.recv(1024).startswith(b"HTTP/1.1 400")
+
+
+def test_error_rate_injects_500s():
+    with StubServer(seed=1, error_rate=1.0) as stub:
+        status, _, payload = fetch(stub, "GET", "/")
+    assert status == 500
+    assert payload["message"] == "Injected failure"
+    assert stub.injected_errors == 1
+
+
+def test_stop_with_an_idle_keep_alive_connection_is_quiet(caplog, capsys):
+    stub = StubServer(seed=2).start_in_thread()
+    connection = http.client.HTTPConnection(stub.host, stub.port, timeout=5)
+    try:
+        connection.request("GET", "/api/")
+        connection.getresponse().read()
+        stub.stop_thread()
+    finally:
+        connection.close()
+    assert caplog.records == []
+    assert capsys.readouterr().err == ""
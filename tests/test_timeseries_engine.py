@@ -0,0 +1,175 @@
+import json
+import math
+import random
+import statistics
+
+import pytest
+
+import timeseries_engine
+from stub_server import FleetPulseStubApp
+from timeseries_engine import (DAY, BucketAggregator, IncrementalAggregate, TimeSeries,
+                               WindowedAggregate, check_time_series, lttb, min_max)
+
+
+def noisy_series(n, seed=0, step=60):
+    rng = random.Random(seed)
+    return TimeSeries([i * step for i in range(n)],
+                      [math.sin(i / 50) * 10 + rng.gauss(0, 1) for i in range(n)])
+
+
+def points(series):
+    return list(zip(series.timestamps, series.values))
+
+
+def test_lttb_keeps_endpoints_and_size():
+    series = noisy_series(5000)
+    sampled = lttb(series, 200)
+    assert len(sampled) == 200
+    assert points(sampled)[0] == points(series)[0]
+    assert points(sampled)[-1] == points(series)[-1]
+    assert list(sampled.timestamps) == sorted(set(sampled.timestamps))
+    assert set(points(sampled)) <= set(points(series))
+
+
+def test_lttb_keeps_a_lone_spike():
+    series = TimeSeries(range(1000), [0.0] * 1000)
+    series.values[637] = 100.0
+    assert 100.0 in lttb(series, 50).values
+
+
+def test_lttb_returns_small_inputs_unchanged():
+    series = noisy_series(10)
+    assert points(lttb(series, 10)) == points(series)
+    assert points(lttb(series, 2)) == points(series)
+
+
+def test_min_max_keeps_every_bucket_extreme():
+    series = noisy_series(3000, seed=1)
+    buckets = 100
+    sampled = min_max(series, buckets)
+    kept = set(points(sampled))
+    assert len(sampled) <= 2 * buckets
+    assert list(sampled.timestamps) == sorted(sampled.timestamps)
+    n = len(series)
+    for i in range(buckets):
+        chunk = points(series)[i * n // buckets:(i + 1) * n // buckets]
+        assert min(chunk, key=lambda p: p[1]) in kept
+        assert max(chunk, key=lambda p: p[1]) in kept
+
+
+def test_downsample_dispatch():
+    series = noisy_series(1000)
+    assert len(series.downsample(100, "lttb")) == 100
+    assert len(series.downsample(100, "minmax")) <= 100
+    with pytest.raises(ValueError):
+        series.downsample(100, "average")
+
+
+def test_incremental_aggregate_matches_statistics():
+    rng = random.Random(2)
+    values = [rng.uniform(-50, 50) for _ in range(1000)]
+    left, right, whole = IncrementalAggregate(), IncrementalAggregate(), IncrementalAggregate()
+    for index, value in enumerate(values):
+        (left if index < 400 else right).update(value)
+        whole.update(value)
+    left.merge(right)
+    for aggregate in (left, whole):
+        assert aggregate.count == len(values)
+        assert aggregate.mean == pytest.approx(statistics.fmean(values))
+        assert aggregate.stddev == pytest.approx(statistics.pstdev(values))
+        assert (aggregate.min, aggregate.max) == (min(values), max(values))
+        assert aggregate.sum == pytest.approx(sum(values))
+
+
+@pytest.mark.parametrize("stat", ["mean", "min", "max", "sum", "count"])
+def test_rolling_matches_brute_force(stat):
+    rng = random.Random(3)
+    timestamps = sorted(rng.randrange(0, 10000) for _ in range(500))
+    series = TimeSeries(timestamps, [rng.uniform(0, 100) for _ in timestamps])
+    window = 600
+    rolled = series.rolling(window, stat)
+    functions = {"mean": statistics.fmean, "min": min, "max": max, "sum": sum, "count": len}
+    for index, ts in enumerate(series.timestamps):
+        in_window = [value for other, value in zip(series.timestamps[:index + 1],
+                                                   series.values[:index + 1])
+                     if other > ts - window]
+        assert rolled.values[index] == pytest.approx(functions[stat](in_window))
+
+
+def test_windowed_aggregate_rejects_going_back_in_time():
+    aggregate = WindowedAggregate(60)
+    aggregate.update(100, 1.0)
+    with pytest.raises(ValueError):
+        aggregate.update(99, 1.0)
+
+
+def test_between_uses_half_open_ranges():
+    series = TimeSeries([0, 10, 20, 30], [1, 2, 3, 4])
+    assert list(series.between(10, 30).values) == [2, 3]
+
+
+def test_resample_aligns_buckets_to_the_epoch():
+    series = TimeSeries([0, 3599, 3600, 7300], [1, 3, 5, 7])
+    resampled = series.resample(3600)
+    assert list(resampled.timestamps) == [0, 3600, 7200]
+    assert list(resampled.values) == [2, 5, 7]
+    assert list(series.resample(3600, "max").values) == [3, 5, 7]
+
+
+def test_bucket_aggregator_numpy_matches_loop(monkeypatch):
+    pytest.importorskip("numpy")
+    rng = random.Random(4)
+    timestamps = [rng.randrange(0, 7 * DAY) for _ in range(5000)]
+    values = [rng.uniform(0, 100) for _ in timestamps]
+    vectorized = BucketAggregator(3600)
+    vectorized.add_columns(timestamps, values)
+    monkeypatch.setattr(timeseries_engine, "_load_numpy", lambda: None)
+    looped = BucketAggregator(3600)
+    looped.add_columns(timestamps, values)
+    assert sorted(vectorized.buckets) == sorted(looped.buckets)
+    for key, aggregate in looped.buckets.items():
+        other = vectorized.buckets[key]
+        assert other.count == aggregate.count
+        assert other.mean == pytest.approx(aggregate.mean)
+        assert other.stddev == pytest.approx(aggregate.stddev)
+        assert (other.min, other.max) == (aggregate.min, aggregate.max)
+
+
+def test_points_round_trip():
+    data = [{"date": "2025-01-01", "value": 5.8}, {"date": "2025-01-02", "value": 6.1}]
+    assert TimeSeries.from_points(data).to_points() == data
+
+
+def test_check_time_series_accepts_the_analytics_payload():
+    _, analytics = FleetPulseStubApp().get("/fleet/analytics", {})
+    assert check_time_series(analytics["timeSeries"]) == []
+
+
+def test_check_time_series_reports_problems():
+    problems = check_time_series({
+        "fuelEfficiency": [{"date": "2025-01-02", "value": 1},
+                           {"date": "2025-01-01", "value": "x"}],
+        "safetyScores": [{"date": "yesterday", "value": 1}],
+    })
+    assert problems == ["fuelEfficiency[1].value is not a number",
+                        "fuelEfficiency[1] is not after the previous point",
+                        "safetyScores[0].date 'yesterday' is not ISO 8601"]
+    assert check_time_series({}) == ["missing fuelEfficiency", "missing safetyScores"]
+
+
+def test_cli_summarizes_an_empty_series(tmp_path, capsys):
+    telemetry = tmp_path / "empty.jsonl"
+    telemetry.write_text("")
+    assert timeseries_engine.main([str(telemetry)]) == 0
+    assert "  • speed: no samples" in capsys.readouterr().out
+
+
+def test_cli_summarizes_analytics_json(tmp_path, capsys):
+    _, analytics = FleetPulseStubApp().get("/fleet/analytics", {})
+    path = tmp_path / "analytics.json"
+    path.write_text(json.dumps(analytics))
+    out = tmp_path / "out" / "series.json"
+    assert timeseries_engine.main([str(path), "--points", "3", "--out", str(out)]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert any(line.startswith("  • fuelEfficiency: mean ") for line in lines)
+    assert len(json.loads(out.read_text())["timeSeries"]["safetyScores"]) == 3
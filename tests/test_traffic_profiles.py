@@ -0,0 +1,192 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+import traffic_profiles
+from histogram import Histogram
+from traffic_profiles import (ConstantProfile, DiurnalProfile, OpenLoopScheduler, RampProfile,
+                              SequenceProfile, SpikeProfile, StepProfile, parse_duration,
+                              profile_from_spec)
+
+
+class FakeSink:
+    passed = 0
+    failed = 0
+
+
+class FakeTester:
+    """Just enough of FleetPulseAPITester for the scheduler: one timed scenario"""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.request_hooks = []
+        self.sink = FakeSink()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def test_root_endpoint(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+
+
+def test_constant_and_ramp():
+    assert ConstantProfile(5).rate(123) == 5
+    ramp = RampProfile(10, 50, duration=100)
+    assert ramp.rate(0) == 10
+    assert ramp.rate(50) == 30
+    assert ramp.rate(1000) == 50
+
+
+def test_step_holds_last_rate():
+    step = StepProfile([(10, 1), (20, 5)])
+    assert step.duration == 30
+    assert [step.rate(t) for t in (0, 9.9, 10, 29, 100)] == [1, 1, 5, 5, 5]
+
+
+def test_spike_window_is_half_open():
+    spike = SpikeProfile(base=2, spike=40, at=10, length=5)
+    assert [spike.rate(t) for t in (9.9, 10, 14.9, 15)] == [2, 40, 40, 2]
+
+
+def test_diurnal_trough_and_dispatch_peak():
+    day = DiurnalProfile(low=1, high=10, period=24, trough_hour=3, dispatch_hour=8,
+                         dispatch_peak=30)
+    assert day.rate(3) == pytest.approx(1, abs=0.01)
+    assert day.rate(8) == pytest.approx(30)
+    assert day.rate(15) == pytest.approx(10, rel=0.01)
+    # Periodic over simulated days
+    assert day.rate(8 + 24) == pytest.approx(day.rate(8))
+
+
+def test_sequence_plays_profiles_back_to_back():
+    sequence = SequenceProfile([ConstantProfile(1, duration=10), RampProfile(0, 10, duration=10)])
+    assert sequence.duration == 20
+    assert sequence.rate(5) == 1
+    assert sequence.rate(15) == 5
+    assert sequence.rate(100) == 10
+
+
+def test_sequence_requires_durations():
+    with pytest.raises(ValueError):
+        SequenceProfile([ConstantProfile(1)])
+
+
+def test_profile_from_spec():
+    profile = profile_from_spec([{"type": "constant", "rate": 2, "duration": 5},
+                                 {"type": "spike", "base": 1, "spike": 9, "at": 1, "length": 1,
+                                  "duration": 5}])
+    assert isinstance(profile, SequenceProfile)
+    assert profile.rate(6.5) == 9
+    with pytest.raises(ValueError):
+        profile_from_spec({"type": "sawtooth"})
+
+
+def test_parse_duration():
+    assert parse_duration("90") == 90
+    assert parse_duration("15m") == 900
+    assert parse_duration("4h") == 14400
+    assert parse_duration("1d") == 86400
+
+
+# Durations sit between arrivals so float offsets cannot add or drop one at the boundary
+def test_open_loop_schedules_at_the_profile_rate():
+    tester = FakeTester()
+    scheduler = OpenLoopScheduler(ConstantProfile(50), tester, scenarios=["root"], duration=0.39,
+                                  report_interval=0)
+    scheduler.run()
+    assert scheduler.scheduled == 20
+    assert scheduler.completed == tester.calls == 20
+    assert scheduler.dropped == 0
+    assert tester.request_hooks == []
+
+
+def test_saturation_is_counted_not_waited_for():
+    tester = FakeTester(delay=0.2)
+    scheduler = OpenLoopScheduler(ConstantProfile(50), tester, scenarios=["root"], duration=0.19,
+                                  max_in_flight=2, report_interval=0)
+    scheduler.run()
+    assert scheduler.scheduled == 10
+    assert scheduler.completed == 2
+    assert scheduler.dropped == 8
+
+
+def test_latency_is_measured_from_the_intended_start():
+    tester = FakeTester(delay=0.05)
+    scheduler = OpenLoopScheduler(ConstantProfile(20), tester, scenarios=["root"], duration=0.19,
+                                  report_interval=0)
+    scheduler.run()
+    assert scheduler.latency["root"].count == 4
+    assert scheduler.latency["root"].percentile(50) >= 0.05
+
+
+def test_unknown_scenarios_and_open_ended_profiles_are_rejected():
+    with pytest.raises(ValueError):
+        OpenLoopScheduler(ConstantProfile(1), FakeTester(), scenarios=["nope"], duration=1)
+    with pytest.raises(ValueError):
+        OpenLoopScheduler(ConstantProfile(1), FakeTester(), scenarios=["root"])
+
+
+def interim_lines(capsys):
+    return [line for line in capsys.readouterr().out.splitlines() if "target=" in line]
+
+
+def test_interim_reports_follow_the_clock_between_arrivals(capsys):
+    # One arrival at t=0, then nothing until the run ends
+    scheduler = OpenLoopScheduler(ConstantProfile(1), FakeTester(), scenarios=["root"],
+                                  duration=0.45, report_interval=0.1)
+    scheduler.run()
+    assert scheduler.scheduled == 1
+    assert scheduler.elapsed >= 0.45
+    lines = interim_lines(capsys)
+    assert len(lines) == 4
+    assert "achieved=10.0/s" in lines[0]
+    assert all("achieved=0.0/s" in line for line in lines[1:])
+
+
+def test_interim_reports_continue_while_saturated(capsys):
+    scheduler = OpenLoopScheduler(ConstantProfile(100), FakeTester(delay=0.35),
+                                  scenarios=["root"], duration=0.3, max_in_flight=1,
+                                  report_interval=0.1)
+    scheduler.run()
+    lines = interim_lines(capsys)
+    assert len(lines) >= 2
+    assert all("in-flight=1 " in line for line in lines[:2])
+    assert scheduler.dropped == scheduler.scheduled - 1
+
+
+class SlowHistogram(Histogram):
+    """Widens the gap between picking a window and recording into it"""
+    def record(self, value):
+        time.sleep(0.0001)
+        super().record(value)
+
+
+def test_interim_windows_account_for_every_completion(monkeypatch):
+    monkeypatch.setattr(traffic_profiles, "Histogram", SlowHistogram)
+    scheduler = OpenLoopScheduler(ConstantProfile(1), FakeTester(), scenarios=["root"],
+                                  duration=1, report_interval=0)
+    runs = 2000
+    scheduler.in_flight = runs
+    windows = []
+
+    def take():
+        # Counted at swap time: anything recorded into a window later is lost to the report
+        window, completed, in_flight = scheduler._take_window()
+        windows.append((window.count, completed, in_flight))
+
+    workers = [threading.Thread(target=lambda: [scheduler._run_scenario("root", time.monotonic())
+                                                for _ in range(runs // 4)])
+               for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    while any(worker.is_alive() for worker in workers):
+        take()
+        time.sleep(0.001)
+    take()
+    assert sum(count for count, _, _ in windows) == runs
+    assert sum(completed for _, completed, _ in windows) == runs
+    assert scheduler.latency["root"].count == scheduler.completed == runs
+    assert windows[-1][2] == 0
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Time-Series Engine
+Array-backed rolling windows, downsampling and incremental aggregates for fleet analytics
+"""
+
+import argparse
+import bisect
+import json
+import math
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from datetime import datetime, timezone
+
+from fleet_generator import read_columnar
+
+DAY = 86400
+
+# Series served under timeSeries by /fleet/analytics
+ANALYTICS_SERIES = ["fuelEfficiency", "safetyScores"]
+
+
+def _load_numpy():
+    # Imported lazily; bucketing falls back to a plain loop without NumPy
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def parse_timestamp(text):
+    """Epoch seconds from "2025-01-07" or an ISO datetime (naive means UTC)"""
+    moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def format_timestamp(ts, bucket=DAY):
+    """Endpoint-style label: a plain date for whole-day buckets, else an ISO datetime"""
+    moment = datetime.fromtimestamp(ts, timezone.utc)
+    if bucket % DAY == 0:
+        return moment.date().isoformat()
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_seconds(text):
+    """Seconds from "90", "15m", "6h" or "7d" """
+    units = {"s": 1, "m": 60, "h": 3600, "d": DAY}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+class IncrementalAggregate:
+    """count/mean/min/max/variance updated one value at a time (Welford)"""
+    __slots__ = ("count", "mean", "min", "max", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = None
+        self.max = None
+        self._m2 = 0.0
+
+    def update(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Combine another aggregate into this one (Chan et al. parallel update)"""
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self._m2 = other.count, other.mean, other._m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def sum(self):
+        return self.mean * self.count
+
+    @property
+    def variance(self):
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "min": self.min, "max": self.max,
+                "stddev": self.stddev}
+
+
+class WindowedAggregate:
+    """Sliding time window over a stream; each update evicts expired points in O(1) amortized"""
+    def __init__(self, window):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.points = deque()
+        self.total = 0.0
+        # Monotonic deques: candidates for the window min/max
+        self._min = deque()
+        self._max = deque()
+
+    def update(self, ts, value):
+        if self.points and ts < self.points[-1][0]:
+            raise ValueError("WindowedAggregate needs non-decreasing timestamps")
+        self.points.append((ts, value))
+        self.total += value
+        while self._min and self._min[-1][1] > value:
+            self._min.pop()
+        self._min.append((ts, value))
+        while self._max and self._max[-1][1] < value:
+            self._max.pop()
+        self._max.append((ts, value))
+        cutoff = ts - self.window
+        while self.points[0][0] <= cutoff:
+            old_ts, old_value = self.points.popleft()
+            self.total -= old_value
+            if self._min[0][0] == old_ts and self._min[0][1] == old_value:
+                self._min.popleft()
+            if self._max[0][0] == old_ts and self._max[0][1] == old_value:
+                self._max.popleft()
+
+    @property
+    def count(self):
+        return len(self.points)
+
+    @property
+    def mean(self):
+        return self.total / len(self.points) if self.points else 0.0
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+
+class TimeSeries:
+    """Timestamps (epoch seconds) and values in parallel packed arrays"""
+    def __init__(self, timestamps=(), values=()):
+        self.timestamps = array("q", timestamps)
+        self.values = array("d", values)
+        if len(self.timestamps) != len(self.values):
+            raise ValueError("timestamps and values differ in length")
+
+    @classmethod
+    def from_points(cls, points):
+        """From the endpoint shape: [{"date": "2025-01-01", "value": 5.8}, ...]"""
+        return cls([parse_timestamp(point["date"]) for point in points],
+                   [point["value"] for point in points])
+
+    def to_points(self, bucket=DAY, digits=None):
+        return [{"date": format_timestamp(ts, bucket),
+                 "value": round(value, digits) if digits is not None else value}
+                for ts, value in zip(self.timestamps, self.values)]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, ts, value):
+        if self.timestamps and ts < self.timestamps[-1]:
+            raise ValueError("TimeSeries timestamps must be non-decreasing")
+        self.timestamps.append(ts)
+        self.values.append(value)
+
+    def between(self, start, end):
+        """Points with start <= ts < end, found by binary search"""
+        lo = bisect.bisect_left(self.timestamps, start)
+        hi = bisect.bisect_left(self.timestamps, end)
+        return TimeSeries(self.timestamps[lo:hi], self.values[lo:hi])
+
+    def aggregate(self):
+        result = IncrementalAggregate()
+        for value in self.values:
+            result.update(value)
+        return result
+
+    def rolling(self, window, stat="mean"):
+        """Trailing ``window``-second statistic at every point"""
+        if stat not in ("mean", "min", "max", "sum", "count"):
+            raise ValueError(f"Unknown rolling statistic: {stat!r}")
+        aggregate = WindowedAggregate(window)
+        values = array("d")
+        for ts, value in zip(self.timestamps, self.values):
+            aggregate.update(ts, value)
+            values.append(aggregate.total if stat == "sum" else getattr(aggregate, stat))
+        return TimeSeries(self.timestamps, values)
+
+    def resample(self, bucket, stat="mean"):
+        """One point per ``bucket`` seconds, aligned to the epoch"""
+        aggregator = BucketAggregator(bucket)
+        aggregator.add_columns(self.timestamps, self.values)
+        return aggregator.series(stat)
+
+    def downsample(self, points, method="lttb"):
+        if method == "lttb":
+            return lttb(self, points)
+        if method == "minmax":
+            return min_max(self, max(points // 2, 1))
+        raise ValueError(f"Unknown downsampling method: {method!r}")
+
+
+def lttb(series, threshold):
+    """Largest-Triangle-Three-Buckets: ``threshold`` points that keep the visual shape"""
+    n = len(series)
+    if threshold >= n or threshold < 3:
+        return TimeSeries(series.timestamps, series.values)
+    x, y = series.timestamps, series.values
+    out = TimeSeries([x[0]], [y[0]])
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        span = avg_end - avg_start
+        avg_x = sum(x[avg_start:avg_end]) / span
+        avg_y = sum(y[avg_start:avg_end]) / span
+        ax, ay = x[a], y[a]
+        best, best_area = None, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(x[best], y[best])
+        a = best
+    out.append(x[n - 1], y[n - 1])
+    return out
+
+
+def min_max(series, buckets):
+    """Min and max of each equal-count bucket, in time order (at most 2 * buckets points)"""
+    n = len(series)
+    if 2 * buckets >= n:
+        return TimeSeries(series.timestamps, series.values)
+    x, y = series.timestamps, series.values
+    out = TimeSeries()
+    for i in range(buckets):
+        lo, hi = i * n // buckets, (i + 1) * n // buckets
+        if lo == hi:
+            continue
+        chunk = y[lo:hi]
+        low = lo + chunk.index(min(chunk))
+        high = lo + chunk.index(max(chunk))
+        for j in sorted({low, high}):
+            out.append(x[j], y[j])
+    return out
+
+
+class BucketAggregator:
+    """Per-bucket IncrementalAggregates; new readings only touch their own bucket
+
+    Readings may arrive in any order (exported telemetry is grouped by vehicle),
+    so a fleet-wide series can be built from the whole export or kept current
+    as new minutes of data arrive.
+    """
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.buckets = {}
+        self.np = _load_numpy()
+
+    def add(self, ts, value):
+        key = ts - ts % self.bucket
+        aggregate = self.buckets.get(key)
+        if aggregate is None:
+            aggregate = self.buckets[key] = IncrementalAggregate()
+        aggregate.update(value)
+
+    def add_columns(self, timestamps, values):
+        """Add parallel arrays, grouped with NumPy when it is installed"""
+        np = self.np
+        if np is None or len(timestamps) < 1024:
+            for ts, value in zip(timestamps, values):
+                self.add(ts, value)
+            return
+        ts = np.frombuffer(timestamps, dtype=np.int64) if isinstance(timestamps, array) \
+            else np.asarray(timestamps, dtype=np.int64)
+        vs = np.asarray(values, dtype=np.float64)
+        keys, inverse = np.unique(ts - ts % self.bucket, return_inverse=True)
+        counts = np.bincount(inverse)
+        sums = np.bincount(inverse, weights=vs)
+        means = sums / counts
+        m2 = np.bincount(inverse, weights=(vs - means[inverse]) ** 2)
+        mins = np.full(len(keys), np.inf)
+        maxs = np.full(len(keys), -np.inf)
+        np.minimum.at(mins, inverse, vs)
+        np.maximum.at(maxs, inverse, vs)
+        for i, key in enumerate(keys.tolist()):
+            part = IncrementalAggregate()
+            part.count, part.mean, part._m2 = int(counts[i]), float(means[i]), float(m2[i])
+            part.min, part.max = float(mins[i]), float(maxs[i])
+            existing = self.buckets.get(key)
+            if existing is None:
+                self.buckets[key] = part
+            else:
+                existing.merge(part)
+
+    def series(self, stat="mean"):
+        keys = sorted(self.buckets)
+        return TimeSeries(keys, [getattr(self.buckets[key], stat) for key in keys])
+
+
+def check_time_series(time_series, names=ANALYTICS_SERIES):
+    """Problems with a timeSeries block, empty when it matches /fleet/analytics"""
+    problems = [f"missing {name}" for name in names if name not in time_series]
+    for name in names:
+        points = time_series.get(name)
+        if points is None:
+            continue
+        if not isinstance(points, list):
+            problems.append(f"{name} is not a list")
+            continue
+        previous = None
+        for index, point in enumerate(points):
+            if not isinstance(point, dict) or "date" not in point or "value" not in point:
+                problems.append(f"{name}[{index}] needs date and value")
+                continue
+            if not isinstance(point["value"], (int, float)) or isinstance(point["value"], bool):
+                problems.append(f"{name}[{index}].value is not a number")
+            try:
+                ts = parse_timestamp(point["date"])
+            except (TypeError, ValueError):
+                problems.append(f"{name}[{index}].date {point['date']!r} is not ISO 8601")
+                continue
+            if previous is not None and ts <= previous:
+                problems.append(f"{name}[{index}] is not after the previous point")
+            previous = ts
+    return problems
+
+
+def load_telemetry(path, metric):
+    """(timestamps, values) column chunks from fleet_generator telemetry (.jsonl or .fpcol)"""
+    if path.endswith(".fpcol"):
+        for group in read_columnar(path):
+            yield group["timestamp"], group[metric]
+        return
+    timestamps, values = array("q"), array("d")
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            reading = json.loads(line)
+            timestamps.append(reading["timestamp"])
+            values.append(reading[metric])
+            if len(timestamps) >= 65536:
+                yield timestamps, values
+                timestamps, values = array("q"), array("d")
+    if timestamps:
+        yield timestamps, values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FleetPulse time-series engine")
+    parser.add_argument("input", help="telemetry (.jsonl/.fpcol) or analytics JSON with timeSeries")
+    parser.add_argument("--metric", default="speed",
+                        help="telemetry column to aggregate (speed, fuel, ...)")
+    parser.add_argument("--bucket", type=parse_seconds, default=3600,
+                        help="fleet-wide aggregation bucket, e.g. 1m, 1h, 1d")
+    parser.add_argument("--stat", choices=["mean", "min", "max", "count", "sum"], default="mean")
+    parser.add_argument("--rolling", type=parse_seconds, default=None,
+                        help="apply a trailing rolling mean, e.g. 6h")
+    parser.add_argument("--points", type=int, default=None, help="downsample to this many points")
+    parser.add_argument("--method", choices=["lttb", "minmax"], default="lttb")
+    parser.add_argument("--digits", type=int, default=2)
+    parser.add_argument("--out", default=None, help="write {\"timeSeries\": ...} JSON here")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.input.endswith(".json"):
+        with open(args.input) as f:
+            source = json.load(f).get("timeSeries", {})
+        problems = check_time_series(source)
+        if problems:
+            print(f"❌ {args.input} does not match the analytics shape: {problems[:5]}")
+            return 1
+        series = {name: TimeSeries.from_points(source[name]) for name in ANALYTICS_SERIES}
+        bucket = DAY
+        readings = sum(len(s) for s in series.values())
+    else:
+        aggregator = BucketAggregator(args.bucket)
+        readings = 0
+        for timestamps, values in load_telemetry(args.input, args.metric):
+            aggregator.add_columns(timestamps, values)
+            readings += len(timestamps)
+        series = {args.metric: aggregator.series(args.stat)}
+        bucket = args.bucket
+
+    for name, values in series.items():
+        if args.rolling:
+            values = values.rolling(args.rolling)
+        if args.points:
+            values = values.downsample(args.points, args.method)
+        series[name] = values
+
+    output = {name: values.to_points(bucket, args.digits) for name, values in series.items()}
+    problems = check_time_series(output, list(output))
+    print(f"📈 {readings:,} readings -> "
+          f"{', '.join(f'{name}: {len(points)} points' for name, points in output.items())} "
+          f"in {time.perf_counter() - start:.2f}s")
+    for name, values in series.items():
+        summary = values.aggregate()
+        if not summary.count:
+            print(f"  • {name}: no samples")
+            continue
+        print(f"  • {name}: mean {summary.mean:.2f}, min {summary.min:.2f}, max {summary.max:.2f}")
+    if problems:
+        print(f"❌ Output does not match the analytics shape: {problems[:5]}")
+        return 1
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump({"timeSeries": output}, f, indent=2)
+        print(f"📄 Written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
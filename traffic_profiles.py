@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+FleetPulse Traffic Profiles
+Declarative soak/spike/diurnal arrival-rate profiles driven by an open-loop scheduler
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from backend_test import BASE_URL, SCENARIOS, FleetPulseAPITester
+from histogram import Histogram
+from http_transport import PooledTransport
+from request_metrics import MICROSECONDS, RequestMetrics
+from result_sink import ResultSink
+
+
+class ConstantProfile:
+    """Same arrival rate for the whole run"""
+    def __init__(self, rate, duration=None):
+        self.rate_value = rate
+        self.duration = duration
+
+    def rate(self, t):
+        return self.rate_value
+
+
+class RampProfile:
+    """Linear change from one rate to another over ``duration`` seconds"""
+    def __init__(self, start, end, duration):
+        self.start = start
+        self.end = end
+        self.duration = duration
+
+    def rate(self, t):
+        fraction = min(max(t / self.duration, 0.0), 1.0) if self.duration else 1.0
+        return self.start + (self.end - self.start) * fraction
+
+
+class StepProfile:
+    """Piecewise-constant rates: [(seconds, rate), ...]"""
+    def __init__(self, steps):
+        self.steps = [(float(seconds), float(rate)) for seconds, rate in steps]
+        self.duration = sum(seconds for seconds, _ in self.steps)
+
+    def rate(self, t):
+        elapsed = 0.0
+        for seconds, rate in self.steps:
+            elapsed += seconds
+            if t < elapsed:
+                return rate
+        return self.steps[-1][1] if self.steps else 0.0
+
+
+class SpikeProfile:
+    """Base rate with a burst of ``spike`` req/s from ``at`` for ``length`` seconds"""
+    def __init__(self, base, spike, at, length, duration=None):
+        self.base = base
+        self.spike = spike
+        self.at = at
+        self.length = length
+        self.duration = duration
+
+    def rate(self, t):
+        return self.spike if self.at <= t < self.at + self.length else self.base
+
+
+class DiurnalProfile:
+    """Day-shaped load: a sinusoid between ``low`` and ``high`` plus a morning dispatch peak
+
+    ``period`` is the length of one simulated day in seconds, so a full day can
+    be compressed into an hour-long soak. Hours below are simulated hours.
+    """
+    def __init__(self, low, high, period=86400, trough_hour=3, dispatch_hour=8,
+                 dispatch_peak=None, dispatch_width_hours=1.0, duration=None):
+        self.low = low
+        self.high = high
+        self.period = period
+        self.trough_hour = trough_hour
+        self.dispatch_hour = dispatch_hour
+        self.dispatch_peak = dispatch_peak if dispatch_peak is not None else high * 1.5
+        self.dispatch_width_hours = dispatch_width_hours
+        self.duration = duration
+
+    def rate(self, t):
+        hour = (t / self.period * 24) % 24
+        daily = 0.5 - 0.5 * math.cos(2 * math.pi * (hour - self.trough_hour) / 24)
+        rate = self.low + (self.high - self.low) * daily
+        distance = min(abs(hour - self.dispatch_hour), 24 - abs(hour - self.dispatch_hour))
+        burst = math.exp(-0.5 * (distance / self.dispatch_width_hours) ** 2)
+        return max(rate, rate + (self.dispatch_peak - rate) * burst)
+
+
+class SequenceProfile:
+    """Profiles played back to back, each for its own duration"""
+    def __init__(self, profiles):
+        if any(profile.duration is None for profile in profiles):
+            raise ValueError("Every profile in a sequence needs a duration")
+        self.profiles = profiles
+        self.duration = sum(profile.duration for profile in profiles)
+
+    def rate(self, t):
+        for profile in self.profiles:
+            if t < profile.duration:
+                return profile.rate(t)
+            t -= profile.duration
+        return self.profiles[-1].rate(self.profiles[-1].duration) if self.profiles else 0.0
+
+
+def profile_from_spec(spec):
+    """Build a profile from its JSON form, e.g. {"type": "ramp", "start": 1, "end": 50, "duration": 600}
+
+    A list of specs becomes a SequenceProfile.
+    """
+    if isinstance(spec, list):
+        return SequenceProfile([profile_from_spec(item) for item in spec])
+    spec = dict(spec)
+    kind = spec.pop("type")
+    if kind == "constant":
+        return ConstantProfile(**spec)
+    if kind == "ramp":
+        return RampProfile(**spec)
+    if kind == "step":
+        return StepProfile(**spec)
+    if kind == "spike":
+        return SpikeProfile(**spec)
+    if kind == "diurnal":
+        return DiurnalProfile(**spec)
+    raise ValueError(f"Unknown traffic profile type: {kind!r}")
+
+
+class OpenLoopScheduler:
+    """Starts scenarios at the profile's arrival times whether or not earlier ones finished
+
+    Arrivals are never delayed by a slow server, so queueing shows up in the
+    numbers instead of being hidden (coordinated omission). Scenario latency is
+    measured from the *intended* start time; per-request service times come
+    from the tester's request hooks.
+    """
+    def __init__(self, profile, tester=None, scenarios=None, duration=None, max_in_flight=256,
+                 poisson=False, report_interval=60, seed=None):
+        self.profile = profile
+        self.duration = duration or profile.duration
+        if not self.duration:
+            raise ValueError("A duration is required for open-ended profiles")
+        self.scenarios = list(scenarios or ["overview", "additional"])
+        unknown = [name for name in self.scenarios if name not in SCENARIOS]
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {unknown}")
+        self.max_in_flight = max_in_flight
+        self.tester = tester or FleetPulseAPITester(
+            verbose=False, transport=PooledTransport(pool_size=max_in_flight), sink=ResultSink())
+        self.poisson = poisson
+        self.report_interval = report_interval
+        self.rng = random.Random(seed)
+        self.metrics = RequestMetrics()
+        self.latency = {name: Histogram(scale=MICROSECONDS) for name in self.scenarios}
+        self.window = Histogram(scale=MICROSECONDS)
+        self.scheduled = 0
+        self.completed = 0
+        self.dropped = 0
+        self.in_flight = 0
+        self.elapsed = 0.0
+        self._window_completed = 0
+        self._lock = threading.Lock()
+
+    def _run_scenario(self, name, intended):
+        try:
+            getattr(self.tester, SCENARIOS[name])()
+        finally:
+            latency = time.monotonic() - intended
+            # Same lock as the interim swap, so no completion lands in a reported window
+            with self._lock:
+                self.latency[name].record(latency)
+                self.window.record(latency)
+                self.in_flight -= 1
+                self.completed += 1
+                self._window_completed += 1
+
+    async def _report_periodically(self, start):
+        """Print interim stats on the clock, so idle or saturated stretches still report"""
+        next_report = start + self.report_interval
+        while True:
+            await asyncio.sleep(max(next_report - time.monotonic(), 0))
+            self._print_interim(time.monotonic() - start)
+            next_report += self.report_interval
+
+    async def _schedule(self, executor):
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        reporter = None
+        if self.report_interval:
+            reporter = asyncio.create_task(self._report_periodically(start))
+        try:
+            await self._arrivals(loop, executor, start)
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+                await asyncio.gather(reporter, return_exceptions=True)
+        self.elapsed = time.monotonic() - start
+
+    async def _arrivals(self, loop, executor, start):
+        offset = 0.0
+        index = 0
+        tasks = set()
+        while offset < self.duration:
+            # Always yield, even when running behind, so the reporter keeps its schedule
+            await asyncio.sleep(max(start + offset - time.monotonic(), 0))
+            rate = self.profile.rate(offset)
+            if rate <= 0:
+                offset += 0.1
+                continue
+            intended = start + offset
+            self.scheduled += 1
+            with self._lock:
+                saturated = self.in_flight >= self.max_in_flight
+                if not saturated:
+                    self.in_flight += 1
+            if saturated:
+                # Client-side limit reached: count it rather than silently waiting
+                self.dropped += 1
+            else:
+                name = self.scenarios[index % len(self.scenarios)]
+                index += 1
+                task = loop.run_in_executor(executor, self._run_scenario, name, intended)
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            offset += self.rng.expovariate(rate) if self.poisson else 1.0 / rate
+        # A slow rate can schedule its last arrival well before the run ends
+        await asyncio.sleep(max(start + self.duration - time.monotonic(), 0))
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def run(self):
+        self.tester.request_hooks.append(self.metrics)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+                asyncio.run(self._schedule(executor))
+        finally:
+            self.tester.request_hooks.remove(self.metrics)
+
+    def _take_window(self):
+        """(latency histogram, completions, in flight) since the last call"""
+        with self._lock:
+            window, self.window = self.window, Histogram(scale=MICROSECONDS)
+            completed, self._window_completed = self._window_completed, 0
+            return window, completed, self.in_flight
+
+    def _print_interim(self, now):
+        window, completed, in_flight = self._take_window()
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] t={now:,.0f}s "
+              f"target={self.profile.rate(now):.1f}/s achieved={completed / self.report_interval:.1f}/s "
+              f"in-flight={in_flight} p50={window.percentile(50) * 1000:.0f}ms "
+              f"p99={window.percentile(99) * 1000:.0f}ms dropped={self.dropped} "
+              f"failed-checks={self.tester.sink.failed}")
+
+    def print_report(self):
+        """Print soak/spike run summary"""
+        print("=" * 80)
+        print("📋 TRAFFIC PROFILE SUMMARY")
+        print(f"Duration: {self.elapsed:.0f}s, Scheduled: {self.scheduled}, "
+              f"Completed: {self.completed}, Dropped: {self.dropped}")
+        print(f"Checks: {self.tester.sink.passed} passed, {self.tester.sink.failed} failed")
+        print("\n⏱️  SCENARIO LATENCY (from intended start)")
+        print(f"{'Scenario':<16}{'Runs':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for name, histogram in self.latency.items():
+            print(f"{name:<16}{histogram.count:>8}{histogram.percentile(50) * 1000:>10.1f}"
+                  f"{histogram.percentile(95) * 1000:>10.1f}{histogram.percentile(99) * 1000:>10.1f}"
+                  f"{(histogram.max or 0) / MICROSECONDS * 1000:>10.1f}")
+        print("\n⏱️  SERVICE TIME BY ENDPOINT")
+        self.metrics.print_table()
+        print(f"\n⏰ Completed at: {datetime.now().isoformat()}")
+        print("=" * 80)
+
+
+def parse_duration(text):
+    """Seconds from "90", "15m", "4h" or "1d" """
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FleetPulse open-loop traffic profiles")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--profile", help="profile spec as JSON")
+    group.add_argument("--profile-file", help="path to a JSON profile spec")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS),
+                        default=["overview", "additional"])
+    parser.add_argument("--duration", type=parse_duration, default=None,
+                        help="run length, e.g. 90, 15m, 4h (default: the profile's own)")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times")
+    parser.add_argument("--report-interval", type=parse_duration, default=60)
+    parser.add_argument("--results-file", default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.profile_file:
+        with open(args.profile_file) as f:
+            spec = json.load(f)
+    else:
+        spec = json.loads(args.profile)
+    profile = profile_from_spec(spec)
+
+    transport = PooledTransport(pool_size=args.max_in_flight, retries=0)
+    tester = FleetPulseAPITester(base_url=args.base_url, verbose=False, transport=transport,
+                                 sink=ResultSink(args.results_file, payload_sample_rate=0.01))
+    # Keep the overview dynamic-data pause from dominating every run of that scenario
+    tester.dynamic_data_delay = 0
+    scheduler = OpenLoopScheduler(profile, tester, args.scenarios, duration=args.duration,
+                                  max_in_flight=args.max_in_flight, poisson=args.poisson,
+                                  report_interval=args.report_interval, seed=args.seed)
+    print(f"🚀 Running {spec if isinstance(spec, dict) else 'sequence'} profile for "
+          f"{scheduler.duration:,.0f}s against {args.base_url}")
+    try:
+        scheduler.run()
+        scheduler.print_report()
+    finally:
+        transport.close()
+        tester.sink.close()
+
+
+if __name__ == "__main__":
+    main()